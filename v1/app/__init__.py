@@ -4,11 +4,13 @@ from app.api.v1.users import api as users_ns
 from app.api.v1.amenities import api as amenities_ns
 from app.api.v1.places import api as places_ns
 from app.api.v1.reviews import api as reviews_ns
+from app.services import facade
 
 
 
-def create_app():
+def create_app(config_class="config.DevelopmentConfig"):
     app = Flask(__name__)
+    app.config.from_object(config_class)
     api = Api(app, version='1.0', title='HBnB API', description='HBnB Application API', doc='/api/v1/')
 
 
@@ -17,4 +19,15 @@ def create_app():
     api.add_namespace(places_ns, path="/api/v1/places")
     api.add_namespace(reviews_ns, path="/api/v1/reviews")
 
+    storage = app.config.get('STORAGE', 'objects')
+    if storage not in ('objects', 'compact'):
+        raise ValueError(f"Unknown STORAGE {storage}")
+    if storage == 'compact' and not facade.compact:
+        facade.use_compact_storage()
+
+    if app.config.get('DATA_DIR') and facade.store is None:
+        facade.enable_persistence(app.config['DATA_DIR'],
+                                  snapshot_every=app.config['SNAPSHOT_EVERY'],
+                                  fsync=app.config['WAL_FSYNC'])
+
     return app
\ No newline at end of file
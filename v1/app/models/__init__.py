@@ -1,7 +1,26 @@
 import uuid
 from datetime import datetime
 
+
+def attribute_names(cls):
+    """Names of the slots an instance of cls stores its state in, base classes first"""
+    names = []
+    for klass in reversed(cls.__mro__):
+        names.extend(getattr(klass, '__slots__', ()))
+    return names
+
+
+def attributes(obj):
+    """Stored state of a model instance as a dict (slots plus any __dict__)"""
+    state = {name: getattr(obj, name) for name in attribute_names(type(obj)) if hasattr(obj, name)}
+    state.update(getattr(obj, '__dict__', {}))
+    return state
+
+
 class BaseModel:
+    # Models use slots instead of a per-instance __dict__ to keep large stores small
+    __slots__ = ('id', 'created_at', 'updated_at')
+
     def __init__(self):
         self.id = str(uuid.uuid4())
         self.created_at = datetime.now()
@@ -1,9 +1,12 @@
 """
 This is a amenity class
 """
+import sys
 from . import BaseModel
 
 class Amenity(BaseModel):
+    __slots__ = ('_name',)
+
     def __init__(self, name):
         super().__init__()
         self.name = name
@@ -20,6 +23,6 @@ class Amenity(BaseModel):
         # ensure that the value is up to 100 alphabets only after removing excess white-space
         is_valid_name = 0 < len(value.strip()) <= 50
         if is_valid_name:
-            self._name = value.strip()
+            self._name = sys.intern(value.strip())
         else:
             raise ValueError("Invalid name length!")
\ No newline at end of file
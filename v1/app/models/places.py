@@ -6,6 +6,9 @@ from app.models.users import User
 
 
 class Place(BaseModel):
+    __slots__ = ('_title', '_description', '_price', '_latitude', '_longitude', '_owner',
+                 'reviews', 'amenities')
+
     def __init__(self, title, description, price, latitude, longitude, owner):
         if title is None or description is None or price is None or latitude is None or longitude is None or owner is None:
             raise ValueError("Required attributes not specified!")
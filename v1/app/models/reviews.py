@@ -6,6 +6,8 @@ from app.models.places import Place
 from app.models.users import User
 
 class Review(BaseModel):
+    __slots__ = ('_text', '_rating', '_place', '_user', 'replies')
+
     def __init__(self, text, rating, place, user):
         super().__init__()
         self.text = text
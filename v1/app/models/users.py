@@ -3,8 +3,11 @@ This is the user class
 """
 from . import BaseModel
 import re
+import sys
 
 class User(BaseModel):
+    __slots__ = ('_first_name', '_last_name', '_email', '_is_admin')
+
     def __init__(self, first_name, last_name, email, is_admin = False):
         super().__init__()
         self.first_name = first_name
@@ -21,7 +24,8 @@ class User(BaseModel):
     def first_name(self, value):
         is_valid_name = 0 < len(value.strip()) <= 50
         if is_valid_name:
-            self._first_name = value.strip()
+            # Names repeat a lot across users, keep one copy of each
+            self._first_name = sys.intern(value.strip())
         else:
             raise ValueError("Invalid name length")
 
@@ -34,7 +38,7 @@ class User(BaseModel):
     def last_name(self, value):
         is_valid_name = 0 < len(value.strip()) <= 50
         if is_valid_name:
-            self._last_name = value.strip()
+            self._last_name = sys.intern(value.strip())
         else:
             raise ValueError("Invalid name length")
 
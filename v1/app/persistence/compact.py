@@ -0,0 +1,323 @@
+"""
+Column-oriented repository for large, read-mostly datasets.
+
+InMemoryRepository keeps one model object per entity, each holding
+references to its related objects (Place.owner, Place.reviews, ...).
+CompactRepository stores one column per attribute instead:
+    - numbers live in array.array columns, 8 bytes per float instead of
+      a float object plus a pointer,
+    - related entities are stored by id, so rows do not keep the object
+      graph alive,
+    - short repeated strings (names, owner ids) are interned so equal
+      values share one object,
+    - timestamps are stored as POSIX floats.
+
+Rows are read through CompactRow views created on access. Models are
+validated as usual when created and converted on add(); updates go
+through the model's property setters, so the same rules apply.
+
+The facade switches to this storage with use_compact_storage() (the
+STORAGE = 'compact' config). Its repositories are then given `related`
+repositories, so views resolve place.owner, place.amenities,
+review.place and review.user to the related rows, and `indexes` as for
+InMemoryRepository. Writes are serialized by a lock; reads take none.
+"""
+import sys
+import threading
+from array import array
+from collections import namedtuple
+from datetime import datetime
+from types import SimpleNamespace
+from app.models.users import User
+from app.models.amenity import Amenity
+from app.models.places import Place
+from app.models.reviews import Review
+from app.models import attribute_names
+from app.persistence.repository import AttributeIndex, Repository
+
+# typecode: array.array type, or None for a plain list
+# intern:   sys.intern the values (only for str columns)
+# source:   how to read the value from a full model instance
+Column = namedtuple('Column', 'name typecode intern source')
+
+TIMESTAMPS = (
+    Column('created_at', 'd', False, lambda obj: obj.created_at.timestamp()),
+    Column('updated_at', 'd', False, lambda obj: obj.updated_at.timestamp()),
+)
+
+COLUMNS = {
+    User: (
+        Column('first_name', None, True, None),
+        Column('last_name', None, True, None),
+        Column('email', None, False, None),
+        Column('is_admin', 'b', False, None),
+    ),
+    Amenity: (
+        Column('name', None, True, None),
+    ),
+    Place: (
+        Column('title', None, False, None),
+        Column('description', None, False, None),
+        Column('price', 'd', False, None),
+        Column('latitude', 'd', False, None),
+        Column('longitude', 'd', False, None),
+        Column('owner_id', None, True, lambda place: place.owner.id),
+        Column('amenity_ids', None, False, lambda place: tuple(sys.intern(a.id) for a in place.amenities)),
+    ),
+    Review: (
+        Column('text', None, False, None),
+        Column('rating', 'd', False, None),
+        Column('place_id', None, True, lambda review: review.place.id),
+        Column('user_id', None, True, lambda review: review.user.id),
+    ),
+}
+
+
+class CompactRow:
+    """Read-only view of one stored entity of a CompactRepository, found by id on each access"""
+    __slots__ = ('_repo', 'id')
+
+    def __init__(self, repo, obj_id):
+        self._repo = repo
+        self.id = obj_id
+
+    def __getattr__(self, name):
+        return self._repo.value(self._repo.row_of(self.id), name)
+
+    def __eq__(self, other):
+        return isinstance(other, CompactRow) and other._repo is self._repo and other.id == self.id
+
+    def __hash__(self):
+        return hash((id(self._repo), self.id))
+
+    def to_dict(self):
+        row = self._repo.row_of(self.id)
+        return {name: self._repo.value(row, name) for name in self._repo.names}
+
+    def to_model(self):
+        """A full model instance with the same state, see CompactRepository.to_model"""
+        return self._repo.to_model(self.id)
+
+
+class CompactRepository(Repository):
+    """Repository storing entities of one model as parallel columns.
+
+    A deleted row's id is cleared and its row number put on a free
+    list, which the next add() reuses, so columns only grow to the most
+    rows ever live at once. Views look their row up by id, so a view of
+    a deleted entity raises LookupError rather than showing whichever
+    entity reused the row.
+
+    `indexes` maps attribute names to True (unique) or False as for
+    InMemoryRepository; `related` maps a relationship attribute to
+    (id column, repository holding the related rows), e.g.
+    {'owner': ('owner_id', users)}. A dotted 'owner.id' then names the
+    owner_id column in lookups and indexes.
+    """
+
+    def __init__(self, model, indexes=None, related=None):
+        self.model = model
+        self.columns = TIMESTAMPS + COLUMNS[model]
+        self.names = ('id',) + tuple(column.name for column in self.columns)
+        self.related = dict(related or {})
+        # id columns behind related attributes, written through the related attribute's name
+        self._related_columns = {column for column, _ in self.related.values()}
+        self._ids = []
+        self._rows = {}  # id -> row number
+        self._free = []  # row numbers of deleted rows, reused by add()
+        self._data = {column.name: array(column.typecode) if column.typecode else []
+                      for column in self.columns}
+        self._by_name = {column.name: column for column in self.columns}
+        self._indexes = {self._column_name(name): AttributeIndex(self._column_name(name), unique)
+                         for name, unique in (indexes or {}).items()}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._rows)
+
+    @staticmethod
+    def _store(column, value):
+        if column.intern and isinstance(value, str):
+            return sys.intern(value)
+        return value
+
+    def _column_name(self, attr_name):
+        """Column behind an attribute name; 'owner.id' is the owner_id column"""
+        relation, _, attr = attr_name.partition('.')
+        if attr == 'id' and relation in self.related:
+            return self.related[relation][0]
+        return attr_name
+
+    def row_of(self, obj_id):
+        row = self._rows.get(obj_id)
+        if row is None:
+            raise LookupError(f"{self.model.__name__} {obj_id} is not stored")
+        return row
+
+    def add(self, obj):
+        """Store a full model instance, in a freed row if there is one"""
+        values = {column.name: self._store(column, column.source(obj) if column.source
+                                           else getattr(obj, column.name))
+                  for column in self.columns}
+        with self._lock:
+            if obj.id in self._rows:
+                raise ValueError(f"{self.model.__name__} {obj.id} already exists")
+            view = CompactRow(self, obj.id)
+            for name, index in self._indexes.items():
+                index.check(view, values[name])
+            if self._free:
+                row = self._free.pop()
+                self._ids[row] = obj.id
+                for name, value in values.items():
+                    self._data[name][row] = value
+            else:
+                row = len(self._ids)
+                self._ids.append(obj.id)
+                for name, value in values.items():
+                    self._data[name].append(value)
+            self._rows[obj.id] = row
+            for index in self._indexes.values():
+                index.insert(view)
+
+    def value(self, row, name):
+        """Value of one attribute of a row, converted back to its model type"""
+        if name == 'id':
+            return self._ids[row]
+        if name in self.related:
+            column, repo = self.related[name]
+            related_ids = self._data[column][row]
+            if isinstance(related_ids, tuple):
+                return [repo.get(related_id) for related_id in related_ids if related_id in repo._rows]
+            return repo.get(related_ids)
+        column = self._by_name.get(name)
+        if column is None:
+            raise AttributeError(f"{self.model.__name__} has no attribute {name}")
+        value = self._data[name][row]
+        if name in ('created_at', 'updated_at'):
+            return datetime.fromtimestamp(value)
+        if column.typecode == 'b':
+            return bool(value)
+        return value
+
+    def column(self, name):
+        """The raw list/array of a column, for scans; includes deleted rows"""
+        return self._ids if name == 'id' else self._data[self._column_name(name)]
+
+    def get(self, obj_id):
+        return CompactRow(self, obj_id) if obj_id in self._rows else None
+
+    def get_all(self):
+        return [CompactRow(self, obj_id) for obj_id in list(self._rows)]
+
+    def to_model(self, obj_id):
+        """Rebuild a model instance from a row, with related rows rebuilt the same way.
+
+        For handing stored entities to validating model setters (a new
+        Place's owner must be a User). Slots the row does not store,
+        such as Place.reviews, start as empty lists.
+        """
+        row = self.row_of(obj_id)
+        obj = self.model.__new__(self.model)
+        slots = set(attribute_names(self.model))
+        obj.id = obj_id
+        for column in self.columns:
+            if column.name not in self._related_columns:
+                setattr(obj, '_' + column.name if '_' + column.name in slots else column.name,
+                        self.value(row, column.name))
+        for name, (column, repo) in self.related.items():
+            related_ids = self._data[column][row]
+            value = ([repo.to_model(related_id) for related_id in related_ids]
+                     if isinstance(related_ids, tuple) else repo.to_model(related_ids))
+            setattr(obj, '_' + name if '_' + name in slots else name, value)
+        for name in slots:
+            if not hasattr(obj, name):
+                setattr(obj, name, [])
+        return obj
+
+    def update(self, obj_id, data):
+        """Validate changes with the model's setters, then write them to the columns.
+
+        Related attributes ('owner', 'amenities') take entities or their
+        ids, which must exist in the related repository; a list replaces
+        the whole collection.
+        """
+        scratch = SimpleNamespace()
+        changes = {}
+        for key, value in data.items():
+            if key in self.related:
+                changes[self.related[key][0]] = self._related_ids(key, value)
+                continue
+            if key not in self._by_name or key in self._related_columns:
+                continue
+            prop = getattr(self.model, key, None)
+            if isinstance(prop, property) and prop.fset:
+                prop.fset(scratch, value)
+                value = getattr(scratch, '_' + key)
+            changes[key] = self._store(self._by_name[key], value)
+        with self._lock:
+            row = self._rows.get(obj_id)
+            if row is None:
+                return
+            for attr, (column, _) in self.related.items():
+                many = isinstance(self._data[column][row], tuple)
+                if column in changes and isinstance(changes[column], tuple) != many:
+                    raise ValueError(f"{attr} must be {'a list' if many else 'a single entity'}")
+            view = CompactRow(self, obj_id)
+            indexed = [(index, self._data[name][row]) for name, index in self._indexes.items()
+                       if name in changes]
+            for index, _ in indexed:
+                index.check(view, changes[index.attr_name])
+            for index, old_key in indexed:
+                index.remove(view, old_key)
+            for key, value in changes.items():
+                self._data[key][row] = value
+            self._data['updated_at'][row] = datetime.now().timestamp()
+            for index, _ in indexed:
+                index.insert(view)
+
+    def _related_ids(self, name, value):
+        """Interned id, or tuple of ids for a list, of related entities given as objects or ids"""
+        repo = self.related[name][1]
+
+        def related_id(item):
+            item_id = item if isinstance(item, str) else getattr(item, 'id', None)
+            if not isinstance(item_id, str) or repo.get(item_id) is None:
+                raise ValueError(f"{repo.model.__name__} with ID {item_id} not found")
+            return sys.intern(item_id)
+        if isinstance(value, (list, tuple)):
+            return tuple(related_id(item) for item in dict.fromkeys(value))
+        return related_id(value)
+
+    def delete(self, obj_id):
+        with self._lock:
+            row = self._rows.get(obj_id)
+            if row is None:
+                return
+            view = CompactRow(self, obj_id)
+            for name, index in self._indexes.items():
+                index.remove(view, self._data[name][row])
+            del self._rows[obj_id]
+            self._ids[row] = None
+            for column in self.columns:
+                if column.typecode is None:
+                    self._data[column.name][row] = None  # let go of strings and id tuples
+            self._free.append(row)
+
+    def _matching_rows(self, attr_name, attr_value):
+        values = self.column(attr_name)
+        for row, obj_id in enumerate(self._ids):
+            if obj_id is not None and values[row] == attr_value:
+                yield row
+
+    def get_by_attribute(self, attr_name, attr_value):
+        index = self._indexes.get(self._column_name(attr_name))
+        if index is not None:
+            return index.first(attr_value)
+        row = next(self._matching_rows(attr_name, attr_value), None)
+        return None if row is None else CompactRow(self, self._ids[row])
+
+    def find_all_by(self, attr_name, attr_value):
+        index = self._indexes.get(self._column_name(attr_name))
+        if index is not None:
+            return index.lookup(attr_value)
+        return [CompactRow(self, self._ids[row]) for row in self._matching_rows(attr_name, attr_value)]
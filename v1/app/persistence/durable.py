@@ -0,0 +1,264 @@
+"""
+Optional durable storage for the in-memory repositories.
+
+Every add/update/delete is appended to a write-ahead log as the object's
+full state (or its id, for deletes). Every `snapshot_every` records the
+whole store is written to a compacted snapshot and a new log generation
+starts, so startup reads one snapshot plus a short log instead of
+replaying every create_* call. Both files are read through mmap, so the
+OS pages them in without extra copies.
+
+Files in the data directory:
+    snapshot.bin     MAGIC, generation covered, then one pickled payload
+    wal-<gen>.log    records of [length][crc32][pickled payload]
+
+A snapshot of generation g contains everything up to the end of
+wal-g, so only logs with a higher generation are replayed. A torn
+record at the end of the newest log (from a crash mid-write) is dropped.
+
+Object references between entities (Place.owner, Review.place, ...)
+are stored as Ref(repository name, id) and resolved against the
+repositories when loading. Data files are pickles: only load data
+directories this application wrote itself.
+"""
+import mmap
+import os
+import pickle
+import struct
+import threading
+import zlib
+from collections import namedtuple
+from app.models import BaseModel, attributes
+
+MAGIC = b'HBNBSNAP'
+SNAPSHOT_HEADER = struct.Struct('<8sQII')  # magic, generation, crc32, payload length
+RECORD_HEADER = struct.Struct('<II')  # payload length, crc32
+SNAPSHOT_NAME = 'snapshot.bin'
+DEFAULT_SNAPSHOT_EVERY = 10000
+
+Ref = namedtuple('Ref', 'repo obj_id')
+
+
+def wal_name(generation):
+    return f'wal-{generation:08d}.log'
+
+
+def read_mapped(path):
+    """Return an mmap of a whole file, or None if it is missing or empty"""
+    try:
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return None
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except FileNotFoundError:
+        return None
+
+
+def iter_records(mapped):
+    """Yield (end offset, payload view) for each intact record of a mapped log"""
+    view = memoryview(mapped)
+    offset = 0
+    try:
+        while offset + RECORD_HEADER.size <= len(view):
+            length, crc = RECORD_HEADER.unpack_from(view, offset)
+            start = offset + RECORD_HEADER.size
+            payload = view[start:start + length]
+            if len(payload) < length or zlib.crc32(payload) != crc:
+                return  # torn or corrupt tail
+            offset = start + length
+            yield offset, payload
+    finally:
+        view.release()
+
+
+class DurableStore:
+    """Write-ahead log plus snapshots behind a set of named InMemoryRepositories.
+
+    `repos` maps a stable name to each repository and `models` maps the
+    same names to the model class each one stores. load() fills the
+    repositories and from then on every change made through them is
+    logged.
+    """
+
+    def __init__(self, directory, repos, models, snapshot_every=DEFAULT_SNAPSHOT_EVERY, fsync=False):
+        self.directory = directory
+        self.repos = repos
+        self.models = models
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        self.generation = 0
+        self._records = 0
+        self._log = None
+        self._lock = threading.RLock()
+        self._name_of_model = {model: name for name, model in models.items()}
+        self._pending = {}  # (repo name, id) -> object created but not yet added
+        os.makedirs(directory, exist_ok=True)
+
+    # --- Encoding ---
+    def _encode(self, value):
+        if isinstance(value, BaseModel):
+            return Ref(self._name_of_model[type(value)], value.id)
+        if isinstance(value, list):
+            return [self._encode(item) for item in value]
+        return value
+
+    def _state(self, obj):
+        return {key: self._encode(value) for key, value in attributes(obj).items()}
+
+    def _resolve(self, value):
+        if isinstance(value, Ref):
+            obj = self._pending.get(value) or self.repos[value.repo].get(value.obj_id)
+            if obj is None:
+                raise ValueError(f"Dangling reference to {value.repo} {value.obj_id}")
+            return obj
+        if isinstance(value, list):
+            return [self._resolve(item) for item in value]
+        return value
+
+    def _materialize(self, repo_name, state):
+        """Create or refresh an object from stored state; references stay as Ref"""
+        obj = self.repos[repo_name].get(state['id'])
+        if obj is None:
+            model = self.models[repo_name]
+            obj = model.__new__(model)
+            new = True
+        else:
+            new = False
+        # Stored names are the slots themselves, so this bypasses the validating properties
+        for key, value in state.items():
+            setattr(obj, key, value)
+        return obj, new
+
+    def _link(self, repo_name, obj, new):
+        """Resolve an object's references and (re)index it in its repository"""
+        for key, value in attributes(obj).items():
+            if isinstance(value, (Ref, list)):
+                setattr(obj, key, self._resolve(value))
+        repo = self.repos[repo_name]
+        if new:
+            repo.add(obj)
+        else:
+            repo.reindex(obj)
+
+    # --- Loading ---
+    def load(self):
+        """Fill the repositories from the snapshot and newer logs, then start logging"""
+        with self._lock:
+            covered = self._load_snapshot()
+            generations = sorted(int(name[4:12]) for name in os.listdir(self.directory)
+                                 if name.startswith('wal-') and name.endswith('.log'))
+            for generation in generations:
+                if generation <= covered:
+                    os.remove(os.path.join(self.directory, wal_name(generation)))
+                    continue
+                self._replay(generation)
+            self.generation = max([covered + 1] + generations)
+            self._open_log()
+
+    def _load_snapshot(self):
+        mapped = read_mapped(os.path.join(self.directory, SNAPSHOT_NAME))
+        if mapped is None:
+            return 0
+        with mapped:
+            magic, generation, crc, length = SNAPSHOT_HEADER.unpack_from(mapped, 0)
+            with memoryview(mapped) as view:
+                payload = view[SNAPSHOT_HEADER.size:SNAPSHOT_HEADER.size + length]
+                if magic != MAGIC or len(payload) != length or zlib.crc32(payload) != crc:
+                    raise ValueError(f"Corrupt snapshot in {self.directory}")
+                entities = pickle.loads(payload)
+                payload.release()
+
+        # Create every object first so references can point in any direction
+        created = []
+        for repo_name, states in entities.items():
+            for state in states:
+                obj, new = self._materialize(repo_name, state)
+                self._pending[Ref(repo_name, obj.id)] = obj
+                created.append((repo_name, obj, new))
+        try:
+            for repo_name, obj, new in created:
+                self._link(repo_name, obj, new)
+        finally:
+            self._pending.clear()
+        return generation
+
+    def _replay(self, generation):
+        path = os.path.join(self.directory, wal_name(generation))
+        mapped = read_mapped(path)
+        if mapped is None:
+            return
+        good = 0
+        with mapped:
+            for good, payload in iter_records(mapped):
+                op, repo_name, data = pickle.loads(payload)
+                payload.release()
+                if op == 'put':
+                    obj, new = self._materialize(repo_name, data)
+                    self._link(repo_name, obj, new)
+                else:
+                    self.repos[repo_name].delete(data)
+            size = len(mapped)
+        if good < size:
+            # Drop the torn tail so new records are appended after the last good one
+            os.truncate(path, good)
+
+    # --- Logging ---
+    def _open_log(self):
+        if self._log is not None:
+            self._log.close()
+        self._log = open(os.path.join(self.directory, wal_name(self.generation)), 'ab')
+        for name, repo in self.repos.items():
+            repo.journal = self
+
+    def _append(self, record):
+        payload = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._log.write(RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload)
+            self._log.flush()
+            if self.fsync:
+                os.fsync(self._log.fileno())
+            self._records += 1
+            if self.snapshot_every and self._records >= self.snapshot_every:
+                self.snapshot()
+
+    def _name_of(self, repo):
+        for name, candidate in self.repos.items():
+            if candidate is repo:
+                return name
+        raise ValueError("Repository is not part of this store")
+
+    def record_put(self, repo, obj):
+        """Log the full current state of an added or updated object"""
+        self._append(('put', self._name_of(repo), self._state(obj)))
+
+    def record_delete(self, repo, obj_id):
+        self._append(('del', self._name_of(repo), obj_id))
+
+    # --- Compaction ---
+    def snapshot(self):
+        """Write a snapshot of everything logged so far and start a new log generation"""
+        with self._lock:
+            entities = {name: [self._state(obj) for obj in repo.get_all()]
+                        for name, repo in self.repos.items()}
+            payload = pickle.dumps(entities, protocol=pickle.HIGHEST_PROTOCOL)
+            path = os.path.join(self.directory, SNAPSHOT_NAME)
+            with open(path + '.tmp', 'wb') as f:
+                f.write(SNAPSHOT_HEADER.pack(MAGIC, self.generation, zlib.crc32(payload), len(payload)))
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(path + '.tmp', path)
+
+            finished = self.generation
+            self.generation += 1
+            self._records = 0
+            self._open_log()
+            os.remove(os.path.join(self.directory, wal_name(finished)))
+
+    def close(self):
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+            for repo in self.repos.values():
+                repo.journal = None
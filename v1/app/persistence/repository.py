@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from operator import attrgetter
 
 class Repository(ABC):
     @abstractmethod
@@ -25,13 +26,119 @@ class Repository(ABC):
     def get_by_attribute(self, attr_name, attr_value):
         pass
 
+    @abstractmethod
+    def find_all_by(self, attr_name, attr_value):
+        pass
+
+
+class AttributeIndex:
+    """Hash index from an attribute value to the objects holding it.
+
+    `attr_name` may be a dotted path such as 'owner.id'. A unique index
+    maps each value to one object and refuses a second one; a non-unique
+    index maps each value to {obj_id: obj}, kept in insertion order.
+    """
+
+    def __init__(self, attr_name, unique=False):
+        self.attr_name = attr_name
+        self.unique = unique
+        self.key_of = attrgetter(attr_name)
+        self._entries = {}
+
+    def check(self, obj, key=None):
+        """Raise ValueError if obj would break uniqueness"""
+        if not self.unique:
+            return
+        key = self.key_of(obj) if key is None else key
+        holder = self._entries.get(key)
+        if holder is not None and holder.id != obj.id:
+            raise ValueError(f"{self.attr_name} {key} already exists")
+
+    def insert(self, obj):
+        key = self.key_of(obj)
+        if self.unique:
+            self._entries[key] = obj
+        else:
+            self._entries.setdefault(key, {})[obj.id] = obj
+
+    def remove(self, obj, key):
+        if self.unique:
+            holder = self._entries.get(key)
+            if holder is not None and holder.id == obj.id:
+                del self._entries[key]
+            return
+        bucket = self._entries.get(key)
+        if bucket is not None:
+            bucket.pop(obj.id, None)
+            if not bucket:
+                del self._entries[key]
+
+    def lookup(self, value):
+        """Return the list of objects indexed under value"""
+        if self.unique:
+            obj = self._entries.get(value)
+            return [obj] if obj is not None else []
+        return list(self._entries.get(value, {}).values())
+
+    def first(self, value):
+        if self.unique:
+            return self._entries.get(value)
+        bucket = self._entries.get(value)
+        # The bucket may be emptied by a concurrent delete after this read
+        return next(iter(bucket.values()), None) if bucket else None
+
 
 class InMemoryRepository(Repository):
-    def __init__(self):
+    """Dict-backed repository with optional secondary indexes.
+
+    `indexes` maps attribute names (dotted paths allowed) to True for a
+    unique index or False for a non-unique one, e.g.
+    InMemoryRepository({'email': True}) or {'place.id': False}.
+    get_by_attribute and find_all_by use an index when one exists and
+    fall back to a scan otherwise. Indexed attributes must be changed
+    through update() (or the object passed to reindex()) so the indexes
+    follow.
+
+    `journal` is an optional DurableStore that is told about every
+    add/update/delete, see app/persistence/durable.py.
+    """
+
+    def __init__(self, indexes=None):
+        self.journal = None
         self._storage = {}
+        self._indexes = {}
+        self._keys = {}  # obj_id -> {attr_name: indexed key}, to find stale entries
+        for attr_name, unique in (indexes or {}).items():
+            self.create_index(attr_name, unique)
+
+    def create_index(self, attr_name, unique=False):
+        """Declare an index, filling it from the objects already stored"""
+        index = AttributeIndex(attr_name, unique)
+        for obj in self._storage.values():
+            index.check(obj)
+            index.insert(obj)
+        self._indexes[attr_name] = index
+        for obj_id, obj in self._storage.items():
+            self._keys[obj_id][attr_name] = index.key_of(obj)
+
+    def _index(self, obj):
+        keys = {}
+        for attr_name, index in self._indexes.items():
+            index.insert(obj)
+            keys[attr_name] = index.key_of(obj)
+        self._keys[obj.id] = keys
+
+    def _unindex(self, obj):
+        for attr_name, key in self._keys.pop(obj.id, {}).items():
+            self._indexes[attr_name].remove(obj, key)
 
     def add(self, obj):
+        for index in self._indexes.values():
+            index.check(obj)
         self._storage[obj.id] = obj
+        self._index(obj)
+        if self.journal:
+            self.journal.record_put(self, obj)
 
     def get(self, obj_id):
         return self._storage.get(obj_id)
@@ -39,14 +146,48 @@ class InMemoryRepository(Repository):
     def get_all(self):
         return list(self._storage.values())
 
+    def _values(self):
+        """Stored objects for a full scan"""
+        return self._storage.values()
+
     def update(self, obj_id, data):
         obj = self.get(obj_id)
         if obj:
+            previous = {key: getattr(obj, key) for key in data if hasattr(obj, key)}
             obj.update(data)
+            try:
+                self.reindex(obj)
+            except ValueError:
+                obj.update(previous)
+                raise
+            if self.journal:
+                self.journal.record_put(self, obj)
+
+    def reindex(self, obj):
+        """Bring the indexes up to date after obj's indexed attributes changed"""
+        for index in self._indexes.values():
+            index.check(obj)
+        self._unindex(obj)
+        self._index(obj)
 
     def delete(self, obj_id):
         if obj_id in self._storage:
+            self._unindex(self._storage[obj_id])
             del self._storage[obj_id]
+            if self.journal:
+                self.journal.record_delete(self, obj_id)
 
     def get_by_attribute(self, attr_name, attr_value):
-        return next((obj for obj in self._storage.values() if getattr(obj, attr_name) == attr_value), None)
\ No newline at end of file
+        index = self._indexes.get(attr_name)
+        if index is not None:
+            return index.first(attr_value)
+        key_of = attrgetter(attr_name)
+        return next((obj for obj in self._values() if key_of(obj) == attr_value), None)
+
+    def find_all_by(self, attr_name, attr_value):
+        """Return every object whose attribute equals attr_value"""
+        index = self._indexes.get(attr_name)
+        if index is not None:
+            return index.lookup(attr_value)
+        key_of = attrgetter(attr_name)
+        return [obj for obj in self._values() if key_of(obj) == attr_value]
@@ -0,0 +1,180 @@
+"""
+Thread-safe InMemoryRepository for multi-threaded servers.
+
+Writers lock only the stripes their change touches: one stripe for the
+object id and one for each (index, key) it is filed under, always taken
+in stripe order so two writers cannot deadlock. Writers on different
+objects and keys proceed in parallel; an add and a delete of the same
+unique email, or two updates of the same object, are serialized.
+
+The dict and index mutations themselves happen in a short critical
+section under a single publish lock, so readers never see an object
+stored but not yet indexed. Readers take no lock at all:
+    - get is a single dict lookup,
+    - get_all copies a cached tuple of the stored objects, rebuilt only
+      after an add or delete (copy-on-write), instead of reading the
+      storage dict while writers may be resizing it,
+    - index lookups read the index dicts directly.
+
+An update that changes an indexed attribute (say a user's email) cannot
+know its new keys before applying the change, so it takes every stripe.
+Such updates are rare compared with reads and plain updates.
+"""
+import threading
+from contextlib import contextmanager
+from app.persistence.repository import InMemoryRepository
+
+DEFAULT_STRIPES = 64
+
+
+class ConcurrentRepository(InMemoryRepository):
+    """InMemoryRepository safe to share between threads.
+
+    get_all returns a list, like InMemoryRepository, copied from a
+    snapshot shared between callers; it reflects every add and delete
+    that completed before the call.
+    """
+
+    def __init__(self, indexes=None, stripes=DEFAULT_STRIPES):
+        self._stripes = [threading.Lock() for _ in range(stripes)]
+        self._publish_lock = threading.Lock()
+        self._snapshot = ()
+        super().__init__(indexes)
+
+    # --- Locking ---
+    def _stripe_of(self, key):
+        return hash(key) % len(self._stripes)
+
+    def _acquire(self, keys):
+        stripes = sorted({self._stripe_of(key) for key in keys})
+        for stripe in stripes:
+            self._stripes[stripe].acquire()
+        return stripes
+
+    def _release(self, stripes):
+        for stripe in reversed(stripes):
+            self._stripes[stripe].release()
+
+    @contextmanager
+    def _locked(self, obj_id, extra_keys=()):
+        """Hold the stripes of obj_id and of every index key it is filed under"""
+        while True:
+            filed = self._keys.get(obj_id)
+            keys = [('id', obj_id), *(filed or {}).items(), *extra_keys]
+            stripes = self._acquire(keys)
+            # An index-changing update may have moved the object meanwhile
+            if self._keys.get(obj_id) == filed:
+                break
+            self._release(stripes)
+        try:
+            yield
+        finally:
+            self._release(stripes)
+
+    @contextmanager
+    def _all_locked(self):
+        stripes = self._acquire(range(len(self._stripes)))
+        try:
+            yield
+        finally:
+            self._release(stripes)
+
+    def _touches_index(self, data):
+        return any(attr_name.split('.')[0] in data for attr_name in self._indexes)
+
+    # --- Writes ---
+    def create_index(self, attr_name, unique=False):
+        with self._all_locked(), self._publish_lock:
+            super().create_index(attr_name, unique)
+
+    def add(self, obj):
+        keys = [(attr_name, index.key_of(obj)) for attr_name, index in self._indexes.items()]
+        with self._locked(obj.id, keys):
+            for index in self._indexes.values():
+                index.check(obj)
+            with self._publish_lock:
+                self._snapshot = None
+                self._storage[obj.id] = obj
+                self._index(obj)
+            if self.journal:
+                self.journal.record_put(self, obj)
+
+    def update(self, obj_id, data):
+        if self._touches_index(data):
+            with self._all_locked():
+                self._update(obj_id, data, reindex=True)
+        else:
+            with self._locked(obj_id):
+                self._update(obj_id, data, reindex=False)
+
+    def _update(self, obj_id, data, reindex):
+        obj = self.get(obj_id)
+        if not obj:
+            return
+        previous = {key: getattr(obj, key) for key in data if hasattr(obj, key)}
+        obj.update(data)
+        if reindex:
+            try:
+                for index in self._indexes.values():
+                    index.check(obj)
+            except ValueError:
+                obj.update(previous)
+                raise
+            with self._publish_lock:
+                self._unindex(obj)
+                self._index(obj)
+        if self.journal:
+            self.journal.record_put(self, obj)
+
+    def reindex(self, obj):
+        with self._all_locked():
+            for index in self._indexes.values():
+                index.check(obj)
+            with self._publish_lock:
+                self._unindex(obj)
+                self._index(obj)
+
+    def delete(self, obj_id):
+        with self._locked(obj_id):
+            if obj_id not in self._storage:
+                return
+            with self._publish_lock:
+                self._snapshot = None
+                self._unindex(self._storage[obj_id])
+                del self._storage[obj_id]
+            if self.journal:
+                self.journal.record_delete(self, obj_id)
+
+    # --- Reads ---
+    def get_all(self):
+        return list(self._values())
+
+    def _values(self):
+        """The shared snapshot tuple, built under the publish lock after a write"""
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+        with self._publish_lock:
+            if self._snapshot is None:
+                self._snapshot = tuple(self._storage.values())
+            return self._snapshot
+
+    def get_by_attribute(self, attr_name, attr_value):
+        index = self._indexes.get(attr_name)
+        if index is None:
+            return super().get_by_attribute(attr_name, attr_value)
+        while True:
+            try:
+                return index.first(attr_value)
+            except RuntimeError:
+                continue  # bucket changed while being read, look again
+
+    def find_all_by(self, attr_name, attr_value):
+        index = self._indexes.get(attr_name)
+        if index is None:
+            return super().find_all_by(attr_name, attr_value)
+        while True:
+            try:
+                return index.lookup(attr_value)
+            except RuntimeError:
+                continue  # bucket changed while being copied, look again
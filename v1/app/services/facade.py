@@ -1,4 +1,6 @@
-from app.persistence.repository import InMemoryRepository
+from app.persistence.striped import ConcurrentRepository
+from app.persistence.durable import DurableStore, DEFAULT_SNAPSHOT_EVERY
+from app.persistence.compact import CompactRepository, CompactRow
 from app.models.places import Place
 from app.models.users import User
 from app.models.reviews import Review
@@ -6,10 +8,54 @@ from app.models.amenity import Amenity
 
 class HBnBFacade:
     def __init__(self):
-        self.user_repo = InMemoryRepository()
-        self.place_repo = InMemoryRepository()
-        self.review_repo = InMemoryRepository()
-        self.amenity_repo = InMemoryRepository()
+        # Secondary indexes (True = unique) for the lookups below; the
+        # repositories are shared by the threads of the WSGI server
+        self.user_repo = ConcurrentRepository({'email': True})
+        self.place_repo = ConcurrentRepository({'owner.id': False})
+        self.review_repo = ConcurrentRepository({'place.id': False, 'user.id': False})
+        self.amenity_repo = ConcurrentRepository()
+        self.store = None
+        self.compact = False
+
+    def use_compact_storage(self):
+        """Keep entities in column-oriented CompactRepositories instead of model objects.
+
+        Must be chosen before any data is stored, and cannot be combined
+        with persistence. Lookups then return read-only CompactRow views.
+        """
+        if self.store is not None:
+            raise ValueError("Compact storage cannot be combined with persistence")
+        if any(repo.get_all() for repo in (self.user_repo, self.place_repo, self.review_repo, self.amenity_repo)):
+            raise ValueError("Compact storage must be chosen before any data is stored")
+        self.user_repo = CompactRepository(User, {'email': True})
+        self.amenity_repo = CompactRepository(Amenity)
+        self.place_repo = CompactRepository(
+            Place, {'owner.id': False},
+            related={'owner': ('owner_id', self.user_repo), 'amenities': ('amenity_ids', self.amenity_repo)})
+        self.review_repo = CompactRepository(
+            Review, {'place.id': False, 'user.id': False},
+            related={'place': ('place_id', self.place_repo), 'user': ('user_id', self.user_repo)})
+        self.compact = True
+
+    @staticmethod
+    def _entity(obj):
+        """The model instance for a stored entity, rebuilt when it is a compact row"""
+        return obj.to_model() if isinstance(obj, CompactRow) else obj
+
+    def enable_persistence(self, directory, snapshot_every=DEFAULT_SNAPSHOT_EVERY, fsync=False):
+        """Load saved data from directory and log every later change there"""
+        if self.compact:
+            raise ValueError("Persistence cannot be combined with compact storage")
+        self.store = DurableStore(
+            directory,
+            {'users': self.user_repo, 'amenities': self.amenity_repo,
+             'places': self.place_repo, 'reviews': self.review_repo},
+            {'users': User, 'amenities': Amenity, 'places': Place, 'reviews': Review},
+            snapshot_every=snapshot_every,
+            fsync=fsync,
+        )
+        self.store.load()
+        return self.store
 
     # --- CRU User ---
     def create_user(self, user_data):
@@ -44,7 +90,7 @@ class HBnBFacade:
             amenity = self.amenity_repo.get(amenity_id)
             if not amenity:
                 raise ValueError(f"Amenity with ID {amenity_id} not found")
-            amenity_objects.append(amenity)
+            amenity_objects.append(self._entity(amenity))
 
         # 3. Create the place with actual objects (not IDs)
         place = Place(
@@ -53,7 +99,7 @@ class HBnBFacade:
             price=place_data['price'],
             latitude=place_data['latitude'],
             longitude=place_data['longitude'],
-            owner=owner  # Pass the actual User object
+            owner=self._entity(owner)  # Pass the actual User object
         )
 
         # 4. Add amenities to the place
@@ -78,6 +124,9 @@ class HBnBFacade:
             raise ValueError ("Places not found")
         return self.place_repo.get_all()
 
+    def get_places_by_owner(self, owner_id):
+        return self.place_repo.find_all_by('owner.id', owner_id)
+
     def update_place(self, place_id, place_data):
         # Check if place_id already exists
         check_id = self.place_repo.get(place_id)
@@ -146,8 +195,8 @@ class HBnBFacade:
         review = Review(
             text=review_data['text'],
             rating=rating,
-            place=place,
-            user=user
+            place=self._entity(place),
+            user=self._entity(user)
         )
 
         self.review_repo.add(review)
@@ -160,7 +209,7 @@ class HBnBFacade:
         return self.review_repo.get_all()
 
     def get_reviews_by_place(self, place_id):
-        return [review for review in self.review_repo.get_all() if review.place.id == place_id]
+        return self.review_repo.find_all_by('place.id', place_id)
 
     def update_review(self, review_id, review_data):
         review = self.review_repo.get(review_id)
@@ -168,15 +217,18 @@ class HBnBFacade:
             return None
 
         # Only updates change for text and rating
+        changes = {}
         if 'rating' in review_data:
             new_rating = review_data['rating']
             if not isinstance(new_rating, (int, float)) or not (1 <= new_rating <= 5):
                 raise ValueError("Rating must be between 1 and 5")
-            review.rating = new_rating
+            changes['rating'] = new_rating
 
         if 'text' in review_data:
-            review.text = review_data['text']
+            changes['text'] = review_data['text']
 
+        # Through the repository so the change reaches the log when persistence is on
+        self.review_repo.update(review_id, changes)
         return review
 
     def delete_review(self, review_id):
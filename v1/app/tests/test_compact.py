@@ -0,0 +1,200 @@
+#!/usr/bin/python3
+"""
+Unit tests for the slotted models and the column-oriented CompactRepository
+Run from project root with:
+python3 -m app.tests.test_compact
+"""
+import unittest
+from datetime import datetime
+from app.models.users import User
+from app.models.amenity import Amenity
+from app.models.places import Place
+from app.models.reviews import Review
+from app.persistence.compact import CompactRepository, CompactRow
+from app.services.facade import HBnBFacade
+from app.api.v1.places import serialize_place
+from app.api.v1.reviews import serialize_review
+import memory_benchmark
+
+
+class TestSlottedModels(unittest.TestCase):
+
+    def test_models_have_no_instance_dict(self):
+        owner = User('John', 'Doe', 'john@example.com')
+        place = Place('Cozy Cabin', 'Nice', 100.0, 45.0, -122.0, owner)
+        review = Review('Great', 5, place, owner)
+        for obj in (owner, Amenity('WiFi'), place, review):
+            self.assertFalse(hasattr(obj, '__dict__'))
+        with self.assertRaises(AttributeError):
+            owner.nickname = 'JD'
+
+    def test_repeated_names_share_one_string(self):
+        first = User('Alice', 'Martin', 'a1@example.com')
+        second = User(''.join(['Ali', 'ce']), 'Martin ', 'a2@example.com')
+        self.assertIs(first.first_name, second.first_name)
+        self.assertIs(first.last_name, second.last_name)
+
+
+class TestCompactRepository(unittest.TestCase):
+
+    def setUp(self):
+        self.owner = User('John', 'Doe', 'john@example.com')
+        self.wifi = Amenity('WiFi')
+        self.place = Place('Cozy Cabin', 'Nice', 100.0, 45.0, -122.0, self.owner)
+        self.place.add_amenity(self.wifi)
+        self.places = CompactRepository(Place)
+        self.places.add(self.place)
+
+    def test_row_reads_back_values_and_ids(self):
+        row = self.places.get(self.place.id)
+        self.assertIsInstance(row, CompactRow)
+        self.assertEqual(row.id, self.place.id)
+        self.assertEqual(row.title, 'Cozy Cabin')
+        self.assertEqual(row.price, 100.0)
+        self.assertEqual(row.owner_id, self.owner.id)
+        self.assertEqual(row.amenity_ids, (self.wifi.id,))
+        self.assertIsInstance(row.created_at, datetime)
+        with self.assertRaises(AttributeError):
+            row.owner
+
+    def test_numeric_columns_are_arrays(self):
+        self.assertEqual(self.places.column('price').typecode, 'd')
+        self.assertEqual(list(self.places.column('latitude')), [45.0])
+
+    def test_update_uses_model_validation(self):
+        self.places.update(self.place.id, {'price': 80, 'title': '  Renovated  '})
+        row = self.places.get(self.place.id)
+        self.assertEqual(row.price, 80.0)
+        self.assertEqual(row.title, 'Renovated')
+        with self.assertRaises(ValueError):
+            self.places.update(self.place.id, {'price': -1})
+        self.assertEqual(row.price, 80.0)
+
+    def test_lookups_and_delete(self):
+        other = Place('Beach House', 'Sunny', 200.0, 10.0, 20.0, self.owner)
+        self.places.add(other)
+        self.assertEqual({row.id for row in self.places.find_all_by('owner_id', self.owner.id)},
+                         {self.place.id, other.id})
+        self.places.delete(self.place.id)
+        self.assertIsNone(self.places.get(self.place.id))
+        self.assertEqual([row.id for row in self.places.get_all()], [other.id])
+        self.assertEqual(self.places.get_by_attribute('title', 'Beach House').id, other.id)
+        self.assertIsNone(self.places.get_by_attribute('title', 'Cozy Cabin'))
+        self.assertEqual(len(self.places), 1)
+
+    def test_duplicate_id_rejected(self):
+        with self.assertRaises(ValueError):
+            self.places.add(self.place)
+
+    def test_deleted_rows_are_reused(self):
+        stale = self.places.get(self.place.id)
+        self.places.delete(self.place.id)
+        other = Place('Beach House', 'Sunny', 200.0, 10.0, 20.0, self.owner)
+        self.places.add(other)
+        self.assertEqual(len(self.places.column('id')), 1)
+        self.assertEqual(self.places.get(other.id).title, 'Beach House')
+        # A view of the deleted place does not show the place that took its row
+        with self.assertRaises(LookupError):
+            stale.title
+
+    def test_indexes(self):
+        users = CompactRepository(User, {'email': True})
+        users.add(self.owner)
+        with self.assertRaises(ValueError):
+            users.add(User('Jane', 'Doe', 'john@example.com'))
+        jane = User('Jane', 'Doe', 'jane@example.com')
+        users.add(jane)
+        with self.assertRaises(ValueError):
+            users.update(jane.id, {'email': 'john@example.com'})
+        users.update(jane.id, {'email': 'jane.doe@example.com'})
+        self.assertIsNone(users.get_by_attribute('email', 'jane@example.com'))
+        self.assertEqual(users.get_by_attribute('email', 'jane.doe@example.com').id, jane.id)
+        users.delete(self.owner.id)
+        users.add(User('John', 'Roe', 'john@example.com'))
+        self.assertEqual(users.get_by_attribute('email', 'john@example.com').last_name, 'Roe')
+
+    def test_related_rows(self):
+        users, amenities = CompactRepository(User), CompactRepository(Amenity)
+        users.add(self.owner)
+        amenities.add(self.wifi)
+        places = CompactRepository(Place, {'owner.id': False},
+                                   related={'owner': ('owner_id', users), 'amenities': ('amenity_ids', amenities)})
+        places.add(self.place)
+        row = places.get(self.place.id)
+        self.assertEqual(row.owner.email, 'john@example.com')
+        self.assertEqual([amenity.name for amenity in row.amenities], ['WiFi'])
+        self.assertEqual([row.id for row in places.find_all_by('owner.id', self.owner.id)], [self.place.id])
+
+        place = row.to_model()
+        self.assertIsInstance(place, Place)
+        self.assertIsInstance(place.owner, User)
+        self.assertEqual((place.title, place.price, place.owner.id), ('Cozy Cabin', 100.0, self.owner.id))
+        self.assertEqual(place.created_at, row.created_at)
+        self.assertEqual(place.reviews, [])
+
+
+class TestCompactFacade(unittest.TestCase):
+
+    def setUp(self):
+        self.facade = HBnBFacade()
+        self.facade.use_compact_storage()
+
+    def test_end_to_end(self):
+        owner = self.facade.create_user({'first_name': 'John', 'last_name': 'Doe', 'email': 'john@example.com'})
+        guest = self.facade.create_user({'first_name': 'Jane', 'last_name': 'Roe', 'email': 'jane@example.com'})
+        wifi = self.facade.create_amenity({'name': 'WiFi'})
+        place = self.facade.create_place({'title': 'Cozy Cabin', 'price': 100.0, 'latitude': 45.0,
+                                          'longitude': -122.0, 'owner_id': owner.id, 'amenities': [wifi.id]})
+        self.assertIsInstance(self.facade.get_place(place.id), CompactRow)
+        self.assertEqual(serialize_place(self.facade.get_place(place.id))['owner_id'], owner.id)
+        self.assertEqual([p.id for p in self.facade.get_places_by_owner(owner.id)], [place.id])
+
+        review = self.facade.create_review({'text': 'Great', 'rating': 5, 'place_id': place.id,
+                                            'user_id': guest.id})
+        self.facade.update_review(review.id, {'rating': 4})
+        [stored] = self.facade.get_reviews_by_place(place.id)
+        self.assertEqual(serialize_review(stored)['user_id'], guest.id)
+        self.assertEqual(stored.rating, 4)
+        self.assertEqual(self.facade.get_user_by_email('jane@example.com').id, guest.id)
+
+    def test_update_related(self):
+        """A place update replaces its owner and amenities as in object mode"""
+        owner = self.facade.create_user({'first_name': 'John', 'last_name': 'Doe', 'email': 'john@example.com'})
+        buyer = self.facade.create_user({'first_name': 'Jane', 'last_name': 'Roe', 'email': 'jane@example.com'})
+        wifi = self.facade.create_amenity({'name': 'WiFi'})
+        pool = self.facade.create_amenity({'name': 'Pool'})
+        place = self.facade.create_place({'title': 'Cozy Cabin', 'price': 100.0, 'latitude': 45.0,
+                                          'longitude': -122.0, 'owner_id': owner.id, 'amenities': [wifi.id]})
+
+        updated = self.facade.update_place(place.id, {'amenities': [pool.id, wifi], 'owner': buyer})
+        self.assertEqual(serialize_place(updated)['amenities'], [pool.id, wifi.id])
+        self.assertEqual(updated.owner.id, buyer.id)
+        self.assertEqual(self.facade.get_places_by_owner(owner.id), [])
+        self.assertEqual([p.id for p in self.facade.get_places_by_owner(buyer.id)], [place.id])
+        self.facade.update_place(place.id, {'amenities': []})
+        self.assertEqual(self.facade.get_place(place.id).amenities, [])
+
+        for bad in ({'amenities': ['missing']}, {'owner': 'missing'}, {'owner': [buyer.id]}, {'amenities': wifi.id}):
+            with self.assertRaises(ValueError):
+                self.facade.update_place(place.id, bad)
+        self.assertEqual(self.facade.get_place(place.id).owner.id, buyer.id)
+
+    def test_chosen_before_data(self):
+        self.facade.create_user({'first_name': 'John', 'last_name': 'Doe', 'email': 'john@example.com'})
+        with self.assertRaises(ValueError):
+            self.facade.use_compact_storage()
+        with self.assertRaises(ValueError):
+            self.facade.enable_persistence('unused')
+
+
+class TestMemoryBenchmark(unittest.TestCase):
+
+    def test_compact_layouts_use_less_memory(self):
+        report = memory_benchmark.run({'users': 200, 'amenities': 10, 'places': 300, 'reviews': 600})
+        per_entity = {result['layout']: result['bytes_per_entity'] for result in report['results']}
+        self.assertLess(per_entity['slots'], per_entity['dict'])
+        self.assertLess(per_entity['compact'], per_entity['slots'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,198 @@
+#!/usr/bin/python3
+"""
+Multi-threaded stress tests for ConcurrentRepository
+Run from project root with:
+python3 -m app.tests.test_concurrency
+"""
+import threading
+import unittest
+from app.models.users import User
+from app.persistence.repository import AttributeIndex
+from app.persistence.striped import ConcurrentRepository
+import concurrency_benchmark
+
+THREADS = 8
+
+
+def run_threads(target, count=THREADS):
+    """Start count threads on target(i) together and wait for all of them"""
+    barrier = threading.Barrier(count)
+    errors = []
+
+    def run(i):
+        barrier.wait()
+        try:
+            target(i)
+        except Exception as e:  # surfaced by the test below
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors
+
+
+class TestConcurrentRepository(unittest.TestCase):
+
+    def setUp(self):
+        self.users = ConcurrentRepository({'email': True}, stripes=8)
+
+    def assertIndexConsistent(self):
+        stored = self.users.get_all()
+        for user in stored:
+            self.assertIs(self.users.get_by_attribute('email', user.email), user)
+        self.assertEqual(len(self.users._indexes['email']._entries), len(stored))
+
+    # ==================== SINGLE THREAD ====================
+
+    def test_behaves_like_in_memory_repository(self):
+        john = User('John', 'Doe', 'john@example.com')
+        self.users.add(john)
+        self.assertIs(self.users.get(john.id), john)
+        self.assertEqual(self.users.get_all(), [john])
+
+        self.users.update(john.id, {'email': 'johnny@example.com'})
+        self.assertIs(self.users.get_by_attribute('email', 'johnny@example.com'), john)
+        self.assertIsNone(self.users.get_by_attribute('email', 'john@example.com'))
+
+        jane = User('Jane', 'Smith', 'jane@example.com')
+        self.users.add(jane)
+        with self.assertRaises(ValueError):
+            self.users.update(jane.id, {'email': 'johnny@example.com'})
+        self.assertEqual(jane.email, 'jane@example.com')
+
+        self.users.delete(john.id)
+        self.assertEqual(self.users.get_all(), [jane])
+        self.assertIndexConsistent()
+
+    def test_get_all_snapshot_is_reused_until_a_write(self):
+        self.users.add(User('John', 'Doe', 'john@example.com'))
+        first = self.users.get_all()
+        snapshot = self.users._snapshot
+        self.assertIsInstance(first, list)
+        first.clear()  # callers get their own list
+        self.assertEqual(len(self.users.get_all()), 1)
+        self.assertIs(self.users._snapshot, snapshot)
+        self.users.add(User('Jane', 'Smith', 'jane@example.com'))
+        self.assertEqual(len(self.users.get_all()), 2)
+        self.assertIsNot(self.users._snapshot, snapshot)
+
+    def test_reads_take_no_lock(self):
+        """get, get_all and index lookups finish while every lock is held by a writer"""
+        john = User('John', 'Doe', 'john@example.com')
+        self.users.add(john)
+        self.users.get_all()  # build the snapshot
+        results = []
+
+        def read():
+            results.append((self.users.get(john.id), self.users.get_all(),
+                            self.users.get_by_attribute('email', john.email),
+                            self.users.find_all_by('email', john.email)))
+
+        with self.users._all_locked(), self.users._publish_lock:
+            reader = threading.Thread(target=read)
+            reader.start()
+            reader.join(5)
+            self.assertFalse(reader.is_alive())
+        self.assertEqual(results, [(john, [john], john, [john])])
+
+    def test_first_survives_emptied_bucket(self):
+        """A non-unique lookup racing with the delete of the bucket's last object returns None"""
+        index = AttributeIndex('last_name')
+
+        class Emptied(dict):
+            def __bool__(self):
+                return True  # seen as non-empty, then emptied before it is read
+
+        index._entries['Doe'] = Emptied()
+        self.assertIsNone(index.first('Doe'))
+
+    # ==================== STRESS ====================
+
+    def test_unique_index_under_concurrent_adds(self):
+        """Every thread races to claim the same 50 emails; each is won exactly once"""
+        rejected = []
+
+        def claim(i):
+            for n in range(50):
+                try:
+                    self.users.add(User('User', str(i), f"shared{n}@example.com"))
+                except ValueError:
+                    rejected.append(n)
+
+        self.assertEqual(run_threads(claim), [])
+        self.assertEqual(len(self.users.get_all()), 50)
+        self.assertEqual(len(rejected), 50 * (THREADS - 1))
+        self.assertIndexConsistent()
+
+    def test_concurrent_email_changes_keep_index_consistent(self):
+        users = [User('User', str(i), f"user{i}@example.com") for i in range(40)]
+        for user in users:
+            self.users.add(user)
+
+        def churn(i):
+            for n in range(200):
+                user = users[(i * 7 + n) % len(users)]
+                try:
+                    self.users.update(user.id, {'email': f"u{(i + n) % 60}@example.com"})
+                except ValueError:
+                    pass  # taken by another user right now
+
+        self.assertEqual(run_threads(churn), [])
+        self.assertIndexConsistent()
+
+    def test_reads_observe_writes_in_order(self):
+        """A single writer adds users 0..n in order while readers check every view is a prefix"""
+        added = [User('User', str(i), f"seq{i}@example.com") for i in range(500)]
+        position = {user.id: i for i, user in enumerate(added)}
+        violations = []
+        done = threading.Event()
+
+        def write(_):
+            for user in added:
+                self.users.add(user)
+            done.set()
+
+        def read(_):
+            while not done.is_set():
+                seen = sorted(position[user.id] for user in self.users.get_all())
+                if seen != list(range(len(seen))):
+                    violations.append('get_all is not a prefix')
+                latest = added[seen[-1] + 1] if seen and seen[-1] + 1 < len(added) else None
+                # Once a get observes an add, every later get_all must include it
+                if latest is not None and self.users.get(latest.id) is latest:
+                    if latest not in self.users.get_all():
+                        violations.append('get_all missed an add already visible to get')
+
+        def role(i):
+            (write if i == 0 else read)(i)
+
+        self.assertEqual(run_threads(role, count=4), [])
+        self.assertEqual(violations, [])
+        self.assertEqual(len(self.users.get_all()), len(added))
+
+    def test_adds_and_deletes_on_many_threads(self):
+        def add_delete(i):
+            for n in range(300):
+                user = User('Temp', str(i), f"t{i}-{n}@example.com")
+                self.users.add(user)
+                if n % 3:
+                    self.users.delete(user.id)
+
+        self.assertEqual(run_threads(add_delete), [])
+        self.assertEqual(len(self.users.get_all()), THREADS * 100)
+        self.assertIndexConsistent()
+
+
+class TestConcurrencyBenchmark(unittest.TestCase):
+
+    def test_both_repositories_stay_consistent(self):
+        for name in concurrency_benchmark.REPOSITORIES:
+            result = concurrency_benchmark.run(name, threads=4, ops=4000, users=200)
+            self.assertTrue(result['consistent'], name)
+
+
+if __name__ == '__main__':
+    unittest.main()
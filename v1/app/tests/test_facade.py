@@ -230,6 +230,32 @@ class TestHBnBFacade(unittest.TestCase):
         else:
             self.fail("Updated place should have been found")
 
+    def test_get_places_by_owner(self):
+        """Test listing the places of one owner"""
+        alice = self.facade.create_user({
+            'first_name': 'Alice',
+            'last_name': 'Smith',
+            'email': 'alice@example.com'
+        })
+        bob = self.facade.create_user({
+            'first_name': 'Bob',
+            'last_name': 'Jones',
+            'email': 'bob@example.com'
+        })
+        place_data = {
+            'description': 'A nice place',
+            'price': 100.0,
+            'latitude': 37.7749,
+            'longitude': -122.4194,
+            'amenities': []
+        }
+        flat = self.facade.create_place(dict(place_data, title='Flat', owner_id=alice.id))
+        self.facade.create_place(dict(place_data, title='Barn', owner_id=bob.id))
+        loft = self.facade.create_place(dict(place_data, title='Loft', owner_id=alice.id))
+
+        self.assertEqual(self.facade.get_places_by_owner(alice.id), [flat, loft])
+        self.assertEqual(self.facade.get_places_by_owner('unknown'), [])
+
     def test_create_place_with_invalid_owner(self):
         """Test creating a place with non-existent owner"""
         place_data = {
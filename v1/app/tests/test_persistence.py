@@ -0,0 +1,129 @@
+#!/usr/bin/python3
+"""
+Unit tests for the snapshot + write-ahead log persistence
+Run from project root with:
+python3 -m app.tests.test_persistence
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from app.services.facade import HBnBFacade
+from app.persistence.durable import SNAPSHOT_NAME, wal_name
+
+
+class TestDurableStore(unittest.TestCase):
+
+    def setUp(self):
+        """Fresh data directory and a facade logging into it"""
+        self.directory = tempfile.mkdtemp()
+        self.facade = self.open_facade()
+
+    def tearDown(self):
+        for facade in (self.facade, getattr(self, 'reloaded', None)):
+            if facade is not None and facade.store is not None:
+                facade.store.close()
+        shutil.rmtree(self.directory)
+
+    def open_facade(self, snapshot_every=1000):
+        facade = HBnBFacade()
+        facade.enable_persistence(self.directory, snapshot_every=snapshot_every)
+        return facade
+
+    def reload(self):
+        """Close the current store and load the directory into a new facade"""
+        self.facade.store.close()
+        self.reloaded = self.open_facade()
+        return self.reloaded
+
+    def seed(self):
+        owner = self.facade.create_user({'first_name': 'John', 'last_name': 'Doe', 'email': 'john@example.com'})
+        guest = self.facade.create_user({'first_name': 'Jane', 'last_name': 'Smith', 'email': 'jane@example.com'})
+        wifi = self.facade.create_amenity({'name': 'WiFi'})
+        place = self.facade.create_place({
+            'title': 'Cozy Cabin', 'price': 100.0, 'latitude': 45.0, 'longitude': -122.0,
+            'owner_id': owner.id, 'amenities': [wifi.id],
+        })
+        review = self.facade.create_review({'user_id': guest.id, 'place_id': place.id, 'rating': 4, 'text': 'Lovely'})
+        return owner, guest, wifi, place, review
+
+    # ==================== RELOAD TESTS ====================
+
+    def test_reload_restores_entities_and_references(self):
+        owner, guest, wifi, place, review = self.seed()
+        facade = self.reload()
+
+        loaded_place = facade.get_place(place.id)
+        self.assertEqual(loaded_place.title, 'Cozy Cabin')
+        self.assertIs(loaded_place.owner, facade.get_user(owner.id))
+        self.assertIs(loaded_place.amenities[0], facade.get_amenity(wifi.id))
+        loaded_review = facade.get_review(review.id)
+        self.assertIs(loaded_review.place, loaded_place)
+        self.assertIs(loaded_review.user, facade.get_user(guest.id))
+        self.assertEqual(loaded_review.rating, 4)
+
+    def test_indexes_work_after_reload(self):
+        owner, guest, wifi, place, review = self.seed()
+        facade = self.reload()
+
+        self.assertEqual(facade.get_user_by_email('jane@example.com').id, guest.id)
+        self.assertEqual([p.id for p in facade.get_places_by_owner(owner.id)], [place.id])
+        self.assertEqual([r.id for r in facade.get_reviews_by_place(place.id)], [review.id])
+
+    def test_updates_and_deletes_replay(self):
+        owner, guest, wifi, place, review = self.seed()
+        self.facade.update_place(place.id, {'price': 80.0})
+        self.facade.update_review(review.id, {'rating': 2, 'text': 'Noisy'})
+        self.facade.delete_review(review.id)
+        facade = self.reload()
+
+        self.assertEqual(facade.get_place(place.id).price, 80.0)
+        self.assertIsNone(facade.get_review(review.id))
+        self.assertEqual(facade.get_reviews_by_place(place.id), [])
+
+    # ==================== COMPACTION TESTS ====================
+
+    def test_snapshot_replaces_old_log(self):
+        owner, guest, wifi, place, review = self.seed()
+        old_log = os.path.join(self.directory, wal_name(self.facade.store.generation))
+        self.facade.store.snapshot()
+        self.facade.update_place(place.id, {'title': 'Renovated Cabin'})
+
+        self.assertTrue(os.path.exists(os.path.join(self.directory, SNAPSHOT_NAME)))
+        self.assertFalse(os.path.exists(old_log))
+        facade = self.reload()
+        self.assertEqual(facade.get_place(place.id).title, 'Renovated Cabin')
+        self.assertIs(facade.get_review(review.id).place, facade.get_place(place.id))
+
+    def test_automatic_snapshot(self):
+        self.facade.store.close()
+        self.facade = self.open_facade(snapshot_every=3)
+        owner, guest, wifi, place, review = self.seed()
+
+        self.assertTrue(os.path.exists(os.path.join(self.directory, SNAPSHOT_NAME)))
+        facade = self.reload()
+        self.assertEqual(len(facade.get_all_places()), 1)
+        self.assertIsNotNone(facade.get_review(review.id))
+
+    # ==================== CRASH TESTS ====================
+
+    def test_torn_tail_is_dropped(self):
+        owner, guest, wifi, place, review = self.seed()
+        log = os.path.join(self.directory, wal_name(self.facade.store.generation))
+        self.facade.store.close()
+        with open(log, 'ab') as f:
+            f.write(b'\x40\x00\x00\x00partial')
+
+        facade = self.reloaded = self.open_facade()
+        self.assertIsNotNone(facade.get_review(review.id))
+        later = facade.create_user({'first_name': 'Bob', 'last_name': 'Wilson', 'email': 'bob@example.com'})
+        facade.store.close()
+
+        again = HBnBFacade()
+        again.enable_persistence(self.directory)
+        self.addCleanup(again.store.close)
+        self.assertEqual(again.get_user(later.id).email, 'bob@example.com')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/python3
+"""
+Unit tests for InMemoryRepository and its secondary indexes
+Run from project root with:
+python3 -m app.tests.test_repository
+"""
+import unittest
+from app.persistence.repository import InMemoryRepository
+from app.models.users import User
+from app.models.places import Place
+from app.models.reviews import Review
+
+
+class TestInMemoryRepositoryIndexes(unittest.TestCase):
+
+    def setUp(self):
+        """Fresh repositories with the same indexes as the facade"""
+        self.users = InMemoryRepository({'email': True})
+        self.reviews = InMemoryRepository({'place.id': False, 'user.id': False})
+        self.john = User('John', 'Doe', 'john@example.com')
+        self.jane = User('Jane', 'Smith', 'jane@example.com')
+        self.users.add(self.john)
+        self.users.add(self.jane)
+        self.place = Place('Cozy Cabin', 'Nice', 100.0, 45.0, -122.0, self.john)
+
+    # ==================== UNIQUE INDEX TESTS ====================
+
+    def test_unique_lookup(self):
+        self.assertIs(self.users.get_by_attribute('email', 'jane@example.com'), self.jane)
+        self.assertIsNone(self.users.get_by_attribute('email', 'nobody@example.com'))
+        self.assertEqual(self.users.find_all_by('email', 'john@example.com'), [self.john])
+
+    def test_unique_rejects_duplicate(self):
+        with self.assertRaises(ValueError):
+            self.users.add(User('Other', 'John', 'john@example.com'))
+        self.assertEqual(len(self.users.get_all()), 2)
+
+    def test_update_moves_index_entry(self):
+        self.users.update(self.john.id, {'email': 'johnny@example.com'})
+        self.assertIsNone(self.users.get_by_attribute('email', 'john@example.com'))
+        self.assertIs(self.users.get_by_attribute('email', 'johnny@example.com'), self.john)
+
+    def test_update_conflict_rolls_back(self):
+        with self.assertRaises(ValueError):
+            self.users.update(self.john.id, {'email': 'jane@example.com'})
+        self.assertEqual(self.john.email, 'john@example.com')
+        self.assertIs(self.users.get_by_attribute('email', 'john@example.com'), self.john)
+        self.assertIs(self.users.get_by_attribute('email', 'jane@example.com'), self.jane)
+
+    def test_delete_frees_value(self):
+        self.users.delete(self.john.id)
+        self.assertIsNone(self.users.get_by_attribute('email', 'john@example.com'))
+        self.users.add(User('New', 'John', 'john@example.com'))
+
+    # ==================== NON-UNIQUE INDEX TESTS ====================
+
+    def test_find_all_by_dotted_path(self):
+        other_place = Place('Castle', 'Big', 300.0, 48.0, 2.0, self.jane)
+        first = Review('Great', 5, self.place, self.jane)
+        second = Review('Fine', 3, self.place, self.john)
+        third = Review('Grand', 4, other_place, self.john)
+        for review in (first, second, third):
+            self.reviews.add(review)
+
+        self.assertEqual(self.reviews.find_all_by('place.id', self.place.id), [first, second])
+        self.assertEqual(self.reviews.find_all_by('user.id', self.john.id), [second, third])
+        self.assertIs(self.reviews.get_by_attribute('place.id', other_place.id), third)
+
+        self.reviews.delete(second.id)
+        self.assertEqual(self.reviews.find_all_by('place.id', self.place.id), [first])
+        self.assertEqual(self.reviews.find_all_by('user.id', 'unknown'), [])
+
+    def test_create_index_backfills(self):
+        repo = InMemoryRepository()
+        repo.add(self.john)
+        repo.add(self.jane)
+        repo.create_index('last_name')
+        self.assertEqual(repo.find_all_by('last_name', 'Smith'), [self.jane])
+
+    def test_unindexed_attribute_scans(self):
+        self.assertIs(self.users.get_by_attribute('first_name', 'Jane'), self.jane)
+        self.assertEqual(self.users.find_all_by('last_name', 'Doe'), [self.john])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Concurrency benchmark for the v1 repositories
+
+Runs the same multi-threaded mix of reads and writes against
+    global:  InMemoryRepository behind one lock, the simplest safe option
+    striped: ConcurrentRepository (lock striping, lock-free reads,
+             copy-on-write get_all)
+and reports operations per second, then checks that both ended in a
+consistent state (every stored user is found through the email index).
+
+Usage:
+    python concurrency_benchmark.py [--threads N] [--ops N] [--users N]
+        [--mix get=60,get_all=5,email=15,update=15,add_delete=5] [--seed N]
+"""
+
+import argparse
+import random
+import threading
+import time
+
+from app.models.users import User
+from app.persistence.repository import InMemoryRepository
+from app.persistence.striped import ConcurrentRepository
+
+DEFAULT_MIX = {'get': 60, 'get_all': 5, 'email': 15, 'update': 15, 'add_delete': 5}
+
+
+class GlobalLockRepository(InMemoryRepository):
+    """InMemoryRepository with every operation behind one lock"""
+
+    def __init__(self, indexes=None):
+        self._lock = threading.RLock()
+        super().__init__(indexes)
+
+    def add(self, obj):
+        with self._lock:
+            super().add(obj)
+
+    def get(self, obj_id):
+        with self._lock:
+            return super().get(obj_id)
+
+    def get_all(self):
+        with self._lock:
+            return super().get_all()
+
+    def update(self, obj_id, data):
+        with self._lock:
+            super().update(obj_id, data)
+
+    def delete(self, obj_id):
+        with self._lock:
+            super().delete(obj_id)
+
+    def get_by_attribute(self, attr_name, attr_value):
+        with self._lock:
+            return super().get_by_attribute(attr_name, attr_value)
+
+
+REPOSITORIES = {'global': GlobalLockRepository, 'striped': ConcurrentRepository}
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        if name not in DEFAULT_MIX:
+            raise ValueError(f"Unknown operation {name}, expected one of {', '.join(DEFAULT_MIX)}")
+        mix[name] = int(weight)
+    return mix
+
+
+def seed_users(repo, count):
+    users = [User('Bench', 'User', f"user{i}@example.com") for i in range(count)]
+    for user in users:
+        repo.add(user)
+    return users
+
+
+def worker(repo, users, operations, seed, barrier):
+    rng = random.Random(seed)
+    names, weights = zip(*operations['mix'].items())
+    barrier.wait()
+    for n, op in enumerate(rng.choices(names, weights, k=operations['count'])):
+        user = rng.choice(users)
+        if op == 'get':
+            repo.get(user.id)
+        elif op == 'get_all':
+            len(repo.get_all())
+        elif op == 'email':
+            repo.get_by_attribute('email', user.email)
+        elif op == 'update':
+            repo.update(user.id, {'first_name': f"Name{n % 10}"})
+        else:
+            extra = User('Temp', 'User', f"temp-{seed}-{n}@example.com")
+            repo.add(extra)
+            repo.delete(extra.id)
+
+
+def consistent(repo):
+    """Every stored user is reachable through the email index and nothing else is"""
+    stored = repo.get_all()
+    return (all(repo.get_by_attribute('email', user.email) is user for user in stored)
+            and sum(len(index._entries) for index in repo._indexes.values()) == len(stored))
+
+
+def run(name, threads=8, ops=20000, users=1000, mix=None, seed=42):
+    """Run one repository through the mix and return throughput and consistency"""
+    repo = REPOSITORIES[name]({'email': True})
+    seeded = seed_users(repo, users)
+    operations = {'mix': mix or DEFAULT_MIX, 'count': ops // threads}
+    barrier = threading.Barrier(threads + 1)
+    pool = [threading.Thread(target=worker, args=(repo, seeded, operations, seed + i, barrier))
+            for i in range(threads)]
+    for thread in pool:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    total = operations['count'] * threads
+    return {'repository': name, 'ops': total, 'seconds': round(elapsed, 3),
+            'ops_per_second': round(total / elapsed), 'consistent': consistent(repo)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare repository throughput under threads')
+    parser.add_argument('--threads', type=int, default=8, help='Worker threads')
+    parser.add_argument('--ops', type=int, default=200000, help='Operations in total')
+    parser.add_argument('--users', type=int, default=5000, help='Users stored before the run')
+    parser.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX, help='Operation weights, name=weight,...')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    args = parser.parse_args()
+
+    print(f"{'repository':<12}{'ops/s':>12}{'seconds':>10}  consistent")
+    for name in REPOSITORIES:
+        result = run(name, args.threads, args.ops, args.users, args.mix, args.seed)
+        print(f"{name:<12}{result['ops_per_second']:>12}{result['seconds']:>10}  {result['consistent']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -3,6 +3,12 @@ import os
 class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'default_secret_key')
     DEBUG = False
+    # Directory for the snapshot + write-ahead log; unset keeps data in memory only
+    DATA_DIR = os.getenv('HBNB_DATA_DIR')
+    SNAPSHOT_EVERY = int(os.getenv('HBNB_SNAPSHOT_EVERY', '10000'))
+    WAL_FSYNC = os.getenv('HBNB_WAL_FSYNC', '').lower() in ('1', 'true', 'yes')
+    # 'objects' keeps model instances; 'compact' stores each model as columns (see app.persistence.compact)
+    STORAGE = os.getenv('HBNB_STORAGE', 'objects')
 
 class DevelopmentConfig(Config):
     DEBUG = True
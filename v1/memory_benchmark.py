@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark for the v1 in-memory store
+
+Builds the same synthetic users, amenities, places and reviews in three
+layouts and reports the bytes retained per entity, measured with
+tracemalloc:
+    dict:    one object per entity with a per-instance __dict__ and
+             object references, the layout the models used before they
+             declared __slots__
+    slots:   the current models (InMemoryRepository contents)
+    compact: CompactRepository columns (ids instead of references,
+             interned strings, array-backed numbers)
+The models intern names as they are set, so every layout shares those.
+
+Usage:
+    python memory_benchmark.py [--users N] [--amenities N] [--places N]
+        [--reviews N] [--seed N] [--output FILE]
+"""
+
+import argparse
+import gc
+import json
+import random
+import tracemalloc
+
+from app.models import attributes
+from app.models.users import User
+from app.models.amenity import Amenity
+from app.models.places import Place
+from app.models.reviews import Review
+from app.persistence.compact import CompactRepository
+
+LAYOUTS = ('dict', 'slots', 'compact')
+KINDS = ('users', 'amenities', 'places', 'reviews')
+FIRST_NAMES = ['John', 'Jane', 'Alice', 'Bob', 'Carol', 'David', 'Emma', 'Frank', 'Grace', 'Henry']
+LAST_NAMES = ['Smith', 'Jones', 'Brown', 'Taylor', 'Wilson', 'Evans', 'Thomas', 'Roberts']
+AMENITY_NAMES = ['WiFi', 'Pool', 'Kitchen', 'Parking', 'Air Conditioning', 'Heating', 'Washer', 'Gym']
+REVIEW_TEXTS = ['Great stay!', 'Very clean and quiet.', 'Host was lovely.', 'Would not return.']
+
+
+class DictRecord:
+    """Plain object holding a model's state in its __dict__"""
+
+
+def as_dict_record(obj):
+    record = DictRecord()
+    record.__dict__.update(attributes(obj))
+    return record
+
+
+def build_models(counts, seed):
+    """Create validated model instances with references between them"""
+    rng = random.Random(seed)
+    # f-strings build fresh str objects, as parsed request bodies would
+    users = [User(f"{rng.choice(FIRST_NAMES)}", f"{rng.choice(LAST_NAMES)}", f"user{i}@example.com")
+             for i in range(counts['users'])]
+    amenities = [Amenity(f"{AMENITY_NAMES[i % len(AMENITY_NAMES)]} {i // len(AMENITY_NAMES)}")
+                 for i in range(counts['amenities'])]
+    places = []
+    for i in range(counts['places']):
+        place = Place(f"Place {i}", f"A nice place number {i}", float(rng.randint(20, 500)),
+                      rng.uniform(-90, 90), rng.uniform(-180, 180), rng.choice(users))
+        for amenity in rng.sample(amenities, min(3, len(amenities))):
+            place.add_amenity(amenity)
+        places.append(place)
+    reviews = []
+    for _ in range(counts['reviews']):
+        place = rng.choice(places)
+        review = Review(f"{rng.choice(REVIEW_TEXTS)}", rng.randint(1, 5), place, rng.choice(users))
+        place.add_review(review)
+        reviews.append(review)
+    return {'users': users, 'amenities': amenities, 'places': places, 'reviews': reviews}
+
+
+def build_layout(layout, counts, seed):
+    """Return the store of one layout; everything else built on the way is dropped"""
+    models = build_models(counts, seed)
+    if layout == 'slots':
+        return models
+    if layout == 'dict':
+        records = {kind: [as_dict_record(obj) for obj in objs] for kind, objs in models.items()}
+        # Point references at the dict records so no slotted model stays alive
+        by_id = {record.id: record for objs in records.values() for record in objs}
+        for record in records['places']:
+            record._owner = by_id[record._owner.id]
+            record.amenities = [by_id[a.id] for a in record.amenities]
+            record.reviews = [by_id[r.id] for r in record.reviews]
+        for record in records['reviews']:
+            record._place = by_id[record._place.id]
+            record._user = by_id[record._user.id]
+        return records
+    repos = {}
+    for kind, model in zip(KINDS, (User, Amenity, Place, Review)):
+        repo = CompactRepository(model)
+        for obj in models[kind]:
+            repo.add(obj)
+        repos[kind] = repo
+    return repos
+
+
+def measure(layout, counts, seed):
+    """Bytes retained by one layout, total and per entity"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        store = build_layout(layout, counts, seed)
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    entities = sum(counts.values())
+    del store
+    return {'layout': layout, 'bytes': retained, 'bytes_per_entity': round(retained / entities, 1)}
+
+
+def run(counts, seed=42):
+    results = [measure(layout, counts, seed) for layout in LAYOUTS]
+    baseline = results[0]['bytes']
+    for result in results:
+        result['vs_dict'] = round(result['bytes'] / baseline, 3) if baseline else None
+    return {'counts': counts, 'seed': seed, 'results': results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure memory per entity of the v1 store layouts')
+    parser.add_argument('--users', type=int, default=5000, help='Users to build')
+    parser.add_argument('--amenities', type=int, default=100, help='Amenities to build')
+    parser.add_argument('--places', type=int, default=10000, help='Places to build')
+    parser.add_argument('--reviews', type=int, default=25000, help='Reviews to build')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for the synthetic data')
+    parser.add_argument('--output', help='Also write the results as JSON to this file')
+    args = parser.parse_args()
+
+    report = run({kind: getattr(args, kind) for kind in KINDS}, args.seed)
+    print(f"{'layout':<10}{'MiB':>10}{'bytes/entity':>15}{'vs dict':>10}")
+    for result in report['results']:
+        print(f"{result['layout']:<10}{result['bytes'] / 2**20:>10.1f}"
+              f"{result['bytes_per_entity']:>15.1f}{result['vs_dict']:>10.2f}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
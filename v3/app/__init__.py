@@ -5,6 +5,7 @@ from flask_bcrypt import Bcrypt
 from flask_session import Session
 from datetime import timedelta
 from flask_cors import CORS
+from app.hashing import hasher, HashingBusy
 
 bcrypt = Bcrypt()
 db = SQLAlchemy()
@@ -26,6 +27,7 @@ def create_app(config_class="config.DevelopmentConfig"):
     # Initialize Flask extensions with app
     bcrypt.init_app(app)
     db.init_app(app)
+    hasher.init_app(app)
 
     # Template routes (define BEFORE API to avoid conflicts)
     @app.route('/')
@@ -49,25 +51,56 @@ def create_app(config_class="config.DevelopmentConfig"):
     def add_review(place_id=None):
         return render_template('place_details/add_review.html', place_id=place_id)
 
+    # Entity cache in front of the repositories
+    from app.persistence.cache import cache
+    cache.init_app(app)
+
+    # Fingerprinted static assets, once build_assets.py has been run
+    from app.assets import assets
+    assets.init_app(app)
+
+    # Resized place images, made in the background
+    from app.images import images
+    images.init_app(app)
+
+    # Place text search: MySQL FULLTEXT or the in-process index
+    from app.search import search
+    search.init_app(app)
+
     # Create Api instance
     api = Api(app, version='1.0', title='HBnB API', description='HBnB Application API', doc='/api/v3/')
 
+    # Encode API responses with msgspec/orjson when installed
+    from app.encoding import json_output
+    json_output.init_app(app, api)
+
+    @api.errorhandler(HashingBusy)
+    def hashing_busy(error):
+        """Shed password work under load instead of queueing without bound"""
+        return {'error': str(error)}, 503, {'Retry-After': '1'}
+
     from app.api.v3.users import api as users_ns
     from app.api.v3.amenities import api as amenities_ns
     from app.api.v3.places import api as places_ns
     from app.api.v3.reviews import api as reviews_ns
     from app.api.v3.auth import auth_api #being added auth file
+    from app.api.v3.admin import api as admin_ns
 
     api.add_namespace(users_ns, path="/api/v3/users")
     api.add_namespace(amenities_ns, path="/api/v3/amenities")
     api.add_namespace(places_ns, path="/api/v3/places")
     api.add_namespace(reviews_ns, path="/api/v3/reviews")
     api.add_namespace(auth_api, path="/api/v3/auth") #added name space for auth
+    api.add_namespace(admin_ns, path="/api/v3/admin")
 
     # Create database tables within app context
     with app.app_context():
         # Initialize sessions within app context
-        Session(app)
+        if app.config.get('SESSION_BACKEND', 'sqlalchemy') == 'token':
+            from app.sessions import TokenSessionInterface
+            app.session_interface = TokenSessionInterface(app.config['SESSION_TOKEN_DENYLIST_SIZE'])
+        else:
+            Session(app)
         
         # Import all models to ensure they're registered
         from app.models.users import User
@@ -78,6 +111,43 @@ def create_app(config_class="config.DevelopmentConfig"):
         # Create tables if they don't exist
         db.create_all()
 
+        # Build the in-process search index off the request path
+        from app.services import facade
+        facade.start_search_index(app)
+
+    @app.cli.command('rebuild-ratings')
+    def rebuild_ratings():
+        """Recompute the review aggregates stored on places."""
+        from app.services import facade
+        drifted = facade.rebuild_place_ratings()
+        print(f"Rebuilt place ratings ({drifted} places had drifted)")
+
+    @app.cli.command('generate-place-images')
+    def generate_place_images():
+        """Write resized copies of every place's image."""
+        from app.services import facade
+        if not images.enabled:
+            print("Pillow is not installed (pip install Pillow); no images resized")
+            return
+        futures = [images.generate(place.id, place.title) for place in facade.get_all_places()]
+        futures = [future for future in futures if future is not None]
+        for future in futures:
+            future.result()
+        print(f"Resized images of {len(futures)} places")
+
+    @app.cli.command('explain-place-filters')
+    def explain_place_filters():
+        """Print the database's query plan for each place listing filter combination."""
+        from app.services import facade
+        from app.persistence.explain import PLACE_FILTER_COMBINATIONS, capture_statements, explain
+        for filters in PLACE_FILTER_COMBINATIONS:
+            with capture_statements() as statements:
+                facade.get_places_page(20, **filters)
+            print(f"== {filters or 'no filters'}")
+            for statement, parameters in statements:
+                for line in explain(statement, parameters):
+                    print(f"   {line}")
+
     # Add error handlers for database operations
     @app.teardown_appcontext
     def close_db_session(error):
@@ -91,6 +161,6 @@ def create_app(config_class="config.DevelopmentConfig"):
         return {'error': 'Internal server error'}, 500
 
     # Enable CORS for frontend
-    CORS(app, supports_credentials=True)
+    CORS(app, supports_credentials=True, expose_headers=['Link', 'X-Next-Cursor'])
 
     return app
\ No newline at end of file
@@ -0,0 +1,72 @@
+from flask_restx import Namespace, Resource
+from flask import request, session
+from functools import wraps
+import io
+from app.services.importer import BulkImporter, KINDS, FORMATS
+from app.persistence.cache import cache
+from app.services import facade
+
+api = Namespace('admin', description='Admin operations')
+
+def admin_required(f): # admin session wrap
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        if 'user_id' not in session:
+            return {'error': 'Authentication required'}, 401
+        if not session.get('is_admin'):
+            return {'error': 'Admin privileges required'}, 403
+        return f(*args, **kwargs)
+    return decorated
+
+@api.route('/import')
+class Import(Resource):
+    @api.doc(params={
+        'kind': f"Entity kind: {', '.join(KINDS)}",
+        'format': f"Record format: {', '.join(FORMATS)} (default jsonl)",
+        'batch_size': 'Rows per bulk insert and commit (default 1000)'
+    })
+    @api.response(200, 'Import finished, see the report for failed rows')
+    @api.response(400, 'Invalid kind, format or file')
+    @api.response(401, 'Authentication required')
+    @api.response(403, 'Admin privileges required')
+    @admin_required
+    def post(self):
+        """Bulk import records from the request body or an uploaded 'file' (admin only)"""
+        kind = request.args.get('kind')
+        fmt = request.args.get('format', 'jsonl')
+        batch_size = request.args.get('batch_size', 1000, type=int)
+        if kind not in KINDS:
+            return {'error': f"kind must be one of {', '.join(KINDS)}"}, 400
+        if batch_size < 1:
+            return {'error': 'batch_size must be a positive integer'}, 400
+
+        upload = request.files.get('file')
+        raw = upload.stream if upload else request.stream
+        stream = io.TextIOWrapper(raw, encoding='utf-8', newline='')
+
+        try:
+            report = BulkImporter(batch_size=batch_size).import_stream(kind, stream, fmt)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return report, 200
+
+@api.route('/cache')
+class CacheStats(Resource):
+    @api.response(200, 'Entity cache counters')
+    @api.response(401, 'Authentication required')
+    @api.response(403, 'Admin privileges required')
+    @admin_required
+    def get(self):
+        """Entity cache hit/miss/eviction counters (admin only)"""
+        return cache.stats(), 200
+
+@api.route('/ratings/rebuild')
+class RatingsRebuild(Resource):
+    @api.response(200, 'Place rating aggregates rebuilt')
+    @api.response(401, 'Authentication required')
+    @api.response(403, 'Admin privileges required')
+    @admin_required
+    def post(self):
+        """Recompute review_count/avg_rating of every place from its reviews (admin only)"""
+        drifted = facade.rebuild_place_ratings()
+        return {'message': 'Place ratings rebuilt', 'drifted': drifted}, 200
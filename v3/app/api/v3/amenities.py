@@ -1,5 +1,7 @@
 from flask_restx import Namespace, Resource, fields
 from app.services import facade
+from app.services.facade import DuplicateAmenityError
+from app.conditional import Validators
 from flask import session
 from functools import wraps
 api = Namespace('amenities', description='Amenity operations')
@@ -9,6 +11,14 @@ amenity_model = api.model('Amenity', {
     'name': fields.String(required=True, description='Name of the amenity')
 })
 
+amenity_batch_model = api.model('AmenityBatch', {
+    'amenities': fields.List(fields.Nested(amenity_model), required=True,
+                             description='Amenities to create; names that already exist are reused')
+})
+
+# Largest batch accepted by POST /amenities/batch
+MAX_BATCH_SIZE = 5000
+
 def login_required(f): # login wrap
     @wraps(f)
     def decorated(*args, **kwargs):
@@ -21,6 +31,7 @@ def login_required(f): # login wrap
 class AmenityList(Resource):
     @api.expect(amenity_model)
     @api.response(201, 'Amenity successfully created')
+    @api.response(200, 'Amenity with this name already exists')
     @api.response(400, 'Invalid input data')
     @api.response(401, 'Authentication required')
     @api.response(403, 'Admin privileges required')
@@ -32,23 +43,62 @@ class AmenityList(Resource):
 
         try:
             amenity_data = api.payload
-            new_amenity = facade.create_amenity(amenity_data)
-            return {'id': new_amenity.id, 'name': new_amenity.name}, 201
+            (amenity, created), = facade.create_amenities([amenity_data])
+            return {'id': amenity.id, 'name': amenity.name}, 201 if created else 200
         except ValueError as e:
             return {'error': str(e)}, 400
 
 
     @api.response(200, 'List of amenities retrieved successfully')
+    @api.response(304, 'Amenities unchanged since the ETag or date the client sent')
     def get(self):
         """Retrieve a list of all amenities"""
+        count, last_modified = facade.get_amenities_version()
+        validators = Validators('amenities', count, last_modified, last_modified=last_modified)
+        if validators.fresh():
+            return validators.not_modified()
+
         try:
             amenities = facade.get_all_amenities()
-            return [{'id': amenity.id, 'name': amenity.name} for amenity in amenities], 200
+            return [{'id': amenity.id, 'name': amenity.name} for amenity in amenities], 200, validators.headers()
         except ValueError as e:
             return {'error': str(e)}, 404
 
 
 
+@api.route('/batch')
+class AmenityBatch(Resource):
+    @api.expect(amenity_batch_model)
+    @api.response(201, 'At least one amenity created')
+    @api.response(200, 'Every amenity already existed')
+    @api.response(400, 'Invalid input data')
+    @api.response(401, 'Authentication required')
+    @api.response(403, 'Admin privileges required')
+    @login_required
+    def post(self):
+        """Create many amenities in one request, skipping names that exist (admin only)"""
+        if not session.get('is_admin'):
+            return {'error': 'Admin privileges required'}, 403
+
+        amenities_data = (api.payload or {}).get('amenities')
+        if not isinstance(amenities_data, list) or not all(isinstance(a, dict) for a in amenities_data):
+            return {'error': 'amenities must be a list of objects with a name'}, 400
+        if len(amenities_data) > MAX_BATCH_SIZE:
+            return {'error': f'At most {MAX_BATCH_SIZE} amenities per batch'}, 400
+
+        try:
+            results = facade.create_amenities(amenities_data)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        # Distinct amenities created; repeated names in the batch share one
+        created = len({amenity.id for amenity, was_created in results if was_created})
+        return {
+            'amenities': [{'id': amenity.id, 'name': amenity.name, 'created': was_created}
+                          for amenity, was_created in results],
+            'created': created,
+        }, 201 if created else 200
+
+
 @api.route('/<amenity_id>')
 class AmenityResource(Resource):
     @api.response(200, 'Amenity details retrieved successfully')
@@ -68,6 +118,7 @@ class AmenityResource(Resource):
     @api.response(400, 'Invalid input data')
     @api.response(401, 'Authentication required')
     @api.response(403, 'Admin privileges required')
+    @api.response(409, 'Another amenity already has this name')
     @login_required
     def put(self, amenity_id):
         """Update an amenity's information (admin only)"""
@@ -80,5 +131,7 @@ class AmenityResource(Resource):
             if updated_amenity:
                 return {'id': updated_amenity.id, 'name': updated_amenity.name}, 200
             return {'error': 'Amenity not found'}, 404
+        except DuplicateAmenityError as e:
+            return {'error': str(e)}, 409
         except ValueError as e:
             return {'error': str(e)}, 400
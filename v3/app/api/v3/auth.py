@@ -1,7 +1,8 @@
 from flask_restx import Namespace, Resource, fields
-from flask import session
+from flask import session, current_app
 from functools import wraps
 from app.services import facade
+from app.sessions import TokenSessionInterface
 
 auth_api = Namespace('auth', description='Authentication operations')
 
@@ -23,14 +24,19 @@ class Login(Resource):
     @auth_api.expect(login_model, validate=True)
     def post(self):
         data = auth_api.payload
-        user = facade.get_user_by_email(data['email']) # get user by email obj
-        if not user or not user.verify_password(data['password']): # call verify method on user
+        user = facade.authenticate(data['email'], data['password']) # verifies and upgrades old hashes
+        if not user:
             return {'error': 'Invalid email or password'}, 401
 
         session['user_id'] = user.id
         session['is_admin'] = user.is_admin # added admin
 
-        return {'message': 'Logged in successfully'}, 200
+        body = {'message': 'Logged in successfully'}
+        interface = current_app.session_interface
+        if isinstance(interface, TokenSessionInterface):
+            # For API clients sending Authorization: Bearer instead of the cookie
+            body['token'] = interface.issue(current_app, session)
+        return body, 200
 
 @auth_api.route('/protected') # protected endpoint that can only be called by user
 class ProtectedResource(Resource):
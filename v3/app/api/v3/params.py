@@ -0,0 +1,18 @@
+"""
+Query argument helpers shared by the v3 namespaces
+"""
+from flask import request
+
+# Most ids one ?ids= request may ask for
+MAX_BATCH_IDS = 100
+
+
+def parse_ids():
+    """Read the comma-separated ?ids= argument, bounded by MAX_BATCH_IDS"""
+    ids = [obj_id.strip() for value in request.args.getlist('ids')
+           for obj_id in value.split(',') if obj_id.strip()]
+    if not ids:
+        raise ValueError("ids must list at least one id")
+    if len(ids) > MAX_BATCH_IDS:
+        raise ValueError(f"At most {MAX_BATCH_IDS} ids per request")
+    return ids
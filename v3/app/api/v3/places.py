@@ -1,7 +1,17 @@
 from flask_restx import Namespace, Resource, fields
 from flask import request, session, url_for
 from app.services import facade
+from app.api.v3.reviews import serialize_review
+from app.api.v3.params import MAX_BATCH_IDS, parse_ids
+from app.conditional import Validators
+from app.images import images
+from app.search import highlight, query_terms
+from app import geo
 from functools import wraps
+from datetime import datetime
+from decimal import Decimal
+from urllib.parse import urlencode
+import base64
 
 api = Namespace('places', description='Place operations')
 
@@ -29,11 +39,80 @@ place_model = api.model('Place', {
     'amenities': fields.List(fields.String, required=True, description="List of amenities ID's")
 })
 
+# Page size bounds for the place listing
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Listing sort keys, their default direction and how cursor values are read back
+DEFAULT_ORDER = {'created_at': 'asc', 'price': 'asc', 'rating': 'desc'}
+CURSOR_VALUES = {'created_at': datetime.fromisoformat, 'price': Decimal, 'rating': float}
+
+def encode_cursor(sort, order, key):
+    """Turn a (sort value, id) page key into an opaque cursor string"""
+    value, obj_id = key
+    if value is None:
+        value = ''
+    elif isinstance(value, datetime):
+        value = value.isoformat()
+    raw = f"{sort}:{order}|{value}|{obj_id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor, sort, order):
+    """Turn a cursor string back into a (sort value, id) page key"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        ordering, value, obj_id = raw.split('|', 2)
+        if ordering != f"{sort}:{order}":
+            raise ValueError
+        return (CURSOR_VALUES[sort](value) if value else None), obj_id
+    except (ValueError, UnicodeError, ArithmeticError):
+        raise ValueError("Invalid cursor for this sort order")
+
+def parse_limit():
+    """Read the ?limit= query argument, clamped to MAX_PAGE_SIZE"""
+    limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+    if limit < 1:
+        raise ValueError("limit must be a positive integer")
+    return min(limit, MAX_PAGE_SIZE)
+
+def parse_float(name, required=True):
+    """Read a float query argument, None when an optional one is absent"""
+    if not required and name not in request.args:
+        return None
+    value = request.args.get(name, type=float)
+    if value is None:
+        raise ValueError(f"{name} must be a number")
+    return value
+
+def parse_listing_filters():
+    """Read the listing's sort order and filters from the query arguments"""
+    sort = request.args.get('sort', 'created_at')
+    if sort not in DEFAULT_ORDER:
+        raise ValueError(f"sort must be one of {', '.join(DEFAULT_ORDER)}")
+    order = request.args.get('order', DEFAULT_ORDER[sort])
+    if order not in ('asc', 'desc'):
+        raise ValueError("order must be asc or desc")
+    amenity_ids = [amenity_id.strip() for value in request.args.getlist('amenities')
+                   for amenity_id in value.split(',') if amenity_id.strip()]
+    return sort, order, {
+        'min_price': parse_float('min_price', required=False),
+        'max_price': parse_float('max_price', required=False),
+        'min_rating': parse_float('min_rating', required=False),
+        'amenity_ids': amenity_ids,
+    }
+
 def serialize_place(place):
-    """Helper function to serialize place object consistently"""
+    """Helper function to serialize place object consistently.
+
+    Also takes the "list" projection rows of the listing and location
+    search, whose amenities are already ids.
+    """
 
     filename = place.title + ".jpg"
     image_url = url_for('static', filename=f'images/{filename}', _external=True)
+    # Resized copies, narrowest first; none until the image worker has made them
+    sized = [(width, url_for('place_image', place_id=place.id, filename=name, _external=True))
+             for width, name in images.variants(place.id)]
 
     amenities_list = []
     if hasattr(place, 'amenities') and place.amenities:
@@ -47,12 +126,16 @@ def serialize_place(place):
         'id': place.id,
         'title': place.title,
         'description': place.description,
-        'price': float(place.price),
+        'price': place.price,  # Decimal, encoded as a number by app.encoding
         'latitude': place.latitude,
         'longitude': place.longitude,
-        'owner_id': place.owner.id if place.owner else None,
+        'owner_id': place.owner_id,
         'amenities': amenities_list,
-        'image': image_url
+        'review_count': place.review_count,
+        'avg_rating': round(place.avg_rating, 2) if place.avg_rating is not None else None,
+        'image': image_url,
+        'image_srcset': ', '.join(f'{url} {width}w' for width, url in sized) or None,
+        'thumbnail': sized[0][1] if sized else image_url
     }
 
 def login_required(f): # login wrap
@@ -81,24 +164,115 @@ class PlaceList(Resource):
         except ValueError as e:
             return {'error': str(e)}, 400
 
+    @api.doc(params={
+        'ids': f'Comma-separated place IDs (max {MAX_BATCH_IDS}); returns those places in that '
+               'order instead of a page, unknown IDs are left out',
+        'limit': f'Page size (default {DEFAULT_PAGE_SIZE}, max {MAX_PAGE_SIZE})',
+        'after': 'Cursor taken from the X-Next-Cursor header of the previous page',
+        'min_price': 'Lowest price per night',
+        'max_price': 'Highest price per night',
+        'amenities': 'Comma-separated amenity IDs; places must have all of them',
+        'min_rating': 'Lowest average rating (places without reviews are left out)',
+        'sort': f"Sort key: {', '.join(DEFAULT_ORDER)} (default created_at)",
+        'order': 'asc or desc (default asc, desc for rating)'
+    })
     @api.response(200, 'List of places retrieved successfully')
+    @api.response(400, 'Invalid limit, cursor, filter or sort')
     def get(self):
-        """Retrieve a list of all places"""
-        try:
-            places = facade.get_all_places()
+        """Retrieve one page of places, filtered and sorted (oldest first by default)"""
+        if 'ids' in request.args:
+            try:
+                places = facade.get_places(parse_ids())
+            except ValueError as e:
+                return {'error': str(e)}, 400
             return [serialize_place(place) for place in places], 200
+
+        try:
+            limit = parse_limit()
+            sort, order, filters = parse_listing_filters()
+            after = request.args.get('after')
+            after_key = decode_cursor(after, sort, order) if after else None
+            places, next_key = facade.get_places_page(limit, after_key, sort=sort,
+                                                      descending=order == 'desc', **filters)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+
+        headers = {}
+        if next_key is not None:
+            next_cursor = encode_cursor(sort, order, next_key)
+            args = request.args.to_dict(flat=False)
+            args.update(limit=[limit], after=[next_cursor])
+            next_url = f"{request.base_url}?{urlencode(args, doseq=True)}"
+            headers['X-Next-Cursor'] = next_cursor
+            headers['Link'] = f'<{next_url}>; rel="next"'
+        return [serialize_place(place) for place in places], 200, headers
+
+def search_by_location():
+    """Run a radius (lat/lng/radius_km) or bbox search from the query arguments"""
+    limit = parse_limit()
+    if 'bbox' in request.args:
+        bbox = geo.parse_bbox(request.args['bbox'])
+        if geo.bbox_area_km2(bbox) > geo.MAX_BBOX_AREA_KM2:
+            raise ValueError(f"bbox must cover at most {geo.MAX_BBOX_AREA_KM2} km²")
+        return facade.search_places_in_bbox(bbox, limit)
+
+    lat, lng, radius_km = parse_float('lat'), parse_float('lng'), parse_float('radius_km')
+    if not (-90.0 <= lat <= 90.0 and -180.0 <= lng <= 180.0):
+        raise ValueError("lat/lng out of range")
+    if not 0 < radius_km <= geo.MAX_RADIUS_KM:
+        raise ValueError(f"radius_km must be positive and at most {geo.MAX_RADIUS_KM}")
+    return facade.search_places_nearby(lat, lng, radius_km, limit)
+
+def search_by_text():
+    """Run a full-text search (q) and add relevance scores and highlighted snippets"""
+    limit = parse_limit()
+    query = request.args['q']
+    matches = facade.search_places_text(query, limit)
+    terms = set(query_terms(query))
+    return [dict(serialize_place(place), score=None if score is None else round(score, 4), highlights={
+        'title': highlight(place.title, terms),
+        'description': highlight(place.description, terms),
+    }) for place, score in matches]
+
+@api.route('/search')
+class PlaceSearch(Resource):
+    @api.doc(params={
+        'q': 'Words to find in titles and descriptions (instead of a location); all must match',
+        'lat': 'Latitude of the search centre',
+        'lng': 'Longitude of the search centre',
+        'radius_km': f'Search radius in kilometres (max {geo.MAX_RADIUS_KM})',
+        'bbox': 'Bounding box min_lng,min_lat,max_lng,max_lat (instead of lat/lng/radius_km), '
+                f'at most {geo.MAX_BBOX_AREA_KM2} km²',
+        'limit': f'Maximum results (default {DEFAULT_PAGE_SIZE}, max {MAX_PAGE_SIZE})'
+    })
+    @api.response(200, 'Matching places, most relevant (q) or nearest (location) first')
+    @api.response(400, 'Invalid search arguments')
+    def get(self):
+        """Find places by text, or within a radius or bounding box ordered by distance"""
+        try:
+            if 'q' in request.args:
+                return search_by_text(), 200
+            matches = search_by_location()
         except ValueError as e:
             return {'error': str(e)}, 400
+        return [dict(serialize_place(place), distance_km=round(distance, 3))
+                for place, distance in matches], 200
 
 @api.route('/<place_id>')
 class PlaceResource(Resource):
     @api.response(200, 'Place details retrieved successfully')
+    @api.response(304, 'Place unchanged since the ETag or date the client sent')
     @api.response(404, 'Place not found')
     def get(self, place_id):
         """Get place details by ID"""
         try:
-            place = facade.get_place(place_id)
-            return serialize_place(place), 200
+            place = facade.get_place(place_id, profile='detail')
+            # Resized copies appear in the body once made, without touching updated_at
+            validators = Validators('place', place.id, place.updated_at, images.variants(place.id),
+                                    last_modified=place.updated_at)
+            if validators.fresh():
+                return validators.not_modified()
+            return serialize_place(place), 200, validators.headers()
         except ValueError as e:
             return {'error': str(e)}, 404
 
@@ -128,4 +302,55 @@ class PlaceResource(Resource):
         except ValueError as e:
             return {'error': str(e)}, 400
 
+@api.route('/<place_id>/details')
+class PlaceDetails(Resource):
+    @api.doc(params={
+        'limit': f'Reviews per page (default {DEFAULT_PAGE_SIZE}, max {MAX_PAGE_SIZE})',
+        'after': 'Cursor from reviews_cursor of the previous response'
+    })
+    @api.response(200, 'The place, its owner, amenities, rating and one page of reviews')
+    @api.response(304, 'Nothing on the page changed since the ETag or date the client sent')
+    @api.response(400, 'Invalid limit or cursor')
+    @api.response(404, 'Place not found')
+    def get(self, place_id):
+        """Everything the place details page shows, in one response (newest reviews first)"""
+        try:
+            limit = parse_limit()
+            after = request.args.get('after')
+            after_key = decode_cursor(after, 'created_at', 'desc') if after else None
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        try:
+            place = facade.get_place_details(place_id)
+        except ValueError as e:
+            return {'error': str(e)}, 404
+
+        owner, amenities = place.owner, sorted(place.amenities, key=lambda amenity: amenity.name)
+        review_version = facade.get_reviews_by_place_version(place_id)
+        changed = [place.updated_at, owner.updated_at, *(amenity.updated_at for amenity in amenities),
+                   *review_version[1:]]
+        validators = Validators('place-details', place.id, images.variants(place.id),
+                                [(amenity.id, amenity.updated_at) for amenity in amenities], *changed,
+                                last_modified=max(filter(None, changed)))
+        if validators.fresh():
+            return validators.not_modified()
 
+        reviews, next_key = facade.get_reviews_page_by_place(place_id, limit, after_key)
+        headers = validators.headers()
+        next_cursor = None
+        if next_key is not None:
+            next_cursor = encode_cursor('created_at', 'desc', next_key)
+            next_url = f"{request.base_url}?{urlencode({'limit': limit, 'after': next_cursor})}"
+            headers['X-Next-Cursor'] = next_cursor
+            headers['Link'] = f'<{next_url}>; rel="next"'
+        return {
+            'place': serialize_place(place),
+            'owner': {'id': owner.id, 'first_name': owner.first_name, 'last_name': owner.last_name},
+            'amenities': [{'id': amenity.id, 'name': amenity.name} for amenity in amenities],
+            'rating': {
+                'review_count': place.review_count,
+                'avg_rating': round(place.avg_rating, 2) if place.avg_rating is not None else None
+            },
+            'reviews': [serialize_review(review) for review in reviews],
+            'reviews_cursor': next_cursor,
+        }, 200, headers
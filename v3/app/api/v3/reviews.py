@@ -1,6 +1,8 @@
 from flask_restx import Namespace, Resource, fields
 from flask import request, session
 from app.services import facade
+from app.services.facade import DuplicateReviewError
+from app.conditional import Validators
 from functools import wraps
 
 api = Namespace('reviews', description='Review operations')
@@ -19,8 +21,8 @@ def serialize_review(review):
         'id': review.id,
         'text': review.text,
         'rating': review.rating,
-        'user_id': review.user.id,
-        'place_id': review.place.id,
+        'user_id': review.user_id,
+        'place_id': review.place_id,
         'user': {
             'id': review.user.id,
             'first_name': review.user.first_name,
@@ -39,6 +41,7 @@ def login_required(f): # login wrap
 @api.route('/places/<place_id>/reviews')
 class PlaceReviewList(Resource):
     @api.response(200, 'List of reviews for the place retrieved successfully')
+    @api.response(304, 'Reviews unchanged since the ETag or date the client sent')
     @api.response(404, 'Place not found')
     def get(self, place_id):
         """Get all reviews for a specific place"""
@@ -46,8 +49,14 @@ class PlaceReviewList(Resource):
         place = facade.get_place(place_id)
         if not place:
             return {'error': 'Place not found'}, 404
+        version = facade.get_reviews_by_place_version(place_id)
+        validators = Validators('reviews', place_id, *version,
+                                last_modified=max(filter(None, version[1:]), default=None))
+        if validators.fresh():
+            return validators.not_modified()
+
         reviews = facade.get_reviews_by_place(place_id)
-        return [serialize_review(review) for review in reviews], 200
+        return [serialize_review(review) for review in reviews], 200, validators.headers()
 
 @api.route('/')
 class ReviewList(Resource):
@@ -66,12 +75,11 @@ class ReviewList(Resource):
         place = facade.get_place(review_data['place_id'])
         if not place:
             return {'error': 'Place not found'}, 404
-        if place.owner.id == user_id:
+        if place.owner_id == user_id:
             return {'error': 'You cannot review your own place'}, 403
 
         #Prevent duplicate reviews from same user
-        existing_reviews = facade.get_reviews_by_place(review_data['place_id'])
-        if any(r.user.id == user_id for r in existing_reviews):
+        if facade.has_reviewed(user_id, review_data['place_id']):
             return {'error': 'You have already reviewed this place'}, 409
 
         review_data['user_id'] = user_id
@@ -79,6 +87,8 @@ class ReviewList(Resource):
         try:
             new_review = facade.create_review(review_data)
             return serialize_review(new_review), 201
+        except DuplicateReviewError as e:
+            return {'error': str(e)}, 409
         except ValueError as e:
             return {'error': str(e)}, 400
 
@@ -97,7 +107,7 @@ class ReviewResource(Resource):
     def get(self, review_id):
         """Get review details by ID"""
 
-        review = facade.get_review(review_id)
+        review = facade.get_review(review_id, profile='detail')
         if review:
             return serialize_review(review), 200
         return {'error': 'Review not found'}, 404
@@ -1,6 +1,7 @@
 from flask_restx import Namespace, Resource, fields
 from flask import session
 from app.services import facade
+from app.api.v3.params import MAX_BATCH_IDS, parse_ids
 from functools import wraps
 
 api = Namespace('users', description='User operations')
@@ -13,6 +14,13 @@ user_model = api.model('User', {
     'password': fields.String(required=True, description='User password', min_length=6)
 })
 
+def serialize_public_user(user):
+    return {
+        'id': user.id,
+        'first_name': user.first_name,
+        'last_name': user.last_name
+    }
+
 def login_required(f): # login wrap
     @wraps(f)
     def decorated(*args, **kwargs):
@@ -39,6 +47,19 @@ class UserList(Resource):
         new_user = facade.create_user(user_data)
         return {'id': new_user.id, 'first_name': new_user.first_name, 'last_name': new_user.last_name, 'email': new_user.email}, 201
 
+@api.route('/public')
+class UserPublicList(Resource):
+    @api.doc(params={'ids': f'Comma-separated user IDs (max {MAX_BATCH_IDS})'})
+    @api.response(200, 'Public details of the known users, in the order asked for')
+    @api.response(400, 'Missing or too many ids')
+    def get(self):
+        """Get public details of many users at once (no authentication required)"""
+        try:
+            users = facade.get_users(parse_ids())
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return [serialize_public_user(user) for user in users], 200
+
 @api.route('/<user_id>/public')
 class UserPublicResource(Resource):
     @api.response(200, 'User public details retrieved successfully')
@@ -49,11 +70,7 @@ class UserPublicResource(Resource):
         if not user:
             return {'error': 'User not found'}, 404
 
-        return {
-            'id': user.id,
-            'first_name': user.first_name,
-            'last_name': user.last_name
-        }, 200
+        return serialize_public_user(user), 200
 
 @api.route('/<user_id>')
 class UserResource(Resource):
@@ -141,8 +158,9 @@ class UserResource(Resource):
         try:
             deleted = facade.delete_user(user_id)
             if deleted:
-                # Clear the session since the user account is being deleted
-                session.pop('user_id', None)
+                # Clear the session when users delete their own account
+                if str(user_id) == str(cur_user):
+                    session.pop('user_id', None)
                 return {'message': 'User account deleted successfully'}, 200
             return {'error': 'User not found'}, 404
         except ValueError as e:
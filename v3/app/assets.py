@@ -0,0 +1,243 @@
+"""
+Fingerprinted, precompressed static assets.
+
+`python build_assets.py` copies app/static into a build folder with a
+content hash in every file name (css/nav.css -> css/nav.1a2b3c4d5e6f.css)
+and writes manifest.json mapping original names to hashed ones. Along
+the way it
+    - rewrites url(...) references in CSS to the hashed names, so a
+      stylesheet's hash also changes when a font or image it uses does,
+    - writes .gz (and .br, if the brotli package is installed) copies of
+      text assets and fonts when they come out smaller,
+    - writes .webp/.avif copies of JPEG and PNG images when Pillow is
+      installed and they come out smaller,
+    - subsets TrueType fonts to Latin characters when fontTools is
+      installed.
+
+At runtime, once a manifest is loaded, url_for('static', ...) returns
+the hashed name, and requests for hashed names are served from the
+build folder with `Cache-Control: public, max-age=31536000, immutable`,
+picking the smallest variant the client accepts (Vary: Accept,
+Accept-Encoding). A changed file gets a new name, so browsers never
+need to revalidate. Without a manifest, static files are served as
+before.
+
+Config keys:
+    ASSET_BUILD_FOLDER: build output (default: app/static_build)
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import shutil
+from flask import request, send_from_directory
+
+MANIFEST = 'manifest.json'
+HASH_LENGTH = 12
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+# Extensions worth gzip/brotli; images are already compressed
+COMPRESSIBLE = {'.css', '.js', '.json', '.svg', '.html', '.txt', '.ttf', '.otf'}
+# Precompressed encodings in order of preference: (Content-Encoding, suffix)
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+# Modern image formats in order of preference: (mimetype, suffix, Pillow format)
+IMAGE_FORMATS = [('image/avif', '.avif', 'AVIF'), ('image/webp', '.webp', 'WEBP')]
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png'}
+FONT_EXTENSIONS = {'.ttf', '.otf'}
+# Characters kept when subsetting fonts: ASCII, Latin-1 and common punctuation
+FONT_UNICODES = [*range(0x20, 0x7f), *range(0xa0, 0x100), *range(0x2010, 0x2027), 0x20ac]
+CSS_URL = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+
+
+def hashed_name(name, content):
+    """css/nav.css -> css/nav.<hash>.css"""
+    root, ext = os.path.splitext(name)
+    return f"{root}.{hashlib.sha256(content).hexdigest()[:HASH_LENGTH]}{ext}"
+
+
+def rewrite_css(name, text, files):
+    """Point relative url(...) references in a stylesheet at hashed names"""
+    folder = os.path.dirname(name)
+
+    def replace(match):
+        quote, url = match.groups()
+        if ':' in url or url.startswith(('/', '#')):
+            return match.group(0)  # absolute, data: or fragment URLs stay as they are
+        target = os.path.normpath(os.path.join(folder, url)).replace(os.sep, '/')
+        if target not in files:
+            return match.group(0)
+        relative = os.path.relpath(files[target], folder or '.').replace(os.sep, '/')
+        return f"url({quote}{relative}{quote})"
+
+    return CSS_URL.sub(replace, text)
+
+
+def subset_font(content):
+    """Return the font cut down to FONT_UNICODES, or None without fontTools"""
+    try:
+        from io import BytesIO
+        from fontTools import subset  # optional dependency
+    except ImportError:
+        return None
+    options = subset.Options()
+    options.layout_features = ['*']
+    font = subset.load_font(BytesIO(content), options)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=FONT_UNICODES)
+    subsetter.subset(font)
+    out = BytesIO()
+    subset.save_font(font, out, options)
+    return out.getvalue()
+
+
+def compressed_variants(content):
+    """Yield (suffix, bytes) for each precompressed encoding available"""
+    yield '.gz', gzip.compress(content, compresslevel=9, mtime=0)
+    try:
+        import brotli  # optional dependency
+    except ImportError:
+        return
+    yield '.br', brotli.compress(content, quality=11)
+
+
+def image_variants(path):
+    """Yield (suffix, bytes) for each modern format Pillow can write"""
+    try:
+        from io import BytesIO
+        from PIL import Image  # optional dependency
+    except ImportError:
+        return
+    with Image.open(path) as image:
+        for _, suffix, image_format in IMAGE_FORMATS:
+            out = BytesIO()
+            try:
+                image.save(out, image_format, quality=80)
+            except (KeyError, OSError, ValueError):
+                continue  # this Pillow build cannot write the format
+            yield suffix, out.getvalue()
+
+
+def build(source, output):
+    """Build fingerprinted assets from source into output and return the manifest.
+
+    Stylesheets are processed last so their url(...) references can be
+    rewritten to the hashed names of everything else.
+    """
+    if os.path.isdir(output):
+        shutil.rmtree(output)
+    names = []
+    for folder, _, filenames in os.walk(source):
+        for filename in filenames:
+            path = os.path.join(folder, filename)
+            names.append(os.path.relpath(path, source).replace(os.sep, '/'))
+    names.sort(key=lambda name: (name.endswith('.css'), name))
+
+    files, variants = {}, {}
+    for name in names:
+        path = os.path.join(source, name)
+        ext = os.path.splitext(name)[1].lower()
+        with open(path, 'rb') as f:
+            content = f.read()
+        if ext == '.css':
+            content = rewrite_css(name, content.decode('utf-8'), files).encode('utf-8')
+        elif ext in FONT_EXTENSIONS:
+            content = subset_font(content) or content
+
+        target = hashed_name(name, content)
+        files[name] = target
+        found = []
+        candidates = []
+        if ext in COMPRESSIBLE:
+            candidates = compressed_variants(content)
+        elif ext in IMAGE_EXTENSIONS:
+            candidates = image_variants(path)
+        for suffix, data in candidates:
+            if len(data) < len(content):
+                write(os.path.join(output, target + suffix), data)
+                found.append(suffix)
+        write(os.path.join(output, target), content)
+        if found:
+            variants[target] = found
+
+    manifest = {'files': files, 'variants': variants}
+    write(os.path.join(output, MANIFEST), json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+    return manifest
+
+
+def write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+class Assets:
+    """Maps static file names to fingerprinted ones and serves them.
+
+    Does nothing until a manifest is loaded, so the app works unbuilt.
+    """
+
+    def __init__(self):
+        self.folder = None
+        self.files = {}
+        self.variants = {}
+        self.hashed = set()
+
+    def init_app(self, app):
+        folder = app.config.get('ASSET_BUILD_FOLDER') or os.path.join(app.root_path, 'static_build')
+        self.load(folder)
+        app.url_defaults(self.url_defaults)
+        static_view = app.view_functions['static']
+
+        def static(filename):
+            if filename in self.hashed:
+                return self.send(filename)
+            return static_view(filename=filename)
+
+        app.view_functions['static'] = static
+
+    def load(self, folder):
+        """Use the manifest in folder; no manifest (or folder None) turns fingerprinting off"""
+        path = os.path.join(folder, MANIFEST) if folder else None
+        if not path or not os.path.isfile(path):
+            self.folder, self.files, self.variants, self.hashed = None, {}, {}, set()
+            return
+        with open(path, encoding='utf-8') as f:
+            manifest = json.load(f)
+        self.folder = folder
+        self.files = manifest['files']
+        self.variants = manifest['variants']
+        self.hashed = set(self.files.values())
+
+    def url_defaults(self, endpoint, values):
+        if endpoint == 'static' and values.get('filename') in self.files:
+            values['filename'] = self.files[values['filename']]
+
+    def send(self, filename):
+        """Serve a hashed file, or its best variant the client accepts, as immutable"""
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        variants = self.variants.get(filename, ())
+        served, encoding = filename, None
+        accepted_types = {value for value, quality in request.accept_mimetypes if quality}
+        for image_type, suffix, _ in IMAGE_FORMATS:
+            if suffix in variants and image_type in accepted_types:
+                served, mimetype = filename + suffix, image_type
+                break
+        else:
+            for name, suffix in ENCODINGS:
+                if suffix in variants and request.accept_encodings[name]:
+                    served, encoding = filename + suffix, name
+                    break
+
+        response = send_from_directory(self.folder, served, mimetype=mimetype)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        if variants:
+            response.vary.add('Accept' if mimetype.startswith('image/') else 'Accept-Encoding')
+        response.cache_control.public = True
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+        return response
+
+
+assets = Assets()
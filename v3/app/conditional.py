@@ -0,0 +1,49 @@
+"""
+Conditional GET from updated_at.
+
+Every model carries updated_at, so a resource's version is known without
+serializing it: the row's own updated_at, or for a collection the row
+count and latest updated_at (one aggregate query). Responses carry a
+weak ETag hashed from that version plus Last-Modified, and a request
+whose If-None-Match (or, without one, If-Modified-Since) still matches
+is answered 304 Not Modified before the body is built.
+
+Cache-Control: no-cache lets browsers and proxies keep the body but
+revalidate it on every use, so changes show up at once.
+
+The ETag is weak because it stands for the data, not the exact bytes.
+Timestamps are naive UTC, as stored by BaseModel; a MySQL DATETIME
+column keeps whole seconds only, so two changes to a collection in the
+same second that leave its row count unchanged share a version.
+"""
+import hashlib
+from datetime import timezone
+from flask import Response, request
+from werkzeug.http import http_date
+
+
+class Validators:
+    """ETag and Last-Modified of one representation"""
+
+    def __init__(self, *version, last_modified=None):
+        self.etag = hashlib.sha1(repr(version).encode()).hexdigest()[:20]
+        self.last_modified = (last_modified.replace(tzinfo=timezone.utc, microsecond=0)
+                              if last_modified else None)
+
+    def headers(self):
+        headers = {'ETag': f'W/"{self.etag}"', 'Cache-Control': 'no-cache'}
+        if self.last_modified:
+            headers['Last-Modified'] = http_date(self.last_modified)
+        return headers
+
+    def fresh(self):
+        """True when the client's cached copy is still current"""
+        if request.if_none_match:
+            # If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2)
+            return request.if_none_match.contains_weak(self.etag)
+        if request.if_modified_since and self.last_modified:
+            return self.last_modified <= request.if_modified_since
+        return False
+
+    def not_modified(self):
+        return Response(status=304, headers=self.headers())
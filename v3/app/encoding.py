@@ -0,0 +1,103 @@
+"""
+Fast JSON encoding for API responses.
+
+flask_restx encodes every response with the stdlib json module into a
+str, which is then encoded again to UTF-8 bytes. This representation
+encodes straight to bytes with msgspec or orjson when one is installed
+(both build the output in a native buffer that grows geometrically and
+is handed over without a str round trip), falling back to a compact
+stdlib encoder otherwise.
+
+Decimals (place prices) and datetimes are handled by the encoder, so
+serializers can pass model values through unconverted. msgspec writes
+Decimals as exact JSON numbers without calling back into Python, which
+is why 'auto' prefers it; orjson before 3.9 and the stdlib encoder go
+through default() and write them as floats. Compare the encoders on
+API-shaped payloads with json_benchmark.py.
+
+Config keys:
+    JSON_ENCODER: 'auto' (msgspec, else orjson, else json), 'msgspec',
+        'orjson' or 'json'
+    JSON_PRETTY: indent responses (default: in debug mode, like flask_restx)
+"""
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from flask import make_response
+
+
+def default(obj):
+    """Encode the types the encoders do not handle natively"""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def orjson_encoder(pretty):
+    import orjson  # optional dependency
+    fragment = getattr(orjson, 'Fragment', None)  # raw JSON, orjson 3.9+
+
+    def hook(obj):
+        if fragment is not None and isinstance(obj, Decimal):
+            return fragment(str(obj))
+        return default(obj)
+
+    option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+    return lambda data: orjson.dumps(data, default=hook, option=option)
+
+
+def msgspec_encoder(pretty):
+    import msgspec  # optional dependency
+    encoder = msgspec.json.Encoder(enc_hook=default, decimal_format='number')
+    if pretty:
+        return lambda data: msgspec.json.format(encoder.encode(data), indent=2)
+    return encoder.encode
+
+
+def json_encoder(pretty):
+    encoder = json.JSONEncoder(default=default, ensure_ascii=False,
+                               indent=4 if pretty else None,
+                               separators=None if pretty else (',', ':'))
+    return lambda data: encoder.encode(data).encode('utf-8')
+
+
+ENCODERS = {'msgspec': msgspec_encoder, 'orjson': orjson_encoder, 'json': json_encoder}
+
+
+def make_encoder(name='auto', pretty=False):
+    """Return (name, function turning data into JSON bytes) for the chosen encoder"""
+    if name == 'auto':
+        for candidate in ('msgspec', 'orjson'):
+            try:
+                return candidate, ENCODERS[candidate](pretty)
+            except ImportError:
+                continue
+        name = 'json'
+    if name not in ENCODERS:
+        raise ValueError(f"Unknown JSON_ENCODER {name}, expected auto or one of {', '.join(ENCODERS)}")
+    return name, ENCODERS[name](pretty)
+
+
+class JSONRepresentation:
+    """flask_restx representation for application/json using the configured encoder"""
+
+    def __init__(self):
+        self.name, self.encode = make_encoder('json')
+
+    def init_app(self, app, api):
+        self.name, self.encode = make_encoder(app.config.get('JSON_ENCODER', 'auto'),
+                                              app.config.get('JSON_PRETTY', app.debug))
+        api.representations['application/json'] = self.output
+
+    def output(self, data, code, headers=None):
+        response = make_response(self.encode(data), code)
+        response.headers.extend(headers or {})
+        response.mimetype = 'application/json'
+        return response
+
+
+json_output = JSONRepresentation()
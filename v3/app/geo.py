@@ -0,0 +1,200 @@
+"""
+Geohash helpers for place location search.
+
+Each place stores the geohash of its coordinates in an indexed column.
+Geohashes sharing a prefix lie in the same cell, so a search area is
+covered by a handful of cells and fetched as B-tree range scans over
+those prefixes; the candidates are then filtered exactly.
+"""
+import math
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+PRECISION = 12
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 111.32
+# Upper bound on cells used to cover one search area
+MAX_CELLS = 16
+# Largest search areas the API accepts; a circle of MAX_RADIUS_KM fits the bbox limit
+MAX_RADIUS_KM = 500
+MAX_BBOX_AREA_KM2 = 1000000
+
+
+def encode(latitude, longitude, precision=PRECISION):
+    """Return the geohash of a point"""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars = []
+    bits = bit_count = 0
+    even = True
+    while len(chars) < precision:
+        rng, value = (lng_range, longitude) if even else (lat_range, latitude)
+        mid = (rng[0] + rng[1]) / 2
+        if value >= mid:
+            bits = bits * 2 + 1
+            rng[0] = mid
+        else:
+            bits = bits * 2
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(BASE32[bits])
+            bits = bit_count = 0
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    """Return the (height, width) in degrees of a geohash cell"""
+    bits = 5 * precision
+    lng_bits = (bits + 1) // 2
+    lat_bits = bits // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lng_bits
+
+
+def cell_bounds(prefix):
+    """Return the (min_lat, min_lng, max_lat, max_lng) of a geohash cell"""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in prefix:
+        bits = BASE32.index(char)
+        for shift in range(4, -1, -1):
+            rng = lng_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if bits >> shift & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+    return lat_range[0], lng_range[0], lat_range[1], lng_range[1]
+
+
+def _split_antimeridian(bbox):
+    min_lat, min_lng, max_lat, max_lng = bbox
+    if min_lng <= max_lng:
+        return [bbox]
+    return [(min_lat, min_lng, max_lat, 180.0), (min_lat, -180.0, max_lat, max_lng)]
+
+
+def covering_prefixes(bbox):
+    """Return geohash prefixes whose cells together cover a bounding box.
+
+    The bbox is (min_lat, min_lng, max_lat, max_lng); min_lng > max_lng means
+    it crosses the antimeridian. The finest precision that needs at most
+    MAX_CELLS cells is used, so the prefixes match as few extra points as
+    possible.
+    """
+    boxes = _split_antimeridian(bbox)
+    for precision in range(PRECISION, 0, -1):
+        height, width = cell_size(precision)
+        cells = sum((math.floor((b[2] - b[0]) / height) + 2) * (math.floor((b[3] - b[1]) / width) + 2)
+                    for b in boxes)
+        if cells <= MAX_CELLS:
+            break
+
+    prefixes = set()
+    for min_lat, min_lng, max_lat, max_lng in boxes:
+        lat = min_lat
+        while True:
+            lng = min_lng
+            while True:
+                prefixes.add(encode(lat, lng, precision))
+                if lng >= max_lng:
+                    break
+                lng = min(lng + width, max_lng)
+            if lat >= max_lat:
+                break
+            lat = min(lat + height, max_lat)
+    return sorted(prefixes)
+
+
+def prefix_range(prefix):
+    """Return the [low, high) string range holding every geohash with the prefix.
+
+    high is the next prefix in base32 order, or None past the last cell.
+    Digits sort before lowercase letters in binary and case-insensitive
+    collations alike, so the range holds in either.
+    """
+    stem = prefix
+    while stem and stem[-1] == BASE32[-1]:
+        stem = stem[:-1]
+    if not stem:
+        return prefix, None
+    return prefix, stem[:-1] + BASE32[BASE32.index(stem[-1]) + 1]
+
+
+def bbox_around(latitude, longitude, radius_km):
+    """Return the bounding box enclosing a circle on the globe"""
+    dlat = radius_km / KM_PER_DEGREE_LAT
+    min_lat, max_lat = max(latitude - dlat, -90.0), min(latitude + dlat, 90.0)
+    cos_lat = math.cos(math.radians(max(abs(min_lat), abs(max_lat))))
+    if cos_lat <= 0 or radius_km / (KM_PER_DEGREE_LAT * cos_lat) >= 180.0:
+        return min_lat, -180.0, max_lat, 180.0
+    dlng = radius_km / (KM_PER_DEGREE_LAT * cos_lat)
+    min_lng = longitude - dlng
+    max_lng = longitude + dlng
+    if min_lng < -180.0:
+        min_lng += 360.0
+    if max_lng > 180.0:
+        max_lng -= 360.0
+    return min_lat, min_lng, max_lat, max_lng
+
+
+def in_bbox(latitude, longitude, bbox):
+    min_lat, min_lng, max_lat, max_lng = bbox
+    if not min_lat <= latitude <= max_lat:
+        return False
+    if min_lng <= max_lng:
+        return min_lng <= longitude <= max_lng
+    return longitude >= min_lng or longitude <= max_lng
+
+
+def bbox_area_km2(bbox):
+    """Surface area of a bounding box on the globe"""
+    min_lat, min_lng, max_lat, max_lng = bbox
+    width = (max_lng - min_lng) % 360.0 or (360.0 if max_lng != min_lng else 0.0)
+    return (EARTH_RADIUS_KM ** 2 * math.radians(width)
+            * (math.sin(math.radians(max_lat)) - math.sin(math.radians(min_lat))))
+
+
+def distance_to_cell(latitude, longitude, bounds):
+    """Shortest great-circle distance from a point to any point of a cell (0 inside it).
+
+    `bounds` is (min_lat, min_lng, max_lat, max_lng) as from cell_bounds,
+    not crossing the antimeridian. Outside the cell's longitudes the
+    nearest point lies on one of its two meridian edges, at the latitude
+    where the point projects onto that meridian, clamped to the edge.
+    """
+    min_lat, min_lng, max_lat, max_lng = bounds
+    if min_lng <= longitude <= max_lng:
+        return EARTH_RADIUS_KM * math.radians(max(min_lat - latitude, latitude - max_lat, 0.0))
+    nearest = math.inf
+    for edge in (min_lng, max_lng):
+        dlng = math.radians(abs((longitude - edge + 180.0) % 360.0 - 180.0))
+        if dlng <= math.pi / 2:
+            lat = math.degrees(math.atan2(math.sin(math.radians(latitude)),
+                                          math.cos(math.radians(latitude)) * math.cos(dlng)))
+            points = [min(max(lat, min_lat), max_lat)]
+        else:
+            # Beyond a quarter turn the distance only shrinks towards the nearer pole
+            points = [min_lat, max_lat]
+        nearest = min(nearest, *(distance_km(latitude, longitude, lat, edge) for lat in points))
+    return nearest
+
+
+def distance_km(lat1, lng1, lat2, lng2):
+    """Great-circle (haversine) distance between two points"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def parse_bbox(value):
+    """Parse 'min_lng,min_lat,max_lng,max_lat' into (min_lat, min_lng, max_lat, max_lng)"""
+    try:
+        min_lng, min_lat, max_lng, max_lat = (float(part) for part in value.split(','))
+    except ValueError:
+        raise ValueError("bbox must be min_lng,min_lat,max_lng,max_lat")
+    if not (-90.0 <= min_lat <= max_lat <= 90.0 and -180.0 <= min_lng <= 180.0 and -180.0 <= max_lng <= 180.0):
+        raise ValueError("bbox is out of range")
+    return min_lat, min_lng, max_lat, max_lng
@@ -0,0 +1,112 @@
+"""
+Password hashing off the request thread.
+
+bcrypt is deliberately slow, so hashes are computed on a bounded worker
+pool: threads (the bcrypt package releases the GIL while hashing) or
+processes. A semaphore caps how many hashes may be queued or running at
+once; past that, callers get HashingBusy instead of piling up behind a
+login storm.
+
+Config keys:
+    BCRYPT_LOG_ROUNDS: work factor for new hashes (default 12)
+    PASSWORD_HASH_EXECUTOR: 'thread' (default), 'process' or 'inline'
+    PASSWORD_HASH_WORKERS: pool size (default: CPU count)
+    PASSWORD_HASH_MAX_PENDING: hashes queued or running before HashingBusy
+        is raised (default: 4 per worker)
+    PASSWORD_HASH_ADMISSION_TIMEOUT: seconds to wait for a free slot
+"""
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import bcrypt
+
+DEFAULT_ROUNDS = 12
+
+
+class HashingBusy(Exception):
+    """Raised when too many password hashes are already in flight"""
+
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _check(hashed, password):
+    try:
+        return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+    except ValueError:
+        # Not a bcrypt hash
+        return False
+
+
+def cost_of(hashed):
+    """Return the work factor stored in a bcrypt hash such as $2b$12$..."""
+    try:
+        return int(hashed.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    """Hashes and verifies passwords on a configurable executor.
+
+    Until init_app is called it hashes inline with the default work
+    factor, so models can be used outside an app.
+    """
+
+    def __init__(self):
+        self.rounds = DEFAULT_ROUNDS
+        self.executor = None
+        self.timeout = None
+        self._slots = None
+
+    def init_app(self, app):
+        self.shutdown()
+        self.rounds = app.config.get('BCRYPT_LOG_ROUNDS', DEFAULT_ROUNDS)
+        mode = app.config.get('PASSWORD_HASH_EXECUTOR', 'thread')
+        workers = app.config.get('PASSWORD_HASH_WORKERS') or os.cpu_count() or 1
+        max_pending = app.config.get('PASSWORD_HASH_MAX_PENDING') or workers * 4
+        self.timeout = app.config.get('PASSWORD_HASH_ADMISSION_TIMEOUT', 0.5)
+
+        if mode == 'inline':
+            return
+        if mode == 'thread':
+            self.executor = ThreadPoolExecutor(workers, thread_name_prefix='bcrypt')
+        elif mode == 'process':
+            self.executor = ProcessPoolExecutor(workers)
+        else:
+            raise ValueError(f"Unknown PASSWORD_HASH_EXECUTOR {mode}")
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+            self._slots = None
+
+    def _run(self, fn, *args):
+        if self.executor is None:
+            return fn(*args)
+        if not self._slots.acquire(timeout=self.timeout):
+            raise HashingBusy("Too many password operations in progress, try again shortly")
+        try:
+            return self.executor.submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password, rounds=None):
+        """Return a bcrypt hash of the password at the configured work factor"""
+        return self._run(_hash, password, rounds or self.rounds)
+
+    def verify(self, hashed, password):
+        """Check a password against a stored hash"""
+        if not hashed:
+            return False
+        return self._run(_check, hashed, password)
+
+    def needs_rehash(self, hashed):
+        """True when a hash was made with a different work factor than configured"""
+        return cost_of(hashed) != self.rounds
+
+
+hasher = PasswordHasher()
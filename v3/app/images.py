@@ -0,0 +1,191 @@
+"""
+Resized copies of place images.
+
+A place's picture is app/static/images/<title>.jpg. For each place, a
+worker pool writes JPEG copies at a few widths to
+PLACE_IMAGE_FOLDER/<place id>/<width>.jpg, so the files follow the
+place rather than its title. The place API then offers them as
+`image_srcset` and `thumbnail`, and index cards download the smallest
+copy that fills the card instead of the full-size original.
+
+Resizing is CPU-bound, so it runs on a process pool by default and
+never on the request: creating or importing a place, or changing its
+title, only queues the work. A title with no picture removes the
+place's copies, so they never show another title's picture.
+`flask --app run generate-place-images` (re)builds the copies for
+every place.
+
+Resizing needs Pillow. Without it no copies are made and the API keeps
+pointing at the original image.
+
+Which copies exist is read from PLACE_IMAGE_FOLDER itself (one listdir
+per place) and remembered for PLACE_IMAGE_VARIANTS_TTL seconds, so every
+worker process sharing the folder reports the same copies, and the same
+place ETag, once that long has passed since a job finished.
+
+Config keys:
+    PLACE_IMAGE_FOLDER: where copies are written (default: app/place_images)
+    PLACE_IMAGE_WIDTHS: widths in pixels to generate (default 320, 640, 1280)
+    PLACE_IMAGE_EXECUTOR: 'process' (default), 'thread' or 'inline'
+    PLACE_IMAGE_WORKERS: pool size (default: 2)
+    PLACE_IMAGE_VARIANTS_TTL: seconds a folder listing is reused (default: 10)
+"""
+import logging
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from flask import send_from_directory
+from app.persistence.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WIDTHS = (320, 640, 1280)
+DEFAULT_WORKERS = 2
+DEFAULT_VARIANTS_TTL = 10
+# Places whose folder listing is remembered at once
+VARIANTS_CACHE_SIZE = 10000
+JPEG_QUALITY = 80
+# Copies are rewritten in place when regenerated, so only cache them for a day
+MAX_AGE = 24 * 3600
+
+
+def pillow_available():
+    try:
+        import PIL  # noqa: F401  optional dependency
+    except ImportError:
+        return False
+    return True
+
+
+def resize(source, folder, widths):
+    """Write <width>.jpg copies of source into folder and return the widths written.
+
+    Widths at or above the original's are skipped; an image narrower
+    than every width gets a single copy at its own width. Runs in a
+    worker process.
+    """
+    from PIL import Image  # optional dependency
+
+    os.makedirs(folder, exist_ok=True)
+    written = []
+    with Image.open(source) as image:
+        image = image.convert('RGB')
+        targets = [width for width in sorted(widths) if width < image.width] or [image.width]
+        for width in targets:
+            height = round(image.height * width / image.width)
+            path = os.path.join(folder, f"{width}.jpg")
+            image.resize((width, height), Image.LANCZOS).save(
+                path + '.tmp', 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+            os.replace(path + '.tmp', path)  # readers never see a half-written file
+            written.append(width)
+    for name in os.listdir(folder):
+        # Drop copies at widths no longer configured
+        width = name[:-4]
+        if name.endswith('.jpg') and width.isdigit() and int(width) not in written:
+            os.remove(os.path.join(folder, name))
+    return written
+
+
+class PlaceImages:
+    """Generates and serves resized place images.
+
+    Knows which widths exist for each place from a short-lived cache of
+    its folder listing, refreshed by this process as its own jobs
+    finish, so serializing a place rarely touches the disk.
+    """
+
+    def __init__(self):
+        self.folder = None
+        self.source_folder = None
+        self.widths = DEFAULT_WIDTHS
+        self.executor = None
+        self.enabled = False
+        self._available = LRUCache(VARIANTS_CACHE_SIZE, DEFAULT_VARIANTS_TTL)  # place id -> sorted widths
+
+    def init_app(self, app):
+        self.shutdown()
+        self.folder = app.config.get('PLACE_IMAGE_FOLDER') or os.path.join(app.root_path, 'place_images')
+        self.source_folder = os.path.join(app.static_folder, 'images')
+        self.widths = tuple(app.config.get('PLACE_IMAGE_WIDTHS') or DEFAULT_WIDTHS)
+        self.enabled = pillow_available()
+        mode = app.config.get('PLACE_IMAGE_EXECUTOR', 'process')
+        workers = app.config.get('PLACE_IMAGE_WORKERS') or DEFAULT_WORKERS
+        if mode == 'process':
+            self.executor = ProcessPoolExecutor(workers)
+        elif mode == 'thread':
+            self.executor = ThreadPoolExecutor(workers, thread_name_prefix='place-images')
+        elif mode != 'inline':
+            raise ValueError(f"Unknown PLACE_IMAGE_EXECUTOR {mode}")
+        self._available = LRUCache(VARIANTS_CACHE_SIZE,
+                                   app.config.get('PLACE_IMAGE_VARIANTS_TTL', DEFAULT_VARIANTS_TTL))
+        app.add_url_rule('/media/places/<place_id>/<filename>', 'place_image', self.send)
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+
+    def clear(self):
+        """Forget every folder listing; the next variants() call reads the disk again"""
+        self._available.clear()
+
+    def _scan(self, place_id):
+        """Sorted widths of the copies on disk for a place"""
+        try:
+            names = os.listdir(os.path.join(self.folder, place_id))
+        except OSError:
+            return ()
+        return tuple(sorted(int(name[:-4]) for name in names if name.endswith('.jpg') and name[:-4].isdigit()))
+
+    def source(self, title):
+        """Path of the original picture for a place title, or None if there is none"""
+        path = os.path.join(self.source_folder, f"{title}.jpg")
+        return path if os.path.isfile(path) else None
+
+    def generate(self, place_id, title):
+        """Queue resizing of a place's picture; returns a future, or None if nothing to do"""
+        source = self.source(title) if self.source_folder else None
+        if source is None:
+            self.remove(place_id)
+            return None
+        if not self.enabled:
+            return None
+        args = (source, os.path.join(self.folder, place_id), self.widths)
+        if self.executor is None:
+            self._done(place_id, resize(*args))
+            return None
+        future = self.executor.submit(resize, *args)
+        future.add_done_callback(lambda f: self._finished(place_id, f))
+        return future
+
+    def remove(self, place_id):
+        """Delete the copies of a place's picture"""
+        if self.folder:
+            shutil.rmtree(os.path.join(self.folder, place_id), ignore_errors=True)
+        self._available.delete(place_id)
+
+    def _finished(self, place_id, future):
+        try:
+            self._done(place_id, future.result())
+        except Exception:
+            logger.exception("Resizing the image of place %s failed", place_id)
+
+    def _done(self, place_id, widths):
+        self._available.set(place_id, tuple(sorted(widths)))
+
+    def variants(self, place_id):
+        """[(width, filename)] of the copies of a place's picture, narrowest first"""
+        widths = self._available.get(place_id)
+        if widths is None:
+            widths = self._scan(place_id) if self.folder else ()
+            self._available.set(place_id, widths)
+        return [(width, f"{width}.jpg") for width in widths]
+
+    def send(self, place_id, filename):
+        response = send_from_directory(self.folder, f"{place_id}/{filename}")
+        response.cache_control.public = True
+        response.cache_control.max_age = MAX_AGE
+        return response
+
+
+images = PlaceImages()
@@ -10,18 +10,34 @@ from . import BaseModel
 # Association table for many-to-many relationship
 place_amenity_asc = db.Table('place_amenity_asc',
     Column('amenity_id', String(36), ForeignKey('amenities.id'), primary_key=True),
-    Column('place_id', String(36), ForeignKey('places.id'), primary_key=True)
+    Column('place_id', String(36), ForeignKey('places.id'), primary_key=True),
+    # The primary key serves amenity -> places lookups; this one serves place -> amenities
+    db.Index('ix_place_amenity_place_id', 'place_id', 'amenity_id')
 )
 
 
+def normalize_name(value):
+    """Key amenity names are unique on: case-insensitive, inner whitespace collapsed"""
+    return ' '.join(value.split()).lower()
+
+
 class Amenity(BaseModel):
     __tablename__ = 'amenities'
 
     _name = db.Column("name", db.String(50), nullable=False)
+    # normalize_name(name), kept by the name setter; "Wi-Fi" and " wi-fi " collide
+    _name_key = db.Column("name_key", db.String(100), nullable=False, unique=True)
 
-    places = relationship('Place', secondary=place_amenity_asc, lazy='subquery',
+    places = relationship('Place', secondary=place_amenity_asc, lazy='select',
                            back_populates='amenities')
 
+    # Relationship loading per use case, see SQLAlchemyRepository.load_options
+    load_profiles = {
+        'list': {'places': 'raise'},
+        'detail': {'places': 'raise'},
+        'admin': {'places': 'selectin'},
+    }
+
     def __init__(self, name):
         super().__init__()
         self.name = name
@@ -39,5 +55,6 @@ class Amenity(BaseModel):
         is_valid_name = 0 < len(value.strip()) <= 50
         if is_valid_name:
             self._name = value.strip()
+            self._name_key = normalize_name(value)
         else:
             raise ValueError("Invalid name length!")
\ No newline at end of file
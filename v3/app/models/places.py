@@ -4,25 +4,65 @@ This is a place class
 from . import BaseModel
 from app.models.users import User
 from app import db
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, event
 from sqlalchemy.orm import relationship
 from app.models.amenity import place_amenity_asc
+from app import geo
 
 
 class Place(BaseModel):
     __tablename__ = 'places'
+    __table_args__ = (
+        # Keyset pagination walks places in (created_at, id) order
+        db.Index('ix_places_created_at_id', 'created_at', 'id'),
+        # Price and rating filters/sorts on the listing, see get_places_page
+        db.Index('ix_places_price_id', 'price', 'id'),
+        db.Index('ix_places_avg_rating_id', 'avg_rating', 'id'),
+        # Text search on MySQL, see app.search; other databases use the in-process index
+        db.Index('ix_places_title_description_fulltext', 'title', 'description',
+                 mysql_prefix='FULLTEXT').ddl_if(dialect='mysql'),
+    )
 
     _title = db.Column("title", db.String(50), nullable = False)
     _description = db.Column("description", db.String(500), nullable = False)
     _price = db.Column("price", db.Numeric(10,2), nullable = False)
     _latitude = db.Column("latitude", db.Float(), nullable = False)
     _longitude = db.Column("longitude", db.Float(), nullable=False)
-    _owner_id = db.Column("owner_id", db.String(36), ForeignKey('users.id'), nullable=False)
-
-    # Implement relationships
-    owner = relationship('User', lazy='subquery')
-    reviews = relationship('Review', back_populates='place', lazy='subquery')
-    amenities = relationship('Amenity', secondary=place_amenity_asc, back_populates='places', lazy='subquery')
+    # Geohash of (latitude, longitude) so location searches are index range scans
+    _geohash = db.Column("geohash", db.String(geo.PRECISION), index=True)
+    _owner_id = db.Column("owner_id", db.String(36), ForeignKey('users.id'), nullable=False, index=True)
+
+    # Review aggregates, maintained by the facade so listings never touch reviews
+    _review_count = db.Column("review_count", db.Integer, nullable=False, default=0, server_default='0')
+    _rating_sum = db.Column("rating_sum", db.Integer, nullable=False, default=0, server_default='0')
+    _avg_rating = db.Column("avg_rating", db.Float, nullable=True)
+
+    # Implement relationships (loaded on access unless a load profile says otherwise)
+    owner = relationship('User', lazy='select')
+    reviews = relationship('Review', back_populates='place', lazy='select')
+    amenities = relationship('Amenity', secondary=place_amenity_asc, back_populates='places', lazy='select')
+
+    # Relationship loading per use case, see SQLAlchemyRepository.load_options
+    load_profiles = {
+        # serialize_place only needs amenity ids (one IN query per page); owner_id is a column
+        'list': {'amenities': 'selectin', 'owner': 'raise', 'reviews': 'raise'},
+        'detail': {'amenities': 'selectin', 'owner': 'select', 'reviews': 'select'},
+        'admin': {'amenities': 'selectin', 'owner': 'joined', 'reviews': 'selectin'},
+        # The details page: owner in the same query, reviews paged separately
+        'page': {'amenities': 'selectin', 'owner': 'joined', 'reviews': 'raise'},
+    }
+
+    # Plain row tuples for list endpoints, see SQLAlchemyRepository._rows: the
+    # columns serialize_place reads plus the sort keys, and amenity ids
+    projections = {
+        'list': {
+            'columns': ('id', 'title', 'description', 'price', 'latitude', 'longitude', 'owner_id',
+                        'review_count', 'avg_rating', 'created_at'),
+            'collections': {'amenities': (place_amenity_asc.c.place_id, place_amenity_asc.c.amenity_id)},
+        },
+        # Just enough to filter location search candidates by distance
+        'location': {'columns': ('id', 'latitude', 'longitude')},
+    }
 
     def __init__(self, title, description, price, latitude, longitude, owner):
         if title is None or description is None or price is None or latitude is None or longitude is None or owner is None:
@@ -37,6 +77,9 @@ class Place(BaseModel):
         self.owner = owner  # SQLAlchemy relationship
         self.owner_id = owner.id  # Foreign key
         self.reviews = []  # List to store related reviews
+        self._review_count = 0
+        self._rating_sum = 0
+        self._avg_rating = None
 
     # --- Getters and Setters ---
     @property
@@ -114,11 +157,50 @@ class Place(BaseModel):
         """Setter for prop owner_id"""
         self._owner_id = value
 
+    @property
+    def review_count(self):
+        """ Returns the number of reviews of the place """
+        return self._review_count
+
+    @property
+    def rating_sum(self):
+        """ Returns the sum of all review ratings of the place """
+        return self._rating_sum
+
+    @property
+    def avg_rating(self):
+        """ Returns the average review rating, or None without reviews """
+        return self._avg_rating
+
     # --- Methods ---
+    @staticmethod
+    def rating_delta_values(count_delta, sum_delta):
+        """Column assignments that add reviews to (or remove them from) the aggregates.
+
+        Returned as ordered (column, expression) pairs for a single UPDATE.
+        avg_rating comes first because MySQL evaluates SET left to right, so
+        every expression must only read the old column values.
+        """
+        columns = Place.__table__.c
+        new_count = columns.review_count + count_delta
+        new_sum = columns.rating_sum + sum_delta
+        return [
+            ('avg_rating', db.case((new_count > 0, new_sum * 1.0 / new_count), else_=None)),
+            ('review_count', new_count),
+            ('rating_sum', new_sum),
+        ]
+
     def add_review(self, review):
         """Add a review to the place."""
         self.reviews.append(review)
 
     def add_amenity(self, amenity):
         """Add an amenity to the place."""
-        self.amenities.append(amenity)
\ No newline at end of file
+        self.amenities.append(amenity)
+
+
+@event.listens_for(Place, 'before_insert')
+@event.listens_for(Place, 'before_update')
+def set_geohash(mapper, connection, place):
+    """Keep the geohash column in step with the coordinates"""
+    place._geohash = geo.encode(place.latitude, place.longitude)
@@ -9,16 +9,30 @@ from sqlalchemy.orm import relationship
 
 class Review(BaseModel):
     __tablename__ = 'reviews'
+    __table_args__ = (
+        # A place's reviews newest first, one keyset page at a time (place details page)
+        db.Index('ix_reviews_place_id_created_at_id', 'place_id', 'created_at', 'id'),
+        # One review per user per place; also answers the duplicate check by index
+        db.UniqueConstraint('user_id', 'place_id', name='uq_reviews_user_id_place_id'),
+    )
 
     id
     _text = db.Column('text', db.String(500), nullable=False)
     _rating = db.Column('rating', db.Integer, nullable=False)
-    _place_id = db.Column('place_id', db.String(36), db.ForeignKey('places.id'), nullable=False)
-    _user_id = db.Column('user_id', db.String(36), db.ForeignKey('users.id'), nullable=False)
+    _place_id = db.Column('place_id', db.String(36), db.ForeignKey('places.id'), nullable=False, index=True)
+    _user_id = db.Column('user_id', db.String(36), db.ForeignKey('users.id'), nullable=False, index=True)
 
     #relationships
     place = db.relationship('Place', back_populates='reviews', lazy=True)
-    user = db.relationship('User', back_populates='reviews', lazy=True) 
+    user = db.relationship('User', back_populates='reviews', lazy=True)
+
+    # Relationship loading per use case, see SQLAlchemyRepository.load_options
+    load_profiles = {
+        # serialize_review needs the reviewer's name but only the place id
+        'list': {'user': 'joined', 'place': 'raise'},
+        'detail': {'user': 'joined', 'place': 'raise'},
+        'admin': {'user': 'joined', 'place': 'joined'},
+    }
 
     def __init__(self, text, rating, place, user):
         super().__init__()
@@ -42,6 +56,16 @@ class Review(BaseModel):
         else:
             raise ValueError("Invalid review length!")
 
+    @property
+    def place_id(self):
+        """returns id of the reviewed place"""
+        return self._place_id
+
+    @property
+    def user_id(self):
+        """returns id of the reviewer"""
+        return self._user_id
+
     @property
     def rating(self):
         """returns rating for review"""
@@ -1,7 +1,8 @@
 """
 This is the user class
 """
-from app import db, bcrypt
+from app import db
+from app.hashing import hasher
 import re
 from . import BaseModel
 from sqlalchemy.orm import relationship
@@ -30,11 +31,15 @@ class User(BaseModel):
 
     def hash_password(self, password):
         """Hash the password before storing it."""
-        self.password = bcrypt.generate_password_hash(password).decode('utf-8')
+        self.password = hasher.hash(password)
 
     def verify_password(self, password):
         """Verify the hashed password."""
-        return bcrypt.check_password_hash(self.password, password)
+        return hasher.verify(self.password, password)
+
+    def password_needs_rehash(self):
+        """Check if the stored hash uses an outdated work factor."""
+        return hasher.needs_rehash(self.password)
 
     # --- Getters and Setters ---
     @property
@@ -0,0 +1,311 @@
+"""
+Read-through entity cache in front of SQLAlchemyRepository
+"""
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from app import db
+
+
+class LRUCache:
+    """In-process cache holding at most `maxsize` entries for `ttl` seconds"""
+
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        return {
+            'backend': 'memory',
+            'size': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+        }
+
+
+class LocalSharedStore:
+    """Stand-in for a shared key/value server such as Redis.
+
+    Implements the small part of the redis-py client API that SharedCache
+    uses, so the shared backend can run without a server in development
+    and tests.
+    """
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value, ex=None):
+        with self._lock:
+            expires_at = time.monotonic() + ex if ex else None
+            self._data[key] = (expires_at, value)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def flushdb(self):
+        with self._lock:
+            self._data.clear()
+
+
+class SharedCache:
+    """Cache kept in a store shared between processes (Redis or the local stand-in).
+
+    Evictions happen inside the shared store and are not visible here.
+    """
+
+    def __init__(self, client, ttl=300, prefix='hbnb:'):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key, value):
+        self.client.set(self.prefix + key, value, ex=self.ttl)
+
+    def delete(self, *keys):
+        if keys:
+            self.client.delete(*[self.prefix + key for key in keys])
+
+    def clear(self):
+        self.client.flushdb()
+
+    def stats(self):
+        return {
+            'backend': 'shared',
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': 0,
+        }
+
+
+class EntityCache:
+    """Entity cache extension, configured from the app config in create_app.
+
+    Config keys:
+        ENTITY_CACHE_BACKEND: 'memory' (default), 'shared' or 'none'
+        ENTITY_CACHE_MAXSIZE: entries kept by the memory backend
+        ENTITY_CACHE_TTL: seconds before an entry is reloaded
+        ENTITY_CACHE_URL: Redis URL for the shared backend; without it the
+            shared backend uses LocalSharedStore
+    """
+
+    def __init__(self):
+        self.backend = None
+        self._listening = False
+
+    def init_app(self, app):
+        name = app.config.get('ENTITY_CACHE_BACKEND', 'memory')
+        ttl = app.config.get('ENTITY_CACHE_TTL', 300)
+
+        if name == 'none':
+            self.backend = None
+        elif name == 'memory':
+            self.backend = LRUCache(app.config.get('ENTITY_CACHE_MAXSIZE', 1024), ttl)
+        elif name == 'shared':
+            url = app.config.get('ENTITY_CACHE_URL')
+            if url:
+                import redis  # optional dependency, only needed for a real shared server
+                client = redis.Redis.from_url(url)
+            else:
+                client = LocalSharedStore()
+            self.backend = SharedCache(client, ttl)
+        else:
+            raise ValueError(f"Unknown ENTITY_CACHE_BACKEND {name}")
+
+        if not self._listening:
+            event.listen(db.session, 'after_flush', self._collect_flushed)
+            event.listen(db.session, 'after_commit', self._invalidate_stale)
+            event.listen(db.session, 'after_rollback', self._invalidate_stale)
+            self._listening = True
+
+    @property
+    def enabled(self):
+        return self.backend is not None
+
+    @staticmethod
+    def key(model, obj_id):
+        return f"{model.__name__}:{obj_id}"
+
+    def invalidate(self, model, obj_id):
+        if self.enabled:
+            self.backend.delete(self.key(model, obj_id))
+
+    def invalidate_on_commit(self, session, model, obj_id):
+        """Drop an object's entry once the session's transaction ends.
+
+        Deleting it earlier would let a concurrent reader miss, reload the
+        still-committed old row and cache it again for the full TTL.
+        Rolled-back transactions drop their entries too, since the session
+        may have read and cached its own uncommitted changes.
+        """
+        if self.enabled:
+            session.info.setdefault(STALE_KEYS, set()).add(self.key(model, obj_id))
+
+    def _collect_flushed(self, session, flush_context):
+        """Note changed and deleted objects, whichever code path flushed them"""
+        for obj in list(session.dirty) + list(session.deleted):
+            identity = inspect(obj).identity
+            if identity is not None:
+                self.invalidate_on_commit(session, type(obj), identity[0])
+
+    def _invalidate_stale(self, session):
+        keys = session.info.pop(STALE_KEYS, None)
+        if keys and self.enabled:
+            self.backend.delete(*keys)
+
+    def clear(self):
+        if self.enabled:
+            self.backend.clear()
+
+    def stats(self):
+        if not self.enabled:
+            return {'backend': 'none'}
+        return self.backend.stats()
+
+
+# session.info key of the cache keys to drop when the transaction ends
+STALE_KEYS = 'entity_cache_stale'
+
+cache = EntityCache()
+
+
+class CachedRepository:
+    """Read-through cache around a SQLAlchemyRepository.
+
+    get() results are stored as their pickled column values, keyed by
+    model and id, and rebuilt into a detached object that is re-attached
+    to the current session with merge(load=False) so a hit costs no
+    query. Relationships are left out of the entry and load on access, so
+    a stale owner or reviews graph can never come back out of the cache.
+    Entries are dropped when the transaction that updated or deleted the
+    object ends, whether through add/update/delete or a direct session
+    commit; update_columns bypasses the ORM and queues its own
+    invalidation the same way. Every other method goes straight to the
+    wrapped repository.
+    """
+
+    def __init__(self, repo, entity_cache=cache):
+        self.repo = repo
+        self.cache = entity_cache
+
+    def __getattr__(self, name):
+        return getattr(self.repo, name)
+
+    def _dump(self, obj):
+        loaded = inspect(obj).dict
+        return pickle.dumps({attr.key: loaded[attr.key] for attr in self.repo.model.__mapper__.column_attrs
+                             if attr.key in loaded})
+
+    def _load(self, blob):
+        obj = self.repo.model.__mapper__.class_manager.new_instance()
+        for key, value in pickle.loads(blob).items():
+            set_committed_value(obj, key, value)
+        make_transient_to_detached(obj)
+        return db.session.merge(obj, load=False)
+
+    def _store(self, obj):
+        if obj not in db.session.dirty:
+            self.cache.backend.set(self.cache.key(self.repo.model, obj.id), self._dump(obj))
+
+    def get(self, obj_id, profile=None):
+        if not self.cache.enabled or obj_id is None:
+            return self.repo.get(obj_id, profile)
+
+        blob = self.cache.backend.get(self.cache.key(self.repo.model, obj_id))
+        if blob is not None:
+            return self._load(blob)
+
+        obj = self.repo.get(obj_id, profile)
+        if obj is not None:
+            self._store(obj)
+        return obj
+
+    def get_many(self, obj_ids, profile=None):
+        """Serve cached ids from the cache and the rest with one IN query"""
+        obj_ids = list(dict.fromkeys(obj_ids))
+        if not self.cache.enabled:
+            return self.repo.get_many(obj_ids, profile)
+
+        found = {}
+        for obj_id in obj_ids:
+            blob = self.cache.backend.get(self.cache.key(self.repo.model, obj_id))
+            if blob is not None:
+                found[obj_id] = self._load(blob)
+        missing = [obj_id for obj_id in obj_ids if obj_id not in found]
+        if missing:
+            for obj in self.repo.get_many(missing, profile):
+                found[obj.id] = obj
+                self._store(obj)
+        return [found[obj_id] for obj_id in obj_ids if obj_id in found]
+
+    def update_columns(self, obj_id, values):
+        self.repo.update_columns(obj_id, values)
+        self.cache.invalidate_on_commit(db.session, self.repo.model, obj_id)
@@ -1,5 +1,11 @@
 from abc import ABC, abstractmethod
+from collections import namedtuple
 from app import db
+from sqlalchemy.orm import joinedload, lazyload, noload, raiseload, selectinload, subqueryload
+from sqlalchemy.sql import visitors
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from app.models.users import User #, Place, Review, Amenity  # Import your models
 
 class Repository(ABC):
@@ -8,11 +14,15 @@ class Repository(ABC):
         pass
 
     @abstractmethod
-    def get(self, obj_id):
+    def get(self, obj_id, profile=None):
         pass
 
     @abstractmethod
-    def get_all(self):
+    def get_all(self, profile=None):
+        pass
+
+    @abstractmethod
+    def get_many(self, obj_ids, profile=None):
         pass
 
     @abstractmethod
@@ -23,24 +33,211 @@ class Repository(ABC):
     def delete(self, obj_id):
         pass
 
+    @abstractmethod
+    def update_columns(self, obj_id, values):
+        pass
+
     @abstractmethod
     def get_by_attribute(self, attr_name, attr_value):
         pass
 
+    @abstractmethod
+    def find_by(self, profile=None, **criteria):
+        pass
+
+    @abstractmethod
+    def find_in_ranges(self, name, ranges, profile=None):
+        pass
+
+    @abstractmethod
+    def find_in(self, name, values, profile=None, projection=None):
+        pass
+
+    @abstractmethod
+    def exists(self, **criteria):
+        pass
+
+    @abstractmethod
+    def version(self, related=(), **criteria):
+        pass
+
+    @abstractmethod
+    def insert_missing(self, rows, key):
+        pass
+
+
+# Rows per multi-row INSERT / values per IN list, well under SQLite's bound-parameter limit
+INSERT_CHUNK_SIZE = 500
+# Probability SQLite's planner is told a filter passed to get_page(index=...) holds
+SELECTIVE_LIKELIHOOD = 0.0625
+
+# Loader strategy names usable in a model's load_profiles
+LOADERS = {
+    'select': lazyload,
+    'joined': joinedload,
+    'selectin': selectinload,
+    'subquery': subqueryload,
+    'raise': raiseload,
+    'noload': noload,
+}
+
 
 class SQLAlchemyRepository(Repository):
     def __init__(self, model):
         self.model = model
+        self._row_types = {}
+
+    def load_options(self, profile):
+        """Turn a named load profile of the model into query options.
+
+        Profiles live on the model as `load_profiles`, mapping a profile
+        name to {relationship name: loader strategy name}. No profile means
+        the relationship defaults declared on the model.
+        """
+        if profile is None:
+            return ()
+        profiles = getattr(self.model, 'load_profiles', {})
+        if profile not in profiles:
+            raise ValueError(f"{self.model.__name__} has no load profile {profile}")
+        return tuple(LOADERS[strategy](getattr(self.model, name))
+                     for name, strategy in profiles[profile].items())
+
+    def _query(self, profile=None, projection=None):
+        """Query for whole objects loaded per `profile`, or for the columns of `projection`"""
+        if projection is None:
+            return self.model.query.options(*self.load_options(profile))
+        columns = self.model.__table__.c
+        return db.session.query(*[columns[name] for name in self._projection(projection)['columns']])
+
+    def _projection(self, name):
+        projections = getattr(self.model, 'projections', {})
+        if name not in projections:
+            raise ValueError(f"{self.model.__name__} has no projection {name}")
+        return projections[name]
+
+    def _rows(self, projection, rows):
+        """Turn projected rows into named tuples carrying their grouped collections.
+
+        Projections live on the model as `projections`, mapping a name to
+        {'columns': column names, 'collections': {name: (owner column,
+        value column)}}. Each collection is read for all the rows with one
+        IN query on its owner column (e.g. an association table's
+        place_id) and becomes a tuple of values on each row, so list
+        endpoints get plain tuples without ORM identity-map or attribute
+        instrumentation costs.
+        """
+        spec = self._projection(projection)
+        collections = spec.get('collections', {})
+        row_type = self._row_types.get(projection)
+        if row_type is None:
+            row_type = namedtuple(f"{self.model.__name__}Row", [*spec['columns'], *collections])
+            self._row_types[projection] = row_type
+
+        ids = [row.id for row in rows]
+        grouped = {}
+        for name, (owner_column, value_column) in collections.items():
+            values = grouped[name] = {}
+            for start in range(0, len(ids), INSERT_CHUNK_SIZE):
+                stmt = db.select(owner_column, value_column).where(
+                    owner_column.in_(ids[start:start + INSERT_CHUNK_SIZE]))
+                for owner_id, value in db.session.execute(stmt):
+                    values.setdefault(owner_id, []).append(value)
+        return [row_type(*row, *(tuple(grouped[name].get(row.id, ())) for name in collections))
+                for row in rows]
 
     def add(self, obj):
         db.session.add(obj)
         db.session.commit()
 
-    def get(self, obj_id):
-        return self.model.query.get(obj_id)
+    def get(self, obj_id, profile=None):
+        return self.model.query.options(*self.load_options(profile)).get(obj_id)
+
+    def get_all(self, profile=None):
+        return self.model.query.options(*self.load_options(profile)).all()
+
+    def get_many(self, obj_ids, profile=None):
+        """Return the objects with these ids in the order asked for, skipping unknown ids.
+
+        One WHERE id IN (...) query (per INSERT_CHUNK_SIZE ids) instead of
+        one query per id; repeated ids are returned once.
+        """
+        obj_ids = list(dict.fromkeys(obj_ids))
+        found = {obj.id: obj for obj in self.find_in('id', obj_ids, profile)}
+        return [found[obj_id] for obj_id in obj_ids if obj_id in found]
+
+    def get_page(self, limit, after=None, profile=None, sort='created_at', descending=False, criteria=(),
+                 projection=None, index=None):
+        """Return one keyset page of objects ordered by (sort column, id).
+
+        With a `projection`, rows are named tuples of its columns (which
+        must include the sort column) instead of objects, see _rows.
+
+        `after` is the (sort value, id) key of the last row of the previous
+        page. One extra row is fetched to know whether another page exists;
+        the key of the last returned row is handed back for the next call,
+        or None when this is the final page. `criteria` are extra SQL
+        filter clauses. An index on (sort column, id) lets the database
+        walk the rows in order and stop after the page. `index` names an
+        index the table must be read through instead, for a filter that
+        narrows the rows more than walking the sort index would.
+        """
+        column = self.model.__table__.c[sort]
+        order = (column.desc(), self.model.id.desc()) if descending else (column, self.model.id)
+        query = self._query(profile, projection)
+        if index is not None:
+            query, criteria = self._through_index(query, index, criteria)
+        query = query.filter(*criteria).order_by(*order)
+        if after is not None:
+            query = query.filter(self._after_key(column, after, descending))
+        rows = query.limit(limit + 1).all()
+
+        next_key = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            attr = column.name if projection else self.model.__mapper__.get_property_by_column(column).key
+            next_key = (getattr(last, attr), last.id)
+        if projection:
+            rows = self._rows(projection, rows)
+        return rows, next_key
+
+    def _through_index(self, query, index, criteria):
+        """Return (query, criteria) making the database read the table through the named index.
+
+        MySQL takes FORCE INDEX. SQLAlchemy renders no table hints for
+        SQLite, so there the criteria on the index's leading column are
+        marked as rarely true with likelihood(), which makes the planner
+        search that index instead of walking the sort index.
+        """
+        table = self.model.__table__
+        dialect = db.engine.dialect.name
+        if dialect in ('mysql', 'mariadb'):
+            return query.with_hint(table, f'FORCE INDEX ({index})', dialect), criteria
+        if dialect != 'sqlite':
+            return query, criteria
+        lead = next(iter(next(i for i in table.indexes if i.name == index).columns))
+
+        def on_lead(criterion):
+            return any(getattr(element, 'key', None) == lead.key and getattr(element, 'table', None) is table
+                       for element in visitors.iterate(criterion))
+        return query, [db.func.likelihood(criterion, db.literal_column(repr(SELECTIVE_LIKELIHOOD))) if on_lead(criterion) else criterion
+                       for criterion in criteria]
 
-    def get_all(self):
-        return self.model.query.all()
+    def _after_key(self, column, key, descending):
+        """Filter for rows past a (sort value, id) page key.
+
+        NULLs sort before every value, as they do on SQLite and MySQL, so
+        they come first ascending and last descending.
+        """
+        value, last_id = key
+        id_column = self.model.id
+        if value is None:
+            tail = db.and_(column.is_(None), id_column < last_id if descending else id_column > last_id)
+            return tail if descending else db.or_(tail, column.isnot(None))
+        if descending:
+            after = db.tuple_(column, id_column) < db.tuple_(value, last_id)
+            return db.or_(after, column.is_(None)) if column.nullable else after
+        return db.tuple_(column, id_column) > db.tuple_(value, last_id)
 
     def update(self, obj_id, data):
         obj = self.get(obj_id)
@@ -55,9 +252,102 @@ class SQLAlchemyRepository(Repository):
             db.session.delete(obj)
             db.session.commit()
 
+    def update_columns(self, obj_id, values):
+        """Apply values or SQL expressions to one row without loading it.
+
+        `values` is a list of (column name, value) pairs assigned in order
+        in a single UPDATE. The statement joins the caller's transaction
+        and is committed with it.
+        """
+        columns = self.model.__table__.c
+        stmt = (db.update(self.model.__table__)
+                .where(columns.id == obj_id)
+                .ordered_values(*[(columns[name], value) for name, value in values]))
+        db.session.execute(stmt)
+
     def get_by_attribute(self, attr_name, attr_value):
         return self.model.query.filter(getattr(self.model, attr_name) == attr_value).first()
 
+    def _filter(self, criteria):
+        """Build a query filtered on column names, e.g. place_id=..."""
+        columns = self.model.__table__.c
+        clauses = []
+        for name, value in criteria.items():
+            if name not in columns:
+                raise ValueError(f"{self.model.__name__} has no column {name}")
+            clauses.append(columns[name] == value)
+        return self.model.query.filter(*clauses)
+
+    def find_in_ranges(self, name, ranges, profile=None, projection=None):
+        """Return objects (or projected rows) whose column falls in any of the [low, high) ranges.
+
+        A high of None leaves the range open-ended. Each range is a plain
+        comparison so an index on the column serves the lookup.
+        """
+        column = self.model.__table__.c[name]
+        conditions = [column >= low if high is None else db.and_(column >= low, column < high)
+                      for low, high in ranges]
+        rows = self._query(profile, projection).filter(db.or_(*conditions)).all()
+        return self._rows(projection, rows) if projection else rows
+
+    def find_by(self, profile=None, **criteria):
+        """Return every object whose columns match all the given values"""
+        return self._filter(criteria).options(*self.load_options(profile)).all()
+
+    def find_in(self, name, values, profile=None, projection=None):
+        """Return objects (or projection rows) whose column is one of values, one IN query per chunk"""
+        column = self.model.__table__.c[name]
+        values = list(dict.fromkeys(values))
+        found = []
+        for start in range(0, len(values), INSERT_CHUNK_SIZE):
+            chunk = values[start:start + INSERT_CHUNK_SIZE]
+            rows = self._query(profile, projection).filter(column.in_(chunk)).all()
+            found.extend(self._rows(projection, rows) if projection else rows)
+        return found
+
+    def exists(self, **criteria):
+        """Return True if at least one object matches all the given values"""
+        return db.session.query(self._filter(criteria).exists()).scalar()
+
+    def version(self, related=(), **criteria):
+        """Return (row count, latest updated_at, ...) of the matching rows in one aggregate query.
+
+        `related` names relationships embedded in responses (e.g. a
+        review's user); the latest updated_at of the joined rows is
+        appended for each, so changing them changes the version too.
+        """
+        query = self._filter(criteria)
+        columns = [db.func.count(self.model.id), db.func.max(self.model.updated_at)]
+        for name in related:
+            relationship = getattr(self.model, name)
+            query = query.join(relationship)
+            columns.append(db.func.max(relationship.property.mapper.class_.updated_at))
+        return tuple(query.with_entities(*columns).one())
+
+    def insert_missing(self, rows, key):
+        """Insert rows (dicts keyed by column name) whose unique `key` column is not taken yet.
+
+        Each chunk is one INSERT ... ON CONFLICT DO NOTHING (SQLite,
+        PostgreSQL) or INSERT ... ON DUPLICATE KEY UPDATE key = key
+        (MySQL), so rows that already exist, or are inserted by another
+        request at the same time, are skipped instead of duplicated.
+        Commits and bypasses the ORM like the bulk importer does.
+        """
+        table = self.model.__table__
+        dialect = db.engine.dialect.name
+        for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+            chunk = rows[start:start + INSERT_CHUNK_SIZE]
+            if dialect == 'sqlite':
+                stmt = sqlite_insert(table).values(chunk).on_conflict_do_nothing(index_elements=[key])
+            elif dialect == 'postgresql':
+                stmt = postgresql_insert(table).values(chunk).on_conflict_do_nothing(index_elements=[key])
+            elif dialect in ('mysql', 'mariadb'):
+                stmt = mysql_insert(table).values(chunk).on_duplicate_key_update({key: table.c[key]})
+            else:
+                raise ValueError(f"No upsert support for {dialect}")
+            db.session.execute(stmt)
+        db.session.commit()
+
 
 class UserRepository(SQLAlchemyRepository):
     def __init__(self):
@@ -0,0 +1,350 @@
+"""
+Full-text search over place titles and descriptions.
+
+Two backends answer `GET /api/v3/places/search?q=`:
+    fulltext: MySQL MATCH ... AGAINST over the FULLTEXT index on
+        places(title, description), ranked by MySQL's relevance score.
+    index: an in-process inverted index ranked with BM25, for SQLite
+        and development. It is built from the places table in a
+        background thread at startup and then kept current by the facade
+        as places are created, retitled, redescribed or deleted. Until
+        the build finishes, searches fall back to unranked LIKE matching
+        and writes are queued, then replayed on the finished index. Each
+        process has its own copy, so it only suits single-process
+        deployments.
+
+Both require every query word to match (stop words are ignored), and
+the API returns snippets of the title and description with the matching
+words in <mark> tags. The in-process index also weighs title words above
+description words; MySQL scores both columns alike.
+
+Postings are kept as parallel arrays of document numbers and term
+frequencies rather than dicts, a few bytes per entry, so a million
+places fit in a few hundred megabytes. Deleted or replaced places leave
+a tombstone until more than half the document numbers are dead, when
+the arrays are compacted; until then document frequencies count them.
+
+A query costs about one binary search per posting of its rarest word.
+When even that word is common (a long posting list), only its champion
+list is scored: the few hundred places where it weighs most, kept up to
+date as places are indexed. Such queries return the best of those,
+falling back to the full list when they do not fill the page.
+search_benchmark.py measures build time, memory and query latency on a
+synthetic corpus.
+
+Config keys:
+    PLACE_SEARCH_BACKEND: 'auto' (fulltext on MySQL, index otherwise),
+        'fulltext' or 'index'
+    PLACE_SEARCH_BUILD: 'thread' (default) builds the index in the
+        background, 'inline' in the caller (used by the tests)
+"""
+import heapq
+import logging
+import math
+import re
+import threading
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from markupsafe import Markup, escape
+
+logger = logging.getLogger(__name__)
+
+WORD = re.compile(r"\w+")
+# Title words count this many times a description word
+TITLE_WEIGHT = 3
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+MAX_TF = 0xFFFF
+SNIPPET_LENGTH = 160
+# Tombstones tolerated before postings are compacted
+MIN_COMPACT = 1024
+# Posting lists longer than CHAMPION_THRESHOLD are searched through their
+# champion list: the CHAMPIONS places where the word weighs the most
+CHAMPION_THRESHOLD = 4000
+CHAMPIONS = 1000
+STOP_WORDS = frozenset("""
+a an and are as at be but by for from has have in into is it its of on or that the their there
+this to was were will with
+""".split())
+
+
+def tokenize(text):
+    """Lowercased words of text, stop words left out"""
+    return [word for word in (match.casefold() for match in WORD.findall(text or ''))
+            if word not in STOP_WORDS]
+
+
+def query_terms(query):
+    """The distinct searchable words of a query, in order"""
+    return list(dict.fromkeys(tokenize(query)))
+
+
+def highlight(text, terms, length=SNIPPET_LENGTH):
+    """HTML-escaped excerpt of text around the first matching word, matches in <mark>"""
+    text = text or ''
+    matches = [match for match in WORD.finditer(text) if match.group().casefold() in terms]
+    start = 0
+    if matches and matches[0].end() > length:
+        # Start a little before the first match, at a word boundary
+        start = text.find(' ', max(0, matches[0].start() - length // 4)) + 1
+    end = min(len(text), start + length)
+    if end < len(text):
+        end = text.rfind(' ', start, end) if ' ' in text[start:end] else end
+    parts, pos = [], start
+    for match in matches:
+        if match.start() < start:
+            continue
+        if match.end() > end:
+            break
+        parts.append(escape(text[pos:match.start()]))
+        parts.append(Markup('<mark>%s</mark>') % match.group())
+        pos = match.end()
+    parts.append(escape(text[pos:end]))
+    return ('…' if start else '') + str(Markup('').join(parts)) + ('…' if end < len(text) else '')
+
+
+class SearchIndex:
+    """Inverted index of places ranked with BM25 (title words weighted higher)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self._postings = {}  # term -> (array of doc numbers, array of term frequencies)
+        self._ids = []  # doc number -> place id, None once deleted
+        self._docs = {}  # place id -> doc number
+        self._lengths = array('I')  # doc number -> weighted word count
+        self._total_length = 0
+        self._deleted = 0
+        self._champions = {}  # term -> min-heap of (impact, doc number, tf) for long posting lists
+
+    def __len__(self):
+        return len(self._docs)
+
+    def add(self, place_id, title, description):
+        """Index a place, replacing what was indexed for it before"""
+        counts = Counter()
+        for word in tokenize(title):
+            counts[word] += TITLE_WEIGHT
+        for word in tokenize(description):
+            counts[word] += 1
+        with self._lock:
+            self._remove(place_id)
+            doc = len(self._ids)
+            self._ids.append(place_id)
+            self._docs[place_id] = doc
+            length = sum(counts.values())
+            self._lengths.append(length)
+            self._total_length += length
+            norm = self._norm()(length)
+            for term, tf in counts.items():
+                tf = min(tf, MAX_TF)
+                entry = self._postings.get(term)
+                if entry is None:
+                    entry = self._postings[term] = (array('I'), array('H'))
+                entry[0].append(doc)
+                entry[1].append(tf)
+                champions = self._champions.get(term)
+                if champions is not None:
+                    push = heapq.heappush if len(champions) < CHAMPIONS else heapq.heappushpop
+                    push(champions, (tf / (tf + norm), doc, tf))
+                elif len(entry[0]) > CHAMPION_THRESHOLD:
+                    self._build_champions(term, *entry)
+
+    def remove(self, place_id):
+        with self._lock:
+            self._remove(place_id)
+
+    def _remove(self, place_id):
+        doc = self._docs.pop(place_id, None)
+        if doc is None:
+            return
+        self._ids[doc] = None
+        self._total_length -= self._lengths[doc]
+        self._deleted += 1
+        if self._deleted > max(MIN_COMPACT, len(self._docs)):
+            self._compact()
+
+    def _compact(self):
+        """Renumber live documents and drop tombstones from every posting list"""
+        renumber = {}
+        ids, lengths = [], array('I')
+        for doc, place_id in enumerate(self._ids):
+            if place_id is not None:
+                renumber[doc] = len(ids)
+                ids.append(place_id)
+                lengths.append(self._lengths[doc])
+        postings = {}
+        for term, (docs, tfs) in self._postings.items():
+            kept = [(renumber[doc], tf) for doc, tf in zip(docs, tfs) if doc in renumber]
+            if kept:
+                postings[term] = (array('I', [doc for doc, _ in kept]), array('H', [tf for _, tf in kept]))
+        self._ids, self._lengths, self._postings = ids, lengths, postings
+        self._docs = {place_id: doc for doc, place_id in enumerate(ids)}
+        self._deleted = 0
+        self._champions = {}
+
+    def _norm(self):
+        """BM25 length normalisation: function of a document's weighted word count"""
+        average = (self._total_length / len(self._docs) if self._docs else 0) or 1
+        base, scale = K1 * (1 - B), K1 * B / average
+        return lambda length: base + scale * length
+
+    def _build_champions(self, term, docs, tfs):
+        """Pick the CHAMPIONS postings of a term with the highest BM25 term weight"""
+        lengths, norm = self._lengths, self._norm()
+        champions = heapq.nlargest(CHAMPIONS, ((tf / (tf + norm(lengths[doc])), doc, tf)
+                                               for doc, tf in zip(docs, tfs)))
+        heapq.heapify(champions)
+        self._champions[term] = champions
+        return champions
+
+    def search(self, terms, limit):
+        """[(place id, score)] of the best `limit` places matching every term, best first.
+
+        Walks the rarest term's postings (or its champion list, when even
+        that is long) and looks each document up in the other terms'
+        sorted postings by binary search, so the cost follows the rarest
+        term rather than the most common one.
+        """
+        with self._lock:
+            postings = []
+            for term in terms:
+                entry = self._postings.get(term)
+                if entry is None:
+                    return []
+                postings.append(entry)
+            if not postings or not self._docs:
+                return []
+            order = sorted(range(len(terms)), key=lambda i: len(postings[i][0]))
+            postings = [postings[i] for i in order]
+            count = len(self._docs)
+            idfs = [math.log(1 + (count - len(docs) + 0.5) / (len(docs) + 0.5)) for docs, _ in postings]
+            (first_docs, first_tfs), rest = postings[0], postings[1:]
+
+            scored = None
+            if len(first_docs) > CHAMPION_THRESHOLD:
+                term = terms[order[0]]
+                champions = self._champions.get(term) or self._build_champions(term, first_docs, first_tfs)
+                scored = self._score(((doc, tf) for _, doc, tf in champions), rest, idfs)
+            if scored is None or len(scored) < limit:
+                scored = self._score(zip(first_docs, first_tfs), rest, idfs)
+            return [(self._ids[doc], score) for score, doc in heapq.nlargest(limit, scored)]
+
+    def _score(self, candidates, rest, idfs):
+        """[(BM25 score, doc number)] of the live (doc, tf) candidates found in every other posting list"""
+        ids, lengths, norm = self._ids, self._lengths, self._norm()
+        scored = []
+        for doc, tf in candidates:
+            if ids[doc] is None:
+                continue
+            tfs = [tf]
+            for docs, term_tfs in rest:
+                j = bisect_left(docs, doc)
+                if j == len(docs) or docs[j] != doc:
+                    break
+                tfs.append(term_tfs[j])
+            else:
+                length_norm = norm(lengths[doc])
+                scored.append((sum(idf * tf * (K1 + 1) / (tf + length_norm) for idf, tf in zip(idfs, tfs)), doc))
+        return scored
+
+
+class PlaceSearch:
+    """Chooses the search backend and owns the in-process index"""
+
+    def __init__(self):
+        self.backend = 'index'
+        self.mode = 'thread'
+        self.index = SearchIndex()
+        self.ready = False
+        self.building = False
+        self._pending = []  # (method name, args) of writes made during a build
+        self._generation = 0  # bumped by clear() so a running build is discarded
+        self._build_lock = threading.Lock()
+
+    def init_app(self, app):
+        backend = app.config.get('PLACE_SEARCH_BACKEND', 'auto')
+        if backend == 'auto':
+            uri = app.config.get('SQLALCHEMY_DATABASE_URI') or ''
+            backend = 'fulltext' if uri.startswith('mysql') else 'index'
+        if backend not in ('fulltext', 'index'):
+            raise ValueError(f"Unknown PLACE_SEARCH_BACKEND {backend}")
+        mode = app.config.get('PLACE_SEARCH_BUILD', 'thread')
+        if mode not in ('thread', 'inline'):
+            raise ValueError(f"Unknown PLACE_SEARCH_BUILD {mode}")
+        self.backend = backend
+        self.mode = mode
+        self.clear()
+
+    def clear(self):
+        """Drop the in-process index and any build under way; start() builds it again"""
+        with self._build_lock:
+            self.index = SearchIndex()
+            self.ready = False
+            self.building = False
+            self._pending = []
+            self._generation += 1
+
+    def start(self, app, rows):
+        """Build the index from (id, title, description) rows unless it is built or being built.
+
+        `rows` is a callable run inside an app context of `app`. In
+        'thread' mode the build runs in a background thread and this
+        returns at once; searches must check `ready` meanwhile.
+        """
+        if self.backend != 'index':
+            return
+        with self._build_lock:
+            if self.ready or self.building:
+                return
+            self.building = True
+            generation = self._generation
+        if self.mode == 'inline':
+            self._build(app, rows, generation)
+        else:
+            threading.Thread(target=self._build, args=(app, rows, generation),
+                             name='place-search-build', daemon=True).start()
+
+    def _build(self, app, rows, generation):
+        index = SearchIndex()
+        try:
+            with app.app_context():
+                for place_id, title, description in rows():
+                    index.add(place_id, title, description)
+        except Exception:
+            logger.exception("Building the place search index failed")
+            with self._build_lock:
+                if generation == self._generation:
+                    self.building = False
+            return
+        with self._build_lock:
+            if generation != self._generation:
+                return
+            # Places written after the build's SELECT began are not in its rows
+            for method, args in self._pending:
+                getattr(index, method)(*args)
+            self.index, self.ready, self.building, self._pending = index, True, False, []
+
+    def add(self, place_id, title, description):
+        """Index a new or changed place; during a build it is queued until the build ends"""
+        self._write('add', place_id, title, description)
+
+    def remove(self, place_id):
+        self._write('remove', place_id)
+
+    def _write(self, method, *args):
+        # Before any build nothing is needed: the build will read the committed row
+        if self.backend != 'index':
+            return
+        with self._build_lock:
+            if self.ready:
+                getattr(self.index, method)(*args)
+            elif self.building:
+                self._pending.append((method, args))
+
+
+search = PlaceSearch()
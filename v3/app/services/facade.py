@@ -2,16 +2,35 @@ from app.persistence.repository import SQLAlchemyRepository
 from app.models.places import Place
 from app.models.users import User
 from app.models.reviews import Review
-from app.models.amenity import Amenity
+from app.models.amenity import Amenity, place_amenity_asc, normalize_name
 from app.persistence.repository import UserRepository
-from app import db
+from app.persistence.cache import CachedRepository, cache
+from app import db, geo
+from sqlalchemy.exc import IntegrityError
+from app.images import images
+from app.search import search, query_terms
+from sqlalchemy.dialects.mysql import match
+from flask import current_app
+
+# Place listing sort keys -> places column, each backed by a (column, id) index
+PLACE_SORTS = {'created_at': 'created_at', 'price': 'price', 'rating': 'avg_rating'}
+
+
+class DuplicateReviewError(ValueError):
+    """The user already has a review of this place"""
+
+
+class DuplicateAmenityError(ValueError):
+    """Another amenity already has this name"""
+
 
 class HBnBFacade:
     def __init__(self):
-        self.user_repo = UserRepository()
-        self.place_repo = SQLAlchemyRepository(Place)
+        # Hot single-entity reads go through the entity cache
+        self.user_repo = CachedRepository(UserRepository())
+        self.place_repo = CachedRepository(SQLAlchemyRepository(Place))
         self.review_repo = SQLAlchemyRepository(Review)
-        self.amenity_repo = SQLAlchemyRepository(Amenity)
+        self.amenity_repo = CachedRepository(SQLAlchemyRepository(Amenity))
 
     # --- CRU User ---
     def create_user(self, user_data):
@@ -22,9 +41,27 @@ class HBnBFacade:
     def get_user(self, user_id):
         return self.user_repo.get(user_id)
 
+    def get_users(self, user_ids):
+        """Users with the given ids in the order asked for; unknown ids are skipped"""
+        return self.user_repo.get_many(user_ids)
+
     def get_user_by_email(self, email):
         return self.user_repo.get_user_by_email(email)
 
+    def authenticate(self, email, password):
+        """Return the user for valid credentials, or None.
+
+        A hash made with an outdated work factor is replaced while the
+        plaintext password is at hand.
+        """
+        user = self.get_user_by_email(email)
+        if not user or not user.verify_password(password):
+            return None
+        if user.password_needs_rehash():
+            user.hash_password(password)
+            db.session.commit()
+        return user
+
     def update_user(self, user_id, user_data):
         """Update user information"""
         user = self.user_repo.get(user_id)
@@ -59,16 +96,16 @@ class HBnBFacade:
         try:
             # Handle cascade deletions manually if needed
             # Delete user's reviews first
-            user_reviews = [review for review in self.review_repo.get_all() if review.user.id == user_id]
-            for review in user_reviews:
+            for review in self.review_repo.find_by(user_id=user_id):
+                self.place_repo.update_columns(review.place_id, Place.rating_delta_values(-1, -review.rating))
                 db.session.delete(review)
 
             # Delete user's places (this will also handle place-related reviews)
-            user_places = [place for place in self.place_repo.get_all() if place.owner.id == user_id]
-            for place in user_places:
+            places = self.place_repo.find_by(owner_id=user_id)
+            place_ids = [place.id for place in places]
+            for place in places:
                 # Delete reviews for this place
-                place_reviews = [review for review in self.review_repo.get_all() if review.place.id == place.id]
-                for review in place_reviews:
+                for review in self.review_repo.find_by(place_id=place.id):
                     db.session.delete(review)
                 # Delete the place
                 db.session.delete(place)
@@ -76,6 +113,8 @@ class HBnBFacade:
             # Finally delete the user
             db.session.delete(user)
             db.session.commit()
+            for place_id in place_ids:
+                search.remove(place_id)
 
             return True
         except Exception as e:
@@ -122,20 +161,187 @@ class HBnBFacade:
         # 5. Store the place in repository
         self.place_repo.add(place)
 
+        # 6. Queue resized copies of its picture and make it searchable
+        images.generate(place.id, place.title)
+        search.add(place.id, place.title, place.description)
+
         return place
 
-    def get_place(self, place_id):
+    def get_place(self, place_id, profile=None):
         # Placeholder for logic to retrieve a place by ID, including associated owner and amenities
-        place = self.place_repo.get(place_id)
+        place = self.place_repo.get(place_id, profile)
         # Check if place exists and raise error if not
         if place is None:
             raise ValueError(f"Place with ID {place_id} not found")
         return place
 
+    def get_place_details(self, place_id):
+        """Return a place with its owner (joined) and amenities (one IN query).
+
+        Read past the entity cache: a cached copy would carry its owner
+        and amenities as they were when it was cached.
+        """
+        # A query rather than an identity-map get, so the profile applies
+        # even when the place is already in the session
+        places = self.place_repo.repo.get_many([place_id], profile='page')
+        if not places:
+            raise ValueError(f"Place with ID {place_id} not found")
+        return places[0]
+
+    def get_reviews_page_by_place(self, place_id, limit, after=None):
+        """Return (reviews, next_key): one keyset page of a place's reviews, newest first.
+
+        Authors are joined in, so a page is one query however many
+        reviews the place has.
+        """
+        return self.review_repo.get_page(limit, after, profile='list', descending=True,
+                                         criteria=[Review._place_id == place_id])
+
+    def get_places(self, place_ids, profile='list'):
+        """Places with the given ids in the order asked for; unknown ids are skipped"""
+        return self.place_repo.get_many(place_ids, profile)
+
     def get_all_places(self):
-        if self.place_repo.get_all() is None:
+        places = self.place_repo.get_all()
+        if places is None:
             raise ValueError ("Places not found")
-        return self.place_repo.get_all()
+        return places
+
+    def get_places_page(self, limit, after=None, sort='created_at', descending=False,
+                        min_price=None, max_price=None, amenity_ids=None, min_rating=None):
+        """Return (places, next_key) for one filtered, sorted page of the place listing.
+
+        Places come back as "list" projection rows (plain named tuples,
+        no ORM objects) with their amenity ids read by one IN query, so a
+        page costs two queries however many places match. Places must
+        have every one of `amenity_ids`; min_rating leaves out places
+        without reviews. When min_rating is the only filter, the places
+        are read through the rating index rather than by walking the
+        sort index and testing every row.
+        """
+        if sort not in PLACE_SORTS:
+            raise ValueError(f"sort must be one of {', '.join(PLACE_SORTS)}")
+        if min_price is not None and max_price is not None and min_price > max_price:
+            raise ValueError("min_price cannot be greater than max_price")
+
+        criteria = []
+        if min_price is not None:
+            criteria.append(Place._price >= min_price)
+        if max_price is not None:
+            criteria.append(Place._price <= max_price)
+        if min_rating is not None:
+            criteria.append(Place._avg_rating >= min_rating)
+        if amenity_ids:
+            amenity_ids = set(amenity_ids)
+            # Places linked to all of the amenities, read from the association primary key
+            having_all = (db.select(place_amenity_asc.c.place_id)
+                          .where(place_amenity_asc.c.amenity_id.in_(amenity_ids))
+                          .group_by(place_amenity_asc.c.place_id)
+                          .having(db.func.count() == len(amenity_ids)))
+            criteria.append(Place.id.in_(having_all))
+
+        index = None
+        if min_rating is not None and min_price is None and max_price is None and not amenity_ids:
+            index = 'ix_places_avg_rating_id'
+        return self.place_repo.get_page(limit, after, projection='list', sort=PLACE_SORTS[sort],
+                                        descending=descending, criteria=criteria, index=index)
+
+    def _places_in_bbox(self, bbox, origin, limit, radius_km=None):
+        """Up to `limit` places inside a bbox (and radius_km of origin) as (place, distance_km) pairs, nearest first.
+
+        The geohash cells covering the bbox are read nearest to origin
+        first, in batches of doubling size, as range scans of just (id,
+        latitude, longitude). Reading stops once `limit` matches are no
+        farther than every unread cell, so a dense area costs about the
+        cells around the origin rather than the whole bbox. Only the
+        returned places are then loaded.
+        """
+        cells = sorted((geo.distance_to_cell(origin[0], origin[1], geo.cell_bounds(prefix)), prefix)
+                       for prefix in geo.covering_prefixes(bbox))
+        matches = []  # (distance, place id)
+        start, size = 0, 1
+        while start < len(cells):
+            nearest = cells[start][0]
+            if radius_km is not None and nearest > radius_km:
+                break
+            if len(matches) >= limit and matches[limit - 1][0] <= nearest:
+                break
+            ranges = [geo.prefix_range(prefix) for _, prefix in cells[start:start + size]]
+            for row in self.place_repo.find_in_ranges('geohash', ranges, projection='location'):
+                if geo.in_bbox(row.latitude, row.longitude, bbox):
+                    distance = geo.distance_km(origin[0], origin[1], row.latitude, row.longitude)
+                    if radius_km is None or distance <= radius_km:
+                        matches.append((distance, row.id))
+            matches.sort()
+            start, size = start + size, size * 2
+
+        matches = matches[:limit]
+        places = {place.id: place for place in self.place_repo.find_in('id', [place_id for _, place_id in matches],
+                                                                        projection='list')}
+        return [(places[place_id], distance) for distance, place_id in matches if place_id in places]
+
+    def search_places_in_bbox(self, bbox, limit):
+        """Return up to `limit` places inside a bbox, nearest to its centre first"""
+        min_lat, min_lng, max_lat, max_lng = bbox
+        if max_lng < min_lng:
+            max_lng += 360.0  # crosses the antimeridian
+        center = ((min_lat + max_lat) / 2, ((min_lng + max_lng) / 2 + 180.0) % 360.0 - 180.0)
+        return self._places_in_bbox(bbox, center, limit)
+
+    def search_places_nearby(self, latitude, longitude, radius_km, limit):
+        """Return up to `limit` places within radius_km of a point, nearest first"""
+        bbox = geo.bbox_around(latitude, longitude, radius_km)
+        return self._places_in_bbox(bbox, (latitude, longitude), limit, radius_km)
+
+    def search_places_text(self, query, limit):
+        """Return up to `limit` (place, score) pairs matching every word of query, best first.
+
+        Places are "list" projection rows. Scores come from MySQL
+        FULLTEXT or the in-process BM25 index (see app.search), so they
+        only compare within one backend. While the in-process index is
+        still being built, places whose title or description contain
+        every word are returned unranked, with a score of None.
+        """
+        terms = query_terms(query)
+        if not terms:
+            raise ValueError("q must contain at least one word that is not a stop word")
+        if search.backend == 'fulltext':
+            columns = Place.__table__.c
+            # Boolean mode so every word is required, as with the in-process index
+            relevance = match(columns.title, columns.description,
+                              against=' '.join(f'+{term}' for term in terms)).in_boolean_mode()
+            hits = db.session.execute(db.select(columns.id, relevance)
+                                      .where(relevance > 0)
+                                      .order_by(relevance.desc(), columns.id)
+                                      .limit(limit)).all()
+        else:
+            self.start_search_index(current_app._get_current_object())
+            if search.ready:
+                hits = search.index.search(terms, limit)
+            else:
+                hits = [(place_id, None) for place_id in self._search_places_like(terms, limit)]
+        places = {place.id: place for place in self.place_repo.find_in('id', [place_id for place_id, _ in hits],
+                                                                        projection='list')}
+        return [(places[place_id], score) for place_id, score in hits if place_id in places]
+
+    def start_search_index(self, app):
+        """Build the in-process search index in the background unless it is built or building"""
+        search.start(app, self._place_text_rows)
+
+    @staticmethod
+    def _search_places_like(terms, limit):
+        """Ids of up to `limit` places containing every term, in table order (no ranking)"""
+        columns = Place.__table__.c
+        criteria = [columns.title.icontains(term, autoescape=True) |
+                    columns.description.icontains(term, autoescape=True) for term in terms]
+        return db.session.scalars(db.select(columns.id).where(*criteria).limit(limit)).all()
+
+    @staticmethod
+    def _place_text_rows():
+        """(id, title, description) of every place, streamed for the search index build"""
+        columns = Place.__table__.c
+        return db.session.execute(db.select(columns.id, columns.title, columns.description)
+                                  .execution_options(yield_per=10000))
 
     def update_place(self, place_id, place_data):
         """Update place information, handling relationships properly"""
@@ -156,8 +362,10 @@ class HBnBFacade:
                     raise ValueError(f"Amenity with ID {amenity_id} not found")
                 amenities.append(amenity)
 
-            # Update the amenities relationship
+            # Update the amenities relationship; the places row itself may not
+            # change, so bump updated_at by hand for conditional GETs
             place.amenities = amenities
+            place.save()
 
         # Update other fields using the repository
         if place_data:  # Only call update if there are other fields to update
@@ -168,21 +376,48 @@ class HBnBFacade:
             from app import db
             db.session.commit()
 
-        return self.place_repo.get(place_id)
+        place = self.place_repo.get(place_id)
+        if 'title' in place_data:
+            images.generate(place.id, place.title)
+        if 'title' in place_data or 'description' in place_data:
+            search.add(place.id, place.title, place.description)
+        return place
 
 
     # --- CRU Amenity ---
     def create_amenity(self, amenity_data):
-        amenity = Amenity(**amenity_data)
-        # Check if amenity is already existing
-        check_amenity = self.amenity_repo.get(amenity.id)
-        # If amenity does not exist, create new
-        if check_amenity is None:
-            self.amenity_repo.add(amenity)
-            return amenity
-        # Else, return an existing amenity
-        else:
-            return self.amenity_repo.get(amenity.id)
+        """Return the amenity with this name, creating it if there is none yet"""
+        amenity, _ = self.create_amenities([amenity_data])[0]
+        return amenity
+
+    def create_amenities(self, amenities_data):
+        """Create amenities by name with one upsert, reusing names that already exist.
+
+        Names match case-insensitively with whitespace collapsed (see
+        normalize_name), so the call is idempotent. Returns one
+        (amenity, created) pair per input, in input order; inputs naming
+        the same amenity share it.
+        """
+        candidates = []
+        for position, amenity_data in enumerate(amenities_data):
+            try:
+                candidates.append(Amenity(**amenity_data))
+            except (ValueError, AttributeError, TypeError) as e:
+                prefix = f"Amenity {position}: " if len(amenities_data) > 1 else ""
+                raise ValueError(f"{prefix}{e}")
+
+        fresh = {}
+        for amenity in candidates:
+            fresh.setdefault(amenity._name_key, amenity)
+        self.amenity_repo.insert_missing([
+            {'id': amenity.id, 'created_at': amenity.created_at, 'updated_at': amenity.updated_at,
+             'name': amenity.name, 'name_key': amenity._name_key}
+            for amenity in fresh.values()
+        ], 'name_key')
+
+        stored = {amenity._name_key: amenity for amenity in self.amenity_repo.find_in('name_key', fresh)}
+        return [(stored[amenity._name_key], stored[amenity._name_key].id == fresh[amenity._name_key].id)
+                for amenity in candidates]
 
     def get_amenity(self, amenity_id):
         # If amenity_id doesn't exist
@@ -193,16 +428,30 @@ class HBnBFacade:
 
     def get_all_amenities(self):
         # If there are no amenities
-        if self.amenity_repo.get_all() is None:
+        amenities = self.amenity_repo.get_all(profile='list')
+        if amenities is None:
             raise ValueError ("Amenities not found")
-        return self.amenity_repo.get_all()
+        return amenities
+
+    def get_amenities_version(self):
+        """(count, latest change) of all amenities"""
+        return self.amenity_repo.version()
 
     def update_amenity(self, amenity_id, amenity_data):
         # If amenity_id doesn't exist
         check_id = self.amenity_repo.get(amenity_id)
         if check_id is None:
             raise ValueError (f"Amenity with ID {amenity_id} not found")
-        self.amenity_repo.update(amenity_id, amenity_data)
+        if isinstance(amenity_data.get('name'), str):
+            taken = self.amenity_repo.get_by_attribute('_name_key', normalize_name(amenity_data['name']))
+            if taken is not None and taken.id != amenity_id:
+                raise DuplicateAmenityError(f"Amenity {taken.name} already exists")
+        try:
+            self.amenity_repo.update(amenity_id, amenity_data)
+        except IntegrityError:
+            # The unique name_key caught a rename the check above raced with
+            db.session.rollback()
+            raise DuplicateAmenityError(f"Amenity {amenity_data['name']} already exists")
         return self.amenity_repo.get(amenity_id)
 
     # --- CRU Review ---
@@ -234,17 +483,38 @@ class HBnBFacade:
             user=user
         )
 
-        self.review_repo.add(review)
+        # Aggregates are updated in the same transaction as the review insert;
+        # the review is not in the session yet, so the UPDATE must not autoflush
+        with db.session.no_autoflush:
+            self.place_repo.update_columns(place.id, Place.rating_delta_values(1, rating))
+        user_id, place_id = user.id, place.id
+        try:
+            self.review_repo.add(review)
+        except IntegrityError:
+            db.session.rollback()
+            # uq_reviews_user_id_place_id: a concurrent request got there first
+            if self.has_reviewed(user_id, place_id):
+                raise DuplicateReviewError("You have already reviewed this place")
+            # Otherwise a foreign key: the user or place was deleted meanwhile
+            raise ValueError("Invalid user_id or place_id")
         return review
 
-    def get_review(self, review_id):
-        return self.review_repo.get(review_id)
+    def has_reviewed(self, user_id, place_id):
+        """True if the user already reviewed the place (one unique index lookup)"""
+        return self.review_repo.exists(user_id=user_id, place_id=place_id)
+
+    def get_review(self, review_id, profile=None):
+        return self.review_repo.get(review_id, profile)
 
     def get_all_reviews(self):
-        return self.review_repo.get_all()
+        return self.review_repo.get_all(profile='list')
 
     def get_reviews_by_place(self, place_id):
-        return [review for review in self.review_repo.get_all() if review.place.id == place_id]
+        return self.review_repo.find_by(profile='list', place_id=place_id)
+
+    def get_reviews_by_place_version(self, place_id):
+        """(count, latest review change, latest author change) of a place's reviews"""
+        return self.review_repo.version(related=['user'], place_id=place_id)
 
     def update_review(self, review_id, review_data):
         review = self.review_repo.get(review_id)
@@ -256,16 +526,47 @@ class HBnBFacade:
             new_rating = review_data['rating']
             if not isinstance(new_rating, (int, float)) or not (1 <= new_rating <= 5):
                 raise ValueError("Rating must be between 1 and 5")
+            delta = new_rating - review.rating
+            if delta:
+                self.place_repo.update_columns(review.place_id, Place.rating_delta_values(0, delta))
             review.rating = new_rating
 
         if 'text' in review_data:
             review.text = review_data['text']
 
+        db.session.commit()
         return review
 
     def delete_review(self, review_id):
         review = self.review_repo.get(review_id)
         if review:
+            self.place_repo.update_columns(review.place_id, Place.rating_delta_values(-1, -review.rating))
             self.review_repo.delete(review_id)
             return True
-        return False
\ No newline at end of file
+        return False
+
+    def rebuild_place_ratings(self):
+        """Recompute every place's review aggregates from the reviews table.
+
+        Returns the number of places whose stored aggregates had drifted.
+        """
+        places = Place.__table__
+        reviews = Review.__table__
+        count = (db.select(db.func.count(reviews.c.id))
+                 .where(reviews.c.place_id == places.c.id).scalar_subquery())
+        total = (db.select(db.func.coalesce(db.func.sum(reviews.c.rating), 0))
+                 .where(reviews.c.place_id == places.c.id).scalar_subquery())
+
+        drifted = db.session.execute(
+            db.select(db.func.count()).select_from(places)
+            .where(db.or_(places.c.review_count != count, places.c.rating_sum != total))
+        ).scalar()
+        # avg_rating first: MySQL evaluates SET left to right
+        db.session.execute(db.update(places).ordered_values(
+            (places.c.avg_rating, db.case((count > 0, total * 1.0 / count), else_=None)),
+            (places.c.review_count, count),
+            (places.c.rating_sum, total),
+        ))
+        db.session.commit()
+        cache.clear()
+        return drifted
\ No newline at end of file
@@ -0,0 +1,297 @@
+"""
+Bulk importer for seeding users, amenities, places and reviews.
+
+Records are streamed from JSONL or CSV, validated with the model setters,
+and written with bulk_insert_mappings/executemany in chunked commits
+instead of one facade call (and one commit) per entity.
+
+References between records are resolved through in-memory ref -> id maps
+filled as rows are imported, falling back to one lookup in the database:
+    users:     ref defaults to email; referenced by id or email
+    amenities: ref defaults to name;  referenced by id or name
+    places:    ref defaults to title; referenced by id or title
+Places name their owner in `owner` (or `owner_id`) and their amenities in
+`amenities` (a list, or ';'-separated in CSV). Reviews name `place` and
+`user` (or `place_id`/`user_id`). As in the API, a user reviews a place at
+most once and never their own: such rows are rejected one by one rather
+than failing their whole batch on uq_reviews_user_id_place_id.
+"""
+import csv
+import json
+import time
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+from app import db, geo
+from app.hashing import hasher
+from app.images import images
+from app.search import search
+from app.models.users import User
+from app.models.places import Place
+from app.models.reviews import Review
+from app.models.amenity import Amenity, place_amenity_asc
+
+KINDS = ('users', 'amenities', 'places', 'reviews')
+MODELS = {'users': User, 'amenities': Amenity, 'places': Place, 'reviews': Review}
+FORMATS = ('jsonl', 'csv')
+DEFAULT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+
+# kind -> (model, column holding the natural key used as default ref)
+LOOKUPS = {
+    'users': (User, User._email),
+    'amenities': (Amenity, Amenity._name),
+    'places': (Place, Place._title),
+}
+
+
+def read_records(stream, fmt):
+    """Yield one dict per JSONL line or CSV row of a text stream"""
+    if fmt == 'jsonl':
+        for line_no, line in enumerate(stream, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Line {line_no} is not valid JSON: {e}")
+    elif fmt == 'csv':
+        yield from csv.DictReader(stream)
+    else:
+        raise ValueError(f"Unsupported format {fmt}, expected one of {', '.join(FORMATS)}")
+
+
+def validated(model, values):
+    """Run the model's property setters over plain values.
+
+    The setters are applied to a scratch object rather than a model
+    instance, so validation costs no ORM instrumentation. Returns the
+    values as stored by the setters, keyed by mapped attribute name.
+    """
+    scratch = SimpleNamespace()
+    for name, value in values.items():
+        getattr(model, name).fset(scratch, value)
+    return vars(scratch)
+
+
+def to_bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes')
+    return bool(value)
+
+
+def to_list(value):
+    if value is None or value == '':
+        return []
+    if isinstance(value, str):
+        return [item.strip() for item in value.split(';') if item.strip()]
+    return list(value)
+
+
+class BulkImporter:
+    """Imports streams of records in chunked, bulk-inserted batches.
+
+    One importer keeps its ref -> id maps across calls, so users and
+    amenities imported first can be referenced by the places and reviews
+    imported after them.
+    """
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, bcrypt_rounds=None, reuse_hashes=False):
+        self.batch_size = batch_size
+        # Lower work factors make seeding large staging datasets feasible
+        self.bcrypt_rounds = bcrypt_rounds
+        # Hash each distinct plaintext once; only for synthetic/load-test data
+        self.reuse_hashes = reuse_hashes
+        self._hashes = {}
+        self.ids = {kind: {} for kind in KINDS}
+        self.owners = {}  # place id -> owner id, for the own-place review check
+        self.amenity_keys = set()  # normalized names of amenities imported so far
+
+    def import_stream(self, kind, stream, fmt='jsonl'):
+        """Import a text stream of JSONL or CSV records"""
+        return self.import_records(kind, read_records(stream, fmt))
+
+    def import_records(self, kind, records):
+        """Import an iterable of dict records and return a report"""
+        if kind not in KINDS:
+            raise ValueError(f"Unknown kind {kind}, expected one of {', '.join(KINDS)}")
+        build = getattr(self, f'_build_{kind}')
+
+        started = time.perf_counter()
+        imported = failed = 0
+        errors = []
+        batch, links, refs = [], [], []
+
+        def flush():
+            nonlocal imported, failed
+            if not batch:
+                return
+            try:
+                db.session.bulk_insert_mappings(MODELS[kind], batch)
+                if links:
+                    db.session.execute(place_amenity_asc.insert(), links)
+                if kind == 'reviews':
+                    self._add_to_place_ratings(batch)
+                db.session.commit()
+                imported += len(batch)
+                if kind == 'places':
+                    for mapping in batch:
+                        images.generate(mapping['id'], mapping['_title'])
+                        search.add(mapping['id'], mapping['_title'], mapping['_description'])
+            except Exception as e:
+                db.session.rollback()
+                failed += len(batch)
+                errors.append({'rows': f"{batch[0]['row']}-{batch[-1]['row']}", 'error': str(e.__cause__ or e)})
+                for ref in refs:
+                    self.ids[kind].pop(ref, None)
+                if kind == 'amenities':
+                    self.amenity_keys.difference_update(mapping['_name_key'] for mapping in batch)
+            batch.clear()
+            links.clear()
+            refs.clear()
+
+        for row_no, record in enumerate(records, 1):
+            try:
+                mapping, ref, row_links = build(record)
+            except (ValueError, KeyError, TypeError) as e:
+                failed += 1
+                message = f"Missing field {e}" if isinstance(e, KeyError) else str(e)
+                errors.append({'rows': str(row_no), 'error': message})
+                continue
+
+            mapping['row'] = row_no
+            batch.append(mapping)
+            links.extend(row_links)
+            if ref is not None:
+                self.ids[kind][ref] = mapping['id']
+                refs.append(ref)
+            if len(batch) >= self.batch_size:
+                flush()
+        flush()
+
+        elapsed = time.perf_counter() - started
+        return {
+            'kind': kind,
+            'imported': imported,
+            'failed': failed,
+            'errors': errors[:MAX_REPORTED_ERRORS],
+            'seconds': round(elapsed, 3),
+            'rows_per_second': round(imported / elapsed) if elapsed else imported,
+        }
+
+    @staticmethod
+    def _add_to_place_ratings(reviews):
+        """Fold a batch of new reviews into the place aggregates, one executemany"""
+        deltas = {}
+        for review in reviews:
+            count, total = deltas.get(review['_place_id'], (0, 0))
+            deltas[review['_place_id']] = (count + 1, total + review['_rating'])
+
+        places = Place.__table__
+        stmt = (db.update(places)
+                .where(places.c.id == db.bindparam('b_place_id'))
+                .ordered_values(*[(places.c[name], value) for name, value in
+                                  Place.rating_delta_values(db.bindparam('b_count'), db.bindparam('b_total'))]))
+        db.session.execute(stmt, [{'b_place_id': place_id, 'b_count': count, 'b_total': total}
+                                  for place_id, (count, total) in deltas.items()])
+
+    # --- Reference resolution ---
+    def resolve(self, kind, ref):
+        """Return the id of an imported or existing entity by ref, id or natural key"""
+        ids = self.ids[kind]
+        if ref in ids:
+            return ids[ref]
+        model, natural_key = LOOKUPS[kind]
+        row = db.session.query(model.id).filter(db.or_(model.id == ref, natural_key == ref)).first()
+        if row is None:
+            raise ValueError(f"Unknown {kind[:-1]} {ref}")
+        ids[ref] = row.id
+        return row.id
+
+    def _claim(self, kind, ref):
+        if ref in self.ids[kind]:
+            raise ValueError(f"Duplicate {kind[:-1]} {ref}")
+        return ref
+
+    def _hash(self, password):
+        if self.reuse_hashes and password in self._hashes:
+            return self._hashes[password]
+        hashed = hasher.hash(password, self.bcrypt_rounds)
+        if self.reuse_hashes:
+            self._hashes[password] = hashed
+        return hashed
+
+    @staticmethod
+    def _base_mapping():
+        now = datetime.utcnow()  # UTC like BaseModel, so imported rows order and compare with the rest
+        return {'id': str(uuid.uuid4()), 'created_at': now, 'updated_at': now}
+
+    # --- Builders: record -> (mapping, ref, association rows) ---
+    def _build_users(self, record):
+        mapping = self._base_mapping()
+        mapping.update(validated(User, {
+            'first_name': record['first_name'],
+            'last_name': record['last_name'],
+            'email': record['email'],
+            'is_admin': to_bool(record.get('is_admin', False)),
+        }))
+        if record.get('password_hash'):
+            mapping['_password'] = record['password_hash']
+        else:
+            mapping['_password'] = self._hash(record['password'])
+        ref = self._claim('users', record.get('ref') or mapping['_email'])
+        return mapping, ref, []
+
+    def _build_amenities(self, record):
+        mapping = self._base_mapping()
+        mapping.update(validated(Amenity, {'name': record['name']}))
+        # Names are unique by normalize_name: "wi-fi" after "Wi-Fi" fails its row, not the batch
+        key = mapping['_name_key']
+        if key in self.amenity_keys or db.session.query(
+                db.exists().where(Amenity._name_key == key)).scalar():
+            raise ValueError(f"Amenity {mapping['_name']} already exists")
+        ref = self._claim('amenities', record.get('ref') or mapping['_name'])
+        self.amenity_keys.add(key)
+        return mapping, ref, []
+
+    def _build_places(self, record):
+        mapping = self._base_mapping()
+        mapping.update(validated(Place, {
+            'title': record['title'],
+            'description': record.get('description', ''),
+            'price': float(record['price']),
+            'latitude': float(record['latitude']),
+            'longitude': float(record['longitude']),
+        }))
+        # bulk inserts skip the mapper events that normally set the geohash
+        mapping['_geohash'] = geo.encode(mapping['_latitude'], mapping['_longitude'])
+        mapping['_owner_id'] = self.resolve('users', record.get('owner_id') or record['owner'])
+        self.owners[mapping['id']] = mapping['_owner_id']
+        amenity_refs = to_list(record.get('amenity_ids') or record.get('amenities'))
+        links = [{'amenity_id': self.resolve('amenities', ref), 'place_id': mapping['id']}
+                 for ref in dict.fromkeys(amenity_refs)]
+        ref = record.get('ref') or mapping['_title']
+        return mapping, ref, links
+
+    def _build_reviews(self, record):
+        rating = int(record['rating'])
+        if not 1 <= rating <= 5:
+            raise ValueError("Rating must be between 1 and 5")
+        mapping = self._base_mapping()
+        mapping.update(validated(Review, {'text': record['text'], 'rating': rating}))
+        mapping['_place_id'] = self.resolve('places', record.get('place_id') or record['place'])
+        mapping['_user_id'] = self.resolve('users', record.get('user_id') or record['user'])
+        if self._owner_of(mapping['_place_id']) == mapping['_user_id']:
+            raise ValueError("Users cannot review their own place")
+        # The (user, place) pair is the review's ref, so pairs seen earlier in the import are caught too
+        ref = (mapping['_user_id'], mapping['_place_id'])
+        if ref in self.ids['reviews'] or db.session.query(
+                db.exists().where(Review._user_id == ref[0], Review._place_id == ref[1])).scalar():
+            raise ValueError("User has already reviewed this place")
+        return mapping, ref, []
+
+    def _owner_of(self, place_id):
+        if place_id not in self.owners:
+            self.owners[place_id] = db.session.query(Place._owner_id).filter(Place.id == place_id).scalar()
+        return self.owners[place_id]
@@ -0,0 +1,195 @@
+"""
+Stateless sessions carried in signed, expiring tokens.
+
+The default Flask-Session 'sqlalchemy' backend reads (and usually
+rewrites) a row of the sessions table on every request that touches
+`session`, including every login_required check. With
+SESSION_BACKEND = 'token' the session dict itself travels in a token
+signed with SECRET_KEY instead, so identity checks need no database
+round trip:
+    - the token is sent back in the session cookie, or by API clients
+      as `Authorization: Bearer <token>` (returned by POST /auth/login),
+    - it expires PERMANENT_SESSION_LIFETIME after it was signed; cookie
+      sessions are re-signed on each response, so active users stay in,
+    - changing or clearing the session (login, logout) revokes the old
+      token, and every older one of the same user, on an in-memory
+      denylist keyed by user id until those tokens would have expired.
+
+The denylist lives in this process only. Behind several worker
+processes, a revoked token stays valid on the other workers until it
+expires, so keep PERMANENT_SESSION_LIFETIME short.
+
+Each token records when its content was first signed (cookie refreshes
+keep that time), and the denylist holds, per user, the issue time up to
+which their tokens are revoked. Logging out on one device therefore also
+ends that user's sessions started earlier, and a user logging in and out
+in a loop only ever moves their own entry. The list holds at most
+SESSION_TOKEN_DENYLIST_SIZE users: when it is full, expired entries are
+dropped and then the oldest, whose cutoff becomes a floor applied to
+every user. That may end some sessions early, but never revives a
+revoked token and never refuses a login.
+"""
+import threading
+import time
+from datetime import datetime, timezone
+from flask.sessions import SecureCookieSession, SessionInterface
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+SALT = 'hbnb-session-token'
+ISSUED_AT = '_iat'  # session key holding when the token's content was first signed
+USER_ID = 'user_id'  # session key of the logged-in user, whose tokens are revoked together
+DEFAULT_DENYLIST_SIZE = 10000
+
+
+class TokenSession(SecureCookieSession):
+    """Session restored from a token.
+
+    issued_at and user_id are those of the token the request presented
+    (None for a new session) and bearer tells whether it came in the
+    Authorization header rather than the cookie.
+    """
+
+    def __init__(self, initial=None, issued_at=None, user_id=None, bearer=False):
+        super().__init__(initial)
+        self.issued_at = issued_at
+        self.user_id = user_id
+        self.bearer = bearer
+
+
+class Denylist:
+    """Per user, the issue time up to which their tokens are revoked.
+
+    Each entry is kept until the tokens it revokes would have expired.
+    At most max_size users are held: past that, the entry revoked
+    longest ago is evicted and its cutoff raises `floor`, which revokes
+    every token issued up to it, whoever it belongs to.
+    """
+
+    def __init__(self, max_size=DEFAULT_DENYLIST_SIZE):
+        self.max_size = max_size
+        self.floor = 0.0
+        self._entries = {}  # user id -> (cutoff issue time, time after which it is dead anyway)
+        self._lock = threading.Lock()
+
+    def revoke(self, user_id, issued_before, expires_at):
+        """Revoke the user's tokens issued at or before issued_before"""
+        with self._lock:
+            cutoff, _ = self._entries.pop(user_id, (issued_before, None))
+            self._entries[user_id] = (max(cutoff, issued_before), expires_at)
+            if len(self._entries) > self.max_size:
+                self._prune()
+            while len(self._entries) > self.max_size:
+                # Dicts keep insertion order and revoke() reinserts, so the first entry is the oldest
+                oldest = next(iter(self._entries))
+                self.floor = max(self.floor, self._entries.pop(oldest)[0])
+
+    def revoked(self, user_id, issued_at):
+        """True if a token of user_id first signed at issued_at is revoked"""
+        if issued_at <= self.floor:
+            return True
+        entry = self._entries.get(user_id)
+        return entry is not None and issued_at <= entry[0] and entry[1] > time.time()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _prune(self):
+        now = time.time()
+        for user_id in [u for u, (_, expires_at) in self._entries.items() if expires_at <= now]:
+            del self._entries[user_id]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.floor = 0.0
+
+
+class TokenSessionInterface(SessionInterface):
+    """Flask session interface storing the whole session in a signed token"""
+
+    session_class = TokenSession
+
+    def __init__(self, denylist_size=DEFAULT_DENYLIST_SIZE):
+        self.denylist = Denylist(denylist_size)
+
+    def get_serializer(self, app):
+        return URLSafeTimedSerializer(app.secret_key, salt=SALT)
+
+    @staticmethod
+    def lifetime(app):
+        return app.permanent_session_lifetime.total_seconds()
+
+    def issue(self, app, session):
+        """Sign the session into a token.
+
+        A session whose content changed gets a new issue time; an
+        unchanged one keeps it when re-signed, so revoking it covers
+        every copy.
+        """
+        if ISSUED_AT not in session or (session.modified and session[ISSUED_AT] == session.issued_at):
+            session[ISSUED_AT] = time.time()
+        return self.get_serializer(app).dumps(dict(session))
+
+    def decode(self, app, token):
+        """Return the session data in a token, or None if forged, expired or revoked"""
+        try:
+            data = self.get_serializer(app).loads(token, max_age=self.lifetime(app))
+        except BadSignature:  # includes SignatureExpired
+            return None
+        if not isinstance(data, dict) or not isinstance(data.get(ISSUED_AT), (int, float)):
+            return None
+        if self.denylist.revoked(data.get(USER_ID), data[ISSUED_AT]):
+            return None
+        return data
+
+    def revoke(self, app, user_id, issued_before):
+        """Revoke the user's tokens first signed at or before issued_before"""
+        self.denylist.revoke(user_id, issued_before, time.time() + self.lifetime(app))
+
+    def open_session(self, app, request):
+        header = request.headers.get('Authorization', '')
+        bearer = header[7:].strip() if header[:7].lower() == 'bearer ' else None
+        token = bearer or request.cookies.get(self.get_cookie_name(app))
+        data = self.decode(app, token) if token else None
+        if data is None:
+            return self.session_class()
+        return self.session_class(data, issued_at=data[ISSUED_AT], user_id=data.get(USER_ID),
+                                  bearer=bearer is not None)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if session.modified and session.issued_at is not None:
+            # Like a server-side session, a change (login as someone else,
+            # logout, account deletion) must kill every copy of the old token.
+            # A token without a user carries no identity to revoke.
+            if session.user_id is not None:
+                self.revoke(app, session.user_id, session.issued_at)
+            if session.get(ISSUED_AT) == session.issued_at:
+                del session[ISSUED_AT]
+
+        if not set(session) - {ISSUED_AT}:
+            if session.modified and not session.bearer:
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+        if session.bearer and not session.modified:
+            return  # bearer clients keep their token; nothing to send back
+        if not (session.modified or app.config.get('SESSION_REFRESH_EACH_REQUEST', True)):
+            return
+
+        expires = None
+        if app.config.get('SESSION_PERMANENT', True):
+            expires = datetime.now(timezone.utc) + app.permanent_session_lifetime
+        response.vary.add('Cookie')
+        response.set_cookie(
+            name,
+            self.issue(app, session),
+            expires=expires,
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+        )
@@ -15,24 +15,35 @@ function scrollRight() {
 let places = [];
 
 
-// Load places from API
-async function loadPlaces() {
+// Load places from API, following the page cursor until the last page.
+// Filters (e.g. {max_price: 200}) and sort order are applied by the server.
+async function loadPlaces(filters = {}) {
     try {
-        const response = await fetch('/api/v3/places/', {
-            credentials: 'include'
-        });
-        
-        if (response.ok) {
-            const placesData = await response.json();
-            places = placesData.map(place => ({
-                ...place,
-                rating: 4.5 // Default rating since API doesn't provide it
-            }));
-            displayPlaces();
-        } else {
-            console.error('Failed to load places from API');
-            // Keep empty places array so page doesn't break
+        const placesData = [];
+        const query = new URLSearchParams({ limit: 100, ...filters });
+        let url = `/api/v3/places/?${query}`;
+
+        while (url) {
+            const response = await fetch(url, {
+                credentials: 'include'
+            });
+
+            if (!response.ok) {
+                console.error('Failed to load places from API');
+                break;
+            }
+
+            placesData.push(...await response.json());
+            const nextCursor = response.headers.get('X-Next-Cursor');
+            query.set('after', nextCursor);
+            url = nextCursor ? `/api/v3/places/?${query}` : null;
         }
+
+        places = placesData.map(place => ({
+            ...place,
+            rating: place.avg_rating ?? 0 // Places without reviews sort last
+        }));
+        displayPlaces();
     } catch (error) {
         console.error('Error loading places:', error);
         // Keep empty places array so page doesn't break
@@ -47,19 +58,19 @@ function displayPlaces() {
     places.forEach(place => {
         const card = document.createElement('div');
         card.className = 'place-card';
-        card.setAttribute('data-price', place.price);
-        card.setAttribute('data-rating', place.rating);
 
+        // Let the browser pick the smallest resized copy that fills the card
+        const srcset = place.image_srcset ? `srcset="${place.image_srcset}" sizes="(max-width: 1100px) 340px, 33vw"` : '';
         card.innerHTML = `
-            <img src="${place.image}" alt="${place.title}" class="card-img">
+            <img src="${place.thumbnail || place.image}" ${srcset} alt="${place.title}" class="card-img" loading="lazy">
             <div class="card-content">
-                <h3>${place.title}</h3>
+                <h3>${place.highlights ? place.highlights.title : place.title}</h3>
             </div>
-            <p class="card-desc">${place.description}</p>
+            <p class="card-desc">${place.highlights ? place.highlights.description : place.description}</p>
             <div class="card-bottom-bar">
                 <span>${place.price} Gold/Night</span>
                 <span class="amenities-count">🔮 ${place.amenities.length} amenities</span>
-                <span>⭐ ${place.rating}</span>
+                <span>⭐ ${place.review_count ? place.rating.toFixed(1) : 'New'}</span>
             </div>
         `;
 
@@ -119,29 +130,41 @@ async function logout() {
 }
 
 // --- Search functionality ---
-function handleSearch(event) {
+// Titles and descriptions are searched on the server, best matches first;
+// an empty search brings back the full listing.
+async function handleSearch(event) {
   event.preventDefault();
 
   const searchInput = document.getElementById("search-input");
-  const query = searchInput.value.toLowerCase();
-  const cards = document.querySelectorAll(".place-card");
-
-  cards.forEach(card => {
-    const title = card.querySelector("h3").textContent.toLowerCase();
-    const desc = card.querySelector(".card-desc").textContent.toLowerCase();
+  const query = searchInput.value.trim();
+  if (!query) {
+    loadPlaces();
+    return;
+  }
 
-    card.style.display =
-      title.includes(query) || desc.includes(query) ? "" : "none";
-  });
+  try {
+    const params = new URLSearchParams({ q: query, limit: 100 });
+    const response = await fetch(`/api/v3/places/search?${params}`, {
+      credentials: 'include'
+    });
+    if (!response.ok) {
+      // e.g. only stop words: show nothing rather than stale results
+      places = [];
+      displayPlaces();
+      return;
+    }
+    places = (await response.json()).map(place => ({
+      ...place,
+      rating: place.avg_rating ?? 0
+    }));
+    displayPlaces();
+  } catch (error) {
+    console.error('Search failed:', error);
+  }
 }
 
 // --- Dynamic filtering ---
 document.getElementById("filter").addEventListener("change", function () {
   const maxPrice = Number(this.value);
-  const cards = document.querySelectorAll(".place-card");
-
-  cards.forEach(card => {
-    const price = Number(card.getAttribute("data-price"));
-    card.style.display = maxPrice === 0 || price <= maxPrice ? "" : "none";
-  });
-});
\ No newline at end of file
+  loadPlaces(maxPrice === 0 ? {} : { max_price: maxPrice });
+});
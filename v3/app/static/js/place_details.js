@@ -2,7 +2,7 @@ let currentUser = null;
 let currentPlace = null;
 let placeId = null;
 let userHasReviewed = false;
-let amenitiesData = {}; // Cache for amenity ID to name mapping
+let reviewsCursor = null; // Cursor for the next page of reviews, null on the last page
 
 
 // Dynamic host name mapping based on place data
@@ -19,25 +19,6 @@ function getHostName(place) {
     return titleHostMap[place.title] || null;
 }
 
-// Load amenities data for ID to name mapping
-async function loadAmenitiesData() {
-    try {
-        const response = await fetch('/api/v3/amenities/', {
-            credentials: 'include'
-        });
-        
-        if (response.ok) {
-            const amenities = await response.json();
-            // Create ID to name mapping
-            amenities.forEach(amenity => {
-                amenitiesData[amenity.id] = amenity.name;
-            });
-        }
-    } catch (error) {
-        console.error('Error loading amenities data:', error);
-    }
-}
-
 // Get place ID from URL parameters or URL path
 function getPlaceId() {
     // First try URL parameters (?id=)
@@ -94,16 +75,20 @@ async function logout() {
     }
 }
 
-// Load place details
+// Load the place, its host, amenities, rating and first page of reviews in one request
 async function loadPlaceDetails() {
     try {
-        const response = await fetch(`/api/v3/places/${placeId}`, {
+        const response = await fetch(`/api/v3/places/${placeId}/details`, {
             credentials: 'include'
         });
 
         if (response.ok) {
-            currentPlace = await response.json();
-            displayPlaceDetails(currentPlace);
+            const details = await response.json();
+            currentPlace = details.place;
+            displayPlaceDetails(details);
+            displayReviews(details.reviews, details.rating.review_count, false);
+            reviewsCursor = details.reviews_cursor;
+            updateMoreReviewsButton();
         } else {
             console.error('Failed to load place details, status:', response.status);
             showError();
@@ -115,18 +100,13 @@ async function loadPlaceDetails() {
 }
 
 // Display place details
-function displayPlaceDetails(place) {
+function displayPlaceDetails(details) {
+    const place = details.place;
     document.getElementById('placeTitle').textContent = place.title;
     document.getElementById('placeDescription').textContent = place.description;
     document.getElementById('placePrice').textContent = `${place.price} gold`;
     document.getElementById('placeLocation').textContent = `${place.latitude}, ${place.longitude}`;
-
-    // Load host information from API using owner_id
-    if (place.owner_id) {
-        loadHostInfo(place.owner_id);
-    } else {
-        document.getElementById('hostName').textContent = 'Unknown Host';
-    }
+    document.getElementById('hostName').textContent = `${details.owner.first_name} ${details.owner.last_name}`;
 
     // Set image using API-provided URL
     const imgEl = document.getElementById('placeImage');
@@ -138,15 +118,13 @@ function displayPlaceDetails(place) {
     imgEl.alt = place.title || 'Place image';
 
     // Display amenities if they exist
-    if (place.amenities && place.amenities.length > 0) {
+    if (details.amenities.length > 0) {
         const amenitiesSection = document.getElementById('amenitiesSection');
         const amenitiesList = document.getElementById('amenitiesList');
 
-        amenitiesList.innerHTML = place.amenities.map(amenityId => {
-            // Get amenity name from cached data, fallback to ID if not found
-            const amenityName = amenitiesData[amenityId] || amenityId;
-            return `<span class="amenity-tag">${amenityName}</span>`;
-        }).join('');
+        amenitiesList.innerHTML = details.amenities.map(amenity =>
+            `<span class="amenity-tag">${amenity.name}</span>`
+        ).join('');
 
         amenitiesSection.style.display = 'block';
     }
@@ -156,68 +134,65 @@ function displayPlaceDetails(place) {
     document.getElementById('placeContent').style.display = 'block';
 }
 
-// Load host information from API
-async function loadHostInfo(ownerId) {
-    try {
-        const response = await fetch(`/api/v3/users/${ownerId}/public`, {
-            credentials: 'include'
-        });
-        
-        if (response.ok) {
-            const user = await response.json();
-            document.getElementById('hostName').textContent = `${user.first_name} ${user.last_name}`;
-        } else {
-            document.getElementById('hostName').textContent = 'Unknown Host';
-        }
-    } catch (error) {
-        console.error('Error loading host info:', error);
-        document.getElementById('hostName').textContent = 'Unknown Host';
+// Load the next page of reviews
+async function loadMoreReviews() {
+    if (!reviewsCursor) {
+        return;
     }
-}
-
-// Load reviews for the place
-async function loadReviews() {
     try {
-        const response = await fetch(`/api/v3/reviews/places/${placeId}/reviews`, {
+        const response = await fetch(`/api/v3/places/${placeId}/details?after=${encodeURIComponent(reviewsCursor)}`, {
             credentials: 'include'
         });
 
         if (response.ok) {
-            const reviews = await response.json();
-            displayReviews(reviews);
+            const details = await response.json();
+            displayReviews(details.reviews, details.rating.review_count, true);
+            reviewsCursor = details.reviews_cursor;
         } else {
-            // Show empty reviews if API fails
-            displayReviews([]);
+            reviewsCursor = null;
         }
     } catch (error) {
         console.error('Error loading reviews:', error);
-        // Show empty reviews on network error
-        displayReviews([]);
     }
+    updateMoreReviewsButton();
+}
+
+// Show a "More reviews" button below the list while there are more pages
+function updateMoreReviewsButton() {
+    let button = document.getElementById('moreReviewsBtn');
+    if (!button) {
+        button = document.createElement('button');
+        button.id = 'moreReviewsBtn';
+        button.className = 'add-review-btn';
+        button.textContent = 'More reviews';
+        button.addEventListener('click', loadMoreReviews);
+        document.getElementById('reviewsList').after(button);
+    }
+    button.style.display = reviewsCursor ? 'block' : 'none';
 }
 
-// Display reviews
-function displayReviews(reviews) {
+// Display reviews, newest first; `append` adds a further page below the ones shown
+function displayReviews(reviews, total, append) {
     const reviewsList = document.getElementById('reviewsList');
     const reviewsCount = document.getElementById('reviewsCount');
 
-    reviewsCount.textContent = `${reviews.length} review${reviews.length !== 1 ? 's' : ''}`;
+    reviewsCount.textContent = `${total} review${total !== 1 ? 's' : ''}`;
 
     // Check if current user has already reviewed
     if (currentUser) {
-        userHasReviewed = reviews.some(review => review.user_id === currentUser.id);
+        userHasReviewed = userHasReviewed || reviews.some(review => review.user_id === currentUser.id);
 
         // Show add review button if user is authenticated
         showAddReviewButton();
 
     }
 
-    if (reviews.length === 0) {
+    if (total === 0) {
         reviewsList.innerHTML = '<div class="no-reviews">No reviews yet. Be the first to share your experience!</div>';
         return;
     }
 
-    reviewsList.innerHTML = reviews.map(review => `
+    const cards = reviews.map(review => `
         <div class="review-card">
             <div class="review-header">
                 <div class="reviewer-info">
@@ -232,6 +207,11 @@ function displayReviews(reviews) {
             </div>
         </div>
     `).join('');
+    if (append) {
+        reviewsList.insertAdjacentHTML('beforeend', cards);
+    } else {
+        reviewsList.innerHTML = cards;
+    }
 }
 
 
@@ -273,14 +253,10 @@ document.addEventListener('DOMContentLoaded', async () => {
 
     
     try {
-        // Load amenities data first, then place details that depend on it
-        await loadAmenitiesData();
-        
-        // Load other components in parallel
+        // The whole page comes from one details request
         await Promise.all([
             checkAuth().catch(err => console.error('Auth check failed:', err)),
-            loadPlaceDetails().catch(err => console.error('Failed to load place details:', err)),
-            loadReviews().catch(err => console.error('Failed to load reviews:', err))
+            loadPlaceDetails().catch(err => console.error('Failed to load place details:', err))
         ]);
     } catch (err) {
         console.error('Failed to initialize page:', err);
@@ -0,0 +1,36 @@
+#!/usr/bin/python3
+"""
+Shared fixture for tests that need a running app and database
+"""
+import unittest
+from app import create_app, db
+from app.persistence.cache import cache
+from app.search import search
+
+_app = None
+
+
+def get_test_app():
+    """Create the test app once per process; Flask-Session cannot be registered twice"""
+    global _app
+    if _app is None:
+        _app = create_app("config.TestingConfig")
+    return _app
+
+
+class AppTestCase(unittest.TestCase):
+    """Runs each test inside an app context against an empty in-memory database"""
+
+    def setUp(self):
+        self.app = get_test_app()
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        cache.clear()
+        search.clear()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
@@ -0,0 +1,114 @@
+#!/usr/bin/python3
+"""
+Unit tests for amenity upserts and the v3 amenities batch API
+Run from project root with:
+python3 -m unittest app.tests.test_amenities_api
+"""
+import unittest
+from unittest import mock
+from app.services import facade
+from app.services.facade import DuplicateAmenityError
+from app.models.amenity import Amenity, normalize_name
+from app.persistence.explain import capture_statements
+from app.tests.base import AppTestCase
+
+
+class TestAmenityUpsert(AppTestCase):
+
+    def setUp(self):
+        super().setUp()
+        with self.client.session_transaction() as sess:
+            sess['user_id'] = 'admin'
+            sess['is_admin'] = True
+
+    def test_normalize_name(self):
+        self.assertEqual(normalize_name('  Wi-Fi  '), 'wi-fi')
+        self.assertEqual(normalize_name('Hot   Meals'), normalize_name('hot meals'))
+
+    # ==================== FACADE ====================
+
+    def test_create_amenity_is_idempotent(self):
+        first = facade.create_amenity({'name': 'Hot Meals'})
+        again = facade.create_amenity({'name': ' hot  meals '})
+        self.assertEqual(again.id, first.id)
+        self.assertEqual(again.name, 'Hot Meals')
+        self.assertEqual(Amenity.query.count(), 1)
+
+    def test_create_amenities_reports_created(self):
+        existing = facade.create_amenity({'name': 'Finest Ale'})
+        results = facade.create_amenities([{'name': 'finest ale'}, {'name': 'Forest Views'}, {'name': 'FOREST VIEWS'}])
+        self.assertEqual([created for _, created in results], [False, True, True])
+        self.assertEqual(results[0][0].id, existing.id)
+        self.assertEqual(results[1][0].id, results[2][0].id)
+        self.assertEqual(Amenity.query.count(), 2)
+
+    def test_batch_is_two_statements(self):
+        """One multi-row INSERT and one IN lookup, however many amenities"""
+        names = [{'name': f'Amenity {i}'} for i in range(200)]
+        with capture_statements() as statements:
+            facade.create_amenities(names)
+        writes = [sql for sql, _ in statements if sql.lstrip().upper().startswith(('INSERT', 'SELECT'))]
+        self.assertEqual(len(writes), 2)
+        self.assertEqual(Amenity.query.count(), 200)
+
+    def test_rename_onto_existing_name_rejected(self):
+        facade.create_amenity({'name': 'Pool'})
+        spa = facade.create_amenity({'name': 'Spa'})
+        with self.assertRaises(DuplicateAmenityError):
+            facade.update_amenity(spa.id, {'name': 'POOL'})
+        self.assertEqual(facade.update_amenity(spa.id, {'name': 'SPA'}).name, 'SPA')
+
+    # ==================== API ====================
+
+    def test_post_returns_existing_amenity(self):
+        response = self.client.post('/api/v3/amenities/', json={'name': 'Tapestries'})
+        self.assertEqual(response.status_code, 201)
+        again = self.client.post('/api/v3/amenities/', json={'name': 'tapestries'})
+        self.assertEqual(again.status_code, 200)
+        self.assertEqual(again.json['id'], response.json['id'])
+
+    def test_rename_conflict_is_409(self):
+        facade.create_amenity({'name': 'Pool'})
+        spa_id = facade.create_amenity({'name': 'Spa'}).id
+        response = self.client.put(f'/api/v3/amenities/{spa_id}', json={'name': 'pool'})
+        self.assertEqual(response.status_code, 409)
+
+    def test_rename_race_is_409(self):
+        """A rename that slips past the name check is caught by the unique key"""
+        facade.create_amenity({'name': 'Pool'})
+        spa_id = facade.create_amenity({'name': 'Spa'}).id
+        with mock.patch.object(facade.amenity_repo.repo, 'get_by_attribute', return_value=None):
+            response = self.client.put(f'/api/v3/amenities/{spa_id}', json={'name': 'pool'})
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(facade.get_amenity(spa_id).name, 'Spa')
+
+    def test_batch_endpoint(self):
+        facade.create_amenity({'name': 'Castle Views'})
+        response = self.client.post('/api/v3/amenities/batch', json={'amenities': [
+            {'name': 'Castle Views'}, {'name': 'Royal Treatment'}, {'name': 'royal treatment'},
+        ]})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json['created'], 1)
+        self.assertEqual([a['created'] for a in response.json['amenities']], [False, True, True])
+        self.assertEqual(response.json['amenities'][1]['id'], response.json['amenities'][2]['id'])
+
+        again = self.client.post('/api/v3/amenities/batch', json={'amenities': [{'name': 'Castle Views'}]})
+        self.assertEqual(again.status_code, 200)
+        self.assertEqual(again.json['created'], 0)
+
+    def test_batch_endpoint_validation(self):
+        self.assertEqual(self.client.post('/api/v3/amenities/batch', json={'amenities': 'Pool'}).status_code, 400)
+        response = self.client.post('/api/v3/amenities/batch', json={'amenities': [{'name': 'Pool'}, {'name': ' '}]})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Amenity 1', response.json['error'])
+        self.assertEqual(Amenity.query.count(), 0)
+
+    def test_batch_endpoint_requires_admin(self):
+        with self.client.session_transaction() as sess:
+            sess['is_admin'] = False
+        response = self.client.post('/api/v3/amenities/batch', json={'amenities': [{'name': 'Pool'}]})
+        self.assertEqual(response.status_code, 403)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+#!/usr/bin/python3
+"""
+Unit tests for the fingerprinted static asset pipeline
+Run from project root with:
+python3 -m unittest app.tests.test_assets
+"""
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from flask import url_for
+from app.assets import assets, build, hashed_name
+from app.tests.base import AppTestCase
+
+STYLESHEET = """@font-face { src: url('../fonts/Tavern.ttf') format('truetype'); }
+body { background: url("../images/map.jpg"), url(data:image/png;base64,AAAA); }
+.missing { background: url('../images/gone.png'); }
+""" * 20
+
+
+def make_source(folder):
+    files = {
+        'css/site.css': STYLESHEET.encode(),
+        'fonts/Tavern.ttf': b'not really a font ' * 50,
+        'images/map.jpg': b'\xff\xd8 not really a jpeg',
+        'js/app.js': b'console.log("hello");\n' * 50,
+    }
+    for name, content in files.items():
+        os.makedirs(os.path.join(folder, os.path.dirname(name)), exist_ok=True)
+        with open(os.path.join(folder, name), 'wb') as f:
+            f.write(content)
+    return files
+
+
+class TestBuild(unittest.TestCase):
+
+    def setUp(self):
+        self.source = tempfile.mkdtemp()
+        self.output = tempfile.mkdtemp()
+        self.originals = make_source(self.source)
+        self.manifest = build(self.source, self.output)
+
+    def tearDown(self):
+        shutil.rmtree(self.source)
+        shutil.rmtree(self.output)
+
+    def read(self, name):
+        with open(os.path.join(self.output, name), 'rb') as f:
+            return f.read()
+
+    def test_names_carry_content_hash(self):
+        files = self.manifest['files']
+        self.assertEqual(set(files), set(self.originals))
+        self.assertEqual(files['js/app.js'], hashed_name('js/app.js', self.originals['js/app.js']))
+        self.assertRegex(files['js/app.js'], r'^js/app\.[0-9a-f]{12}\.js$')
+        with open(os.path.join(self.output, 'manifest.json')) as f:
+            self.assertEqual(json.load(f), self.manifest)
+
+    def test_css_references_rewritten(self):
+        css = self.read(self.manifest['files']['css/site.css']).decode()
+        font = os.path.basename(self.manifest['files']['fonts/Tavern.ttf'])
+        image = os.path.basename(self.manifest['files']['images/map.jpg'])
+        self.assertIn(f"url('../fonts/{font}')", css)
+        self.assertIn(f'url("../images/{image}")', css)
+        self.assertIn('url(data:image/png;base64,AAAA)', css)
+        self.assertIn("url('../images/gone.png')", css)
+
+    def test_css_hash_follows_referenced_files(self):
+        """Changing a font renames the stylesheet that uses it"""
+        with open(os.path.join(self.source, 'fonts/Tavern.ttf'), 'ab') as f:
+            f.write(b'more glyphs')
+        rebuilt = build(self.source, self.output)
+        self.assertNotEqual(rebuilt['files']['css/site.css'], self.manifest['files']['css/site.css'])
+        self.assertEqual(rebuilt['files']['js/app.js'], self.manifest['files']['js/app.js'])
+
+    def test_gzip_variants_for_text_only(self):
+        script = self.manifest['files']['js/app.js']
+        self.assertIn('.gz', self.manifest['variants'][script])
+        self.assertEqual(gzip.decompress(self.read(script + '.gz')), self.originals['js/app.js'])
+        self.assertNotIn(self.manifest['files']['images/map.jpg'], self.manifest['variants'])
+
+
+class TestServing(AppTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.source = tempfile.mkdtemp()
+        self.output = tempfile.mkdtemp()
+        make_source(self.source)
+        self.manifest = build(self.source, self.output)
+        # Pretend Pillow produced a WebP copy of the image
+        self.image = self.manifest['files']['images/map.jpg']
+        with open(os.path.join(self.output, self.image + '.webp'), 'wb') as f:
+            f.write(b'RIFF webp')
+        self.manifest['variants'][self.image] = ['.webp']
+        with open(os.path.join(self.output, 'manifest.json'), 'w') as f:
+            json.dump(self.manifest, f)
+        assets.load(self.output)
+
+    def tearDown(self):
+        assets.load(None)
+        shutil.rmtree(self.source)
+        shutil.rmtree(self.output)
+        super().tearDown()
+
+    def test_url_for_returns_hashed_name(self):
+        with self.app.test_request_context():
+            self.assertEqual(url_for('static', filename='js/app.js'),
+                             '/static/' + self.manifest['files']['js/app.js'])
+            # Files outside the manifest keep their name
+            self.assertEqual(url_for('static', filename='js/other.js'), '/static/js/other.js')
+
+    def test_hashed_asset_is_immutable_and_precompressed(self):
+        url = '/static/' + self.manifest['files']['js/app.js']
+        response = self.client.get(url, headers={'Accept-Encoding': 'gzip, br'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(response.mimetype, 'text/javascript')
+        self.assertIn('immutable', response.headers['Cache-Control'])
+        self.assertIn('max-age=31536000', response.headers['Cache-Control'])
+        self.assertIn('Accept-Encoding', response.headers['Vary'])
+        response.close()
+
+        plain = self.client.get(url, headers={'Accept-Encoding': 'identity'})
+        self.assertNotIn('Content-Encoding', plain.headers)
+        self.assertIn(b'console.log', plain.data)
+        plain.close()
+
+    def test_image_variant_by_accept(self):
+        url = '/static/' + self.image
+        response = self.client.get(url, headers={'Accept': 'image/avif,image/webp,*/*'})
+        self.assertEqual(response.mimetype, 'image/webp')
+        self.assertIn('Accept', response.headers['Vary'])
+        response.close()
+        response = self.client.get(url, headers={'Accept': '*/*'})
+        self.assertEqual(response.mimetype, 'image/jpeg')
+        response.close()
+
+    def test_original_names_still_served(self):
+        response = self.client.get('/static/css/nav.css')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('immutable', response.headers.get('Cache-Control', ''))
+        response.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+#!/usr/bin/python3
+"""
+Smoke test for the benchmark harness: every benchmarked endpoint must succeed
+Run from project root with:
+python3 -m unittest app.tests.test_benchmark
+"""
+import unittest
+import benchmark
+from app.tests.base import AppTestCase
+
+
+class TestBenchmark(AppTestCase):
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(benchmark.percentile(values, 50), 50)
+        self.assertEqual(benchmark.percentile(values, 99), 99)
+        self.assertEqual(benchmark.percentile([7], 95), 7)
+
+    def test_every_endpoint_runs_clean(self):
+        """A tiny dataset through the test client, with queries and allocations measured"""
+        _, ids = benchmark.seed_database({'users': 5, 'amenities': 3, 'places': 30, 'reviews': 20})
+        self.assertEqual(len(ids['places']), 30)
+
+        results = benchmark.run_suite(self.app, benchmark.TestClientDriver(self.app), ids,
+                                      iterations=3, alloc_iterations=1)
+        self.assertEqual(set(results), {endpoint.name for endpoint in benchmark.ENDPOINTS})
+        for name, result in results.items():
+            self.assertEqual(result['errors'], 0, f"{name}: {result['first_error']}")
+            self.assertIn('queries_per_request', result)
+            self.assertIn('alloc_peak_kib_mean', result)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,165 @@
+#!/usr/bin/python3
+"""
+Unit tests for the entity cache
+Run from project root with:
+python3 -m unittest app.tests.test_cache
+"""
+import time
+import unittest
+from sqlalchemy import event, inspect
+from app import db
+from app.models.amenity import Amenity
+from app.persistence.cache import LRUCache, LocalSharedStore, SharedCache, cache
+from app.services import facade
+from app.tests.base import AppTestCase
+
+
+class TestLRUCache(unittest.TestCase):
+
+    def test_hit_and_miss(self):
+        lru = LRUCache(maxsize=2, ttl=60)
+        self.assertIsNone(lru.get('a'))
+        lru.set('a', 1)
+        self.assertEqual(lru.get('a'), 1)
+        self.assertEqual((lru.hits, lru.misses), (1, 1))
+
+    def test_evicts_least_recently_used(self):
+        lru = LRUCache(maxsize=2, ttl=60)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        lru.get('a')
+        lru.set('c', 3)
+        self.assertIsNone(lru.get('b'))
+        self.assertEqual(lru.get('a'), 1)
+        self.assertEqual(lru.evictions, 1)
+
+    def test_expires_after_ttl(self):
+        lru = LRUCache(maxsize=2, ttl=0.01)
+        lru.set('a', 1)
+        time.sleep(0.02)
+        self.assertIsNone(lru.get('a'))
+        self.assertEqual(lru.expirations, 1)
+
+    def test_shared_cache_on_local_store(self):
+        shared = SharedCache(LocalSharedStore(), ttl=60)
+        shared.set('a', b'1')
+        self.assertEqual(shared.get('a'), b'1')
+        shared.delete('a')
+        self.assertIsNone(shared.get('a'))
+        self.assertEqual(shared.stats()['hits'], 1)
+
+
+class TestCachedRepository(AppTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.amenity_id = facade.create_amenity({'name': 'Hot Meals'}).id
+        db.session.remove()
+        self.queries = []
+        event.listen(db.engine, 'before_cursor_execute', self.count_query)
+
+    def tearDown(self):
+        event.remove(db.engine, 'before_cursor_execute', self.count_query)
+        super().tearDown()
+
+    def count_query(self, conn, cursor, statement, *args):
+        self.queries.append(statement)
+
+    def test_second_read_is_served_from_cache(self):
+        """Only the first get_amenity reaches the database"""
+        facade.get_amenity(self.amenity_id)
+        db.session.remove()
+        amenity = facade.get_amenity(self.amenity_id)
+
+        self.assertEqual(amenity.name, 'Hot Meals')
+        self.assertEqual(len(self.queries), 1)
+
+    def test_update_invalidates(self):
+        """Updating through the facade drops the cached copy"""
+        facade.get_amenity(self.amenity_id)
+        facade.update_amenity(self.amenity_id, {'name': 'Finest Ale'})
+        db.session.remove()
+
+        self.assertEqual(facade.get_amenity(self.amenity_id).name, 'Finest Ale')
+
+    def test_direct_commit_invalidates(self):
+        """Changes committed straight through the session also drop the cached copy"""
+        amenity = facade.get_amenity(self.amenity_id)
+        amenity.name = 'Storytelling Corner'
+        db.session.commit()
+        db.session.remove()
+
+        self.assertEqual(facade.get_amenity(self.amenity_id).name, 'Storytelling Corner')
+
+    def test_invalidated_at_commit_not_flush(self):
+        """A flushed but uncommitted change keeps the entry until the commit"""
+        key = cache.key(Amenity, self.amenity_id)
+        amenity = facade.get_amenity(self.amenity_id)
+        amenity.name = 'Storytelling Corner'
+        db.session.flush()
+        self.assertIsNotNone(cache.backend.get(key))
+        db.session.commit()
+        self.assertIsNone(cache.backend.get(key))
+
+    def test_update_columns_invalidates_at_commit(self):
+        """Column updates that bypass the ORM also keep the entry until the commit"""
+        key = cache.key(Amenity, self.amenity_id)
+        facade.get_amenity(self.amenity_id)
+        facade.amenity_repo.update_columns(self.amenity_id, [('name', 'Finest Ale')])
+        self.assertIsNotNone(cache.backend.get(key))
+        db.session.commit()
+        self.assertIsNone(cache.backend.get(key))
+
+    def test_rollback_invalidates(self):
+        """Entries cached from uncommitted state are dropped on rollback"""
+        amenity = facade.get_amenity(self.amenity_id)
+        amenity.name = 'Storytelling Corner'
+        db.session.flush()
+        facade.get_amenity(self.amenity_id)
+        db.session.rollback()
+        db.session.remove()
+
+        self.assertEqual(facade.get_amenity(self.amenity_id).name, 'Hot Meals')
+
+    def test_caches_columns_only(self):
+        """Relationships loaded with the object are not cached with it"""
+        owner = facade.create_user({'first_name': 'Guild Master', 'last_name': 'Thorin',
+                                    'email': 'thorin@example.com', 'password': 'tavern123'})
+        place_id = facade.create_place({'title': 'Tavern', 'description': 'Warm', 'price': 20.0,
+                                        'latitude': 42.36, 'longitude': -71.06, 'owner_id': owner.id}).id
+        owner_id = owner.id
+        db.session.remove()
+        facade.get_place(place_id, 'admin')
+        facade.update_user(owner_id, {'first_name': 'Balin'})
+        db.session.remove()
+
+        place = facade.get_place(place_id, 'admin')
+        self.assertNotIn('owner', inspect(place).dict)
+        self.assertEqual(place.owner.first_name, 'Balin')
+
+    def test_get_many_fetches_only_uncached_ids(self):
+        """Cached ids come from the cache, the rest from one IN query"""
+        facade.get_amenity(self.amenity_id)
+        other_id = facade.create_amenity({'name': 'Finest Ale'}).id
+        db.session.remove()
+        self.queries.clear()
+
+        amenities = facade.amenity_repo.get_many([other_id, 'missing', self.amenity_id])
+        self.assertEqual([a.name for a in amenities], ['Finest Ale', 'Hot Meals'])
+        self.assertEqual(len(self.queries), 1)
+
+        db.session.remove()
+        self.queries.clear()
+        facade.amenity_repo.get_many([self.amenity_id, other_id])
+        self.assertEqual(self.queries, [])
+
+    def test_stats(self):
+        facade.get_amenity(self.amenity_id)
+        facade.get_amenity(self.amenity_id)
+        stats = cache.stats()
+        self.assertEqual(stats['backend'], 'memory')
+        self.assertGreaterEqual(stats['hits'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
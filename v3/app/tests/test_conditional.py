@@ -0,0 +1,113 @@
+#!/usr/bin/python3
+"""
+Unit tests for conditional GETs (ETag / Last-Modified / 304)
+Run from project root with:
+python3 -m unittest app.tests.test_conditional
+"""
+import unittest
+from datetime import timedelta
+from werkzeug.http import http_date
+from app.services import facade
+from app.persistence.explain import capture_statements
+from app.tests.base import AppTestCase
+
+
+class TestConditionalGet(AppTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.owner = facade.create_user({'first_name': 'Guild Master', 'last_name': 'Thorin',
+                                         'email': 'thorin@example.com', 'password': 'tavern123'})
+        self.guest = facade.create_user({'first_name': 'Bilbo', 'last_name': 'Baggins',
+                                         'email': 'bilbo@example.com', 'password': 'shire1234'})
+        self.place = facade.create_place({'title': 'Tavern', 'description': 'Ale', 'price': 25.0,
+                                          'latitude': 42.36, 'longitude': -71.06,
+                                          'owner_id': self.owner.id, 'amenities': []})
+
+    def revalidate(self, url, response):
+        """GET url again presenting the ETag from an earlier response"""
+        return self.client.get(url, headers={'If-None-Match': response.headers['ETag']})
+
+    def assertNotModified(self, url):
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        again = self.revalidate(url, first)
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again.data, b'')
+        self.assertEqual(again.headers['ETag'], first.headers['ETag'])
+        return first
+
+    # ==================== PLACE ====================
+
+    def test_place_headers(self):
+        response = self.assertNotModified(f'/api/v3/places/{self.place.id}')
+        self.assertTrue(response.headers['ETag'].startswith('W/"'))
+        self.assertEqual(response.headers['Cache-Control'], 'no-cache')
+        self.assertIn('Last-Modified', response.headers)
+
+    def test_place_changes(self):
+        url = f'/api/v3/places/{self.place.id}'
+        first = self.client.get(url)
+        facade.update_place(self.place.id, {'price': 30.0})
+        self.assertEqual(self.revalidate(url, first).status_code, 200)
+
+        second = self.client.get(url)
+        wifi = facade.create_amenity({'name': 'Wi-Fi'})
+        facade.update_place(self.place.id, {'amenities': [wifi.id]})
+        self.assertEqual(self.revalidate(url, second).status_code, 200)
+
+        third = self.client.get(url)
+        facade.create_review({'text': 'Fine ale', 'rating': 5,
+                              'place_id': self.place.id, 'user_id': self.guest.id})
+        response = self.revalidate(url, third)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['review_count'], 1)
+
+    def test_if_modified_since(self):
+        url = f'/api/v3/places/{self.place.id}'
+        last_modified = self.client.get(url).headers['Last-Modified']
+        self.assertEqual(self.client.get(url, headers={'If-Modified-Since': last_modified}).status_code, 304)
+        earlier = http_date(self.place.updated_at - timedelta(minutes=1))
+        self.assertEqual(self.client.get(url, headers={'If-Modified-Since': earlier}).status_code, 200)
+        # A non-matching ETag wins over a matching date
+        self.assertEqual(self.client.get(url, headers={'If-None-Match': 'W/"other"',
+                                                       'If-Modified-Since': last_modified}).status_code, 200)
+
+    # ==================== COLLECTIONS ====================
+
+    def test_amenities_answered_from_one_aggregate(self):
+        facade.create_amenity({'name': 'Wi-Fi'})
+        first = self.assertNotModified('/api/v3/amenities/')
+        with capture_statements() as statements:
+            self.assertEqual(self.revalidate('/api/v3/amenities/', first).status_code, 304)
+        self.assertEqual(len(statements), 1)
+        self.assertIn('count(', statements[0][0].lower())
+
+        facade.create_amenity({'name': 'Pool'})
+        self.assertEqual(self.revalidate('/api/v3/amenities/', first).status_code, 200)
+
+    def test_empty_amenities_have_no_last_modified(self):
+        response = self.assertNotModified('/api/v3/amenities/')
+        self.assertNotIn('Last-Modified', response.headers)
+
+    def test_place_reviews_change_with_reviews_and_authors(self):
+        url = f'/api/v3/reviews/places/{self.place.id}/reviews'
+        review = facade.create_review({'text': 'Fine ale', 'rating': 5,
+                                       'place_id': self.place.id, 'user_id': self.guest.id})
+        first = self.assertNotModified(url)
+
+        facade.update_review(review.id, {'text': 'Finest ale', 'rating': 5})
+        second = self.revalidate(url, first)
+        self.assertEqual(second.status_code, 200)
+
+        facade.update_user(self.guest.id, {'first_name': 'Frodo'})
+        third = self.revalidate(url, second)
+        self.assertEqual(third.status_code, 200)
+        self.assertEqual(third.json[0]['user']['first_name'], 'Frodo')
+
+        facade.delete_review(review.id)
+        self.assertEqual(self.revalidate(url, third).status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+#!/usr/bin/python3
+"""
+Unit tests for the API response JSON encoders
+Run from project root with:
+python3 -m unittest app.tests.test_encoding
+"""
+import json
+import unittest
+from datetime import datetime
+from decimal import Decimal
+from app.encoding import ENCODERS, json_output, make_encoder
+from app.services import facade
+from app.tests.base import AppTestCase
+import json_benchmark
+
+PAYLOAD = {
+    'price': Decimal('25.50'),
+    'updated_at': datetime(2024, 5, 1, 12, 30, 15, 250000),
+    'amenities': ('a', 'b'),
+    'title': "Dragon's Rest — Tavern",
+    'nested': [{'rating': 5, 'avg_rating': None, 'open': True}],
+}
+
+
+def installed():
+    names = []
+    for name in ENCODERS:
+        try:
+            make_encoder(name)
+            names.append(name)
+        except ImportError:
+            pass
+    return names
+
+
+class TestEncoders(unittest.TestCase):
+
+    def test_encoders_agree(self):
+        expected = {
+            'price': 25.5,
+            'updated_at': '2024-05-01T12:30:15.250000',
+            'amenities': ['a', 'b'],
+            'title': "Dragon's Rest — Tavern",
+            'nested': [{'rating': 5, 'avg_rating': None, 'open': True}],
+        }
+        for name in installed():
+            for pretty in (False, True):
+                body = make_encoder(name, pretty)[1](PAYLOAD)
+                self.assertIsInstance(body, bytes, name)
+                self.assertEqual(json.loads(body), expected, name)
+
+    def test_compact_unless_pretty(self):
+        for name in installed():
+            self.assertNotIn(b'\n', make_encoder(name)[1](PAYLOAD), name)
+            self.assertIn(b'\n', make_encoder(name, pretty=True)[1](PAYLOAD), name)
+
+    def test_unknown_types_and_names_rejected(self):
+        for name in installed():
+            with self.assertRaises(TypeError, msg=name):
+                make_encoder(name)[1]({'value': object()})
+        with self.assertRaises(ValueError):
+            make_encoder('simplejson')
+
+    def test_auto_picks_an_installed_encoder(self):
+        name, _ = make_encoder('auto')
+        self.assertEqual(name, installed()[0])
+
+
+class TestJSONResponses(AppTestCase):
+
+    def test_api_uses_configured_encoder(self):
+        owner = facade.create_user({'first_name': 'Guild Master', 'last_name': 'Thorin',
+                                    'email': 'thorin@example.com', 'password': 'tavern123'})
+        place = facade.create_place({'title': 'Tavern', 'description': 'Ale', 'price': 25.5,
+                                     'latitude': 42.36, 'longitude': -71.06,
+                                     'owner_id': owner.id, 'amenities': []})
+        self.assertEqual(self.app.config['JSON_ENCODER'], 'auto')
+        response = self.client.get(f'/api/v3/places/{place.id}')
+        self.assertEqual(response.mimetype, 'application/json')
+        self.assertEqual(response.json['price'], 25.5)
+        self.assertNotIn(b'": ', response.data)  # compact, not the indented stdlib output
+        if json_output.name == 'msgspec':
+            self.assertIn(b'"price":25.50', response.data)  # exact Decimal
+
+    def test_errors_are_json_too(self):
+        response = self.client.get('/api/v3/places/?limit=0')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.mimetype, 'application/json')
+        self.assertIn('error', response.json)
+
+
+class TestJSONBenchmark(unittest.TestCase):
+
+    def test_every_encoder_matches_restx(self):
+        results = json_benchmark.run(rows=50, repeat=2)
+        self.assertEqual(set(results), set(json_benchmark.ENDPOINTS))
+        for endpoint, encoders in results.items():
+            self.assertIn('restx', encoders)
+            for name, result in encoders.items():
+                self.assertTrue(result['matches_restx'], f'{endpoint} {name}')
+                self.assertGreater(result['bytes'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
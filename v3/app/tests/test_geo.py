@@ -0,0 +1,78 @@
+#!/usr/bin/python3
+"""
+Unit tests for the geohash helpers behind location search
+Run from project root with:
+python3 -m unittest app.tests.test_geo
+"""
+import random
+import unittest
+from app import geo
+
+
+class TestGeohash(unittest.TestCase):
+
+    def test_encode_known_value(self):
+        self.assertEqual(geo.encode(57.64911, 10.40744, 11), 'u4pruydqqvj')
+
+    def test_prefix_range(self):
+        self.assertEqual(geo.prefix_range('u4p'), ('u4p', 'u4q'))
+        self.assertEqual(geo.prefix_range('u4z'), ('u4z', 'u5'))
+        self.assertEqual(geo.prefix_range('zz'), ('zz', None))
+
+    def test_covering_prefixes_contain_every_point(self):
+        """Every point inside a bbox has a geohash starting with one of the prefixes"""
+        rng = random.Random(42)
+        for bbox in [(42.0, -71.5, 42.8, -70.7), (-10.0, 170.0, 10.0, -170.0), (51.50, -0.13, 51.51, -0.12)]:
+            prefixes = geo.covering_prefixes(bbox)
+            self.assertLessEqual(len(prefixes), geo.MAX_CELLS)
+            for _ in range(500):
+                lat = rng.uniform(bbox[0], bbox[2])
+                lng = rng.uniform(bbox[1], bbox[3] + (360 if bbox[3] < bbox[1] else 0))
+                lng = (lng + 180) % 360 - 180
+                code = geo.encode(lat, lng)
+                self.assertTrue(any(code.startswith(p) for p in prefixes), (bbox, lat, lng))
+
+    def test_distance(self):
+        # Boston to Portland (Oregon) is roughly 4,100 km
+        self.assertAlmostEqual(geo.distance_km(42.3601, -71.0589, 45.5152, -122.6784), 4100, delta=50)
+
+    def test_bbox_around_crosses_antimeridian(self):
+        min_lat, min_lng, max_lat, max_lng = geo.bbox_around(0.0, 179.9, 50)
+        self.assertGreater(min_lng, max_lng)
+        self.assertTrue(geo.in_bbox(0.0, -179.9, (min_lat, min_lng, max_lat, max_lng)))
+
+    def test_cell_bounds(self):
+        min_lat, min_lng, max_lat, max_lng = geo.cell_bounds('u4pru')
+        self.assertTrue(min_lat <= 57.64911 < max_lat and min_lng <= 10.40744 < max_lng)
+        self.assertEqual((max_lat - min_lat, max_lng - min_lng), geo.cell_size(5))
+
+    def test_distance_to_cell_is_the_nearest_point(self):
+        """No point of the cell is nearer than the distance returned"""
+        rng = random.Random(42)
+        for origin in [(42.36, -71.06), (0.0, 179.9), (-60.0, 10.0), (89.0, 0.0)]:
+            for prefix in ['drt', 'u4pr', 'xbp', '7z', 'h']:
+                bounds = geo.cell_bounds(prefix)
+                bound = geo.distance_to_cell(origin[0], origin[1], bounds)
+                samples = [geo.distance_km(origin[0], origin[1], rng.uniform(bounds[0], bounds[2]),
+                                           rng.uniform(bounds[1], bounds[3])) for _ in range(300)]
+                edges = [geo.distance_km(origin[0], origin[1], lat, lng)
+                         for lat in (bounds[0], bounds[2]) for lng in (bounds[1], bounds[3])]
+                self.assertLessEqual(bound, min(samples + edges) + 1e-6, (origin, prefix))
+        self.assertEqual(geo.distance_to_cell(57.64911, 10.40744, geo.cell_bounds('u4pru')), 0.0)
+
+    def test_bbox_area(self):
+        # A degree square at the equator is about 111 km on a side
+        self.assertAlmostEqual(geo.bbox_area_km2((0.0, 0.0, 1.0, 1.0)), 111.2 ** 2, delta=50)
+        whole = geo.bbox_area_km2((-90.0, -180.0, 90.0, 180.0))
+        self.assertAlmostEqual(whole, 4 * 3.141592653589793 * geo.EARTH_RADIUS_KM ** 2, delta=1)
+        self.assertAlmostEqual(geo.bbox_area_km2((0.0, 179.0, 1.0, -179.0)),
+                               geo.bbox_area_km2((0.0, 0.0, 1.0, 2.0)))
+
+    def test_parse_bbox(self):
+        self.assertEqual(geo.parse_bbox('-71.5,42.0,-70.7,42.8'), (42.0, -71.5, 42.8, -70.7))
+        with self.assertRaises(ValueError):
+            geo.parse_bbox('1,2,3')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/python3
+"""
+Unit tests for pooled password hashing
+Run from project root with:
+python3 -m unittest app.tests.test_hashing
+"""
+import threading
+import unittest
+from flask import Flask
+from app.hashing import PasswordHasher, HashingBusy, cost_of, hasher
+from app.services import facade
+from app.tests.base import AppTestCase
+
+
+class TestPasswordHasher(unittest.TestCase):
+
+    def make_hasher(self, **config):
+        app = Flask(__name__)
+        app.config.update(BCRYPT_LOG_ROUNDS=4, **config)
+        pool = PasswordHasher()
+        pool.init_app(app)
+        self.addCleanup(pool.shutdown)
+        return pool
+
+    def test_hash_and_verify_on_thread_pool(self):
+        pool = self.make_hasher(PASSWORD_HASH_EXECUTOR='thread', PASSWORD_HASH_WORKERS=2)
+        hashed = pool.hash('tavern123')
+        self.assertEqual(cost_of(hashed), 4)
+        self.assertTrue(pool.verify(hashed, 'tavern123'))
+        self.assertFalse(pool.verify(hashed, 'wrong'))
+        self.assertFalse(pool.verify('not-a-hash', 'tavern123'))
+
+    def test_needs_rehash_when_cost_changes(self):
+        pool = self.make_hasher(PASSWORD_HASH_EXECUTOR='inline')
+        hashed = pool.hash('tavern123', rounds=5)
+        self.assertTrue(pool.needs_rehash(hashed))
+        self.assertFalse(pool.needs_rehash(pool.hash('tavern123')))
+
+    def test_admission_control(self):
+        """Callers beyond PASSWORD_HASH_MAX_PENDING are turned away"""
+        pool = self.make_hasher(PASSWORD_HASH_EXECUTOR='thread', PASSWORD_HASH_WORKERS=1,
+                                PASSWORD_HASH_MAX_PENDING=1, PASSWORD_HASH_ADMISSION_TIMEOUT=0)
+        release = threading.Event()
+        started = threading.Event()
+
+        def slow(*args):
+            started.set()
+            release.wait(5)
+            return 'done'
+
+        worker = threading.Thread(target=pool._run, args=(slow,))
+        worker.start()
+        started.wait(5)
+        try:
+            with self.assertRaises(HashingBusy):
+                pool.hash('tavern123')
+        finally:
+            release.set()
+            worker.join()
+        self.assertTrue(pool.verify(pool.hash('tavern123'), 'tavern123'))
+
+
+class TestRehashOnLogin(AppTestCase):
+
+    def test_login_upgrades_outdated_hash(self):
+        """Logging in rewrites a hash made with another work factor"""
+        user = facade.create_user({
+            'first_name': 'Castle Steward',
+            'last_name': 'Magnus',
+            'email': 'magnus@example.com',
+            'password': 'castle123'
+        })
+        user.password = hasher.hash('castle123', rounds=5)
+        facade.user_repo.add(user)
+
+        response = self.client.post('/api/v3/auth/login', json={
+            'email': 'magnus@example.com', 'password': 'castle123'
+        })
+        self.assertEqual(response.status_code, 200)
+        user = facade.get_user_by_email('magnus@example.com')
+        self.assertEqual(cost_of(user.password), hasher.rounds)
+        self.assertTrue(user.verify_password('castle123'))
+
+
+if __name__ == '__main__':
+    unittest.main()
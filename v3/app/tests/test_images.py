@@ -0,0 +1,149 @@
+#!/usr/bin/python3
+"""
+Unit tests for resized place images
+Run from project root with:
+python3 -m unittest app.tests.test_images
+"""
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+from app.images import images, pillow_available, resize
+from app.services import facade
+from app.services.importer import BulkImporter
+from app.tests.base import AppTestCase
+
+
+class TestPlaceImages(AppTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.previous_folder = images.folder
+        images.folder = tempfile.mkdtemp()
+        images.clear()
+        owner = facade.create_user({'first_name': 'Guild Master', 'last_name': 'Thorin',
+                                    'email': 'thorin@example.com', 'password': 'tavern123'})
+        self.place = facade.create_place({'title': 'Unpictured Hut', 'description': 'Bare', 'price': 5.0,
+                                          'latitude': 42.36, 'longitude': -71.06,
+                                          'owner_id': owner.id, 'amenities': []})
+
+    def tearDown(self):
+        shutil.rmtree(images.folder)
+        images.folder = self.previous_folder
+        images.clear()
+        super().tearDown()
+
+    def add_copies(self, place_id, *widths):
+        folder = os.path.join(images.folder, place_id)
+        os.makedirs(folder, exist_ok=True)
+        for width in widths:
+            with open(os.path.join(folder, f'{width}.jpg'), 'wb') as f:
+                f.write(b'\xff\xd8' + str(width).encode())
+        images.clear()
+
+    def test_original_image_without_copies(self):
+        place = self.client.get(f'/api/v3/places/{self.place.id}').json
+        self.assertIsNone(place['image_srcset'])
+        self.assertEqual(place['thumbnail'], place['image'])
+
+    def test_srcset_and_thumbnail(self):
+        self.add_copies(self.place.id, 640, 320)
+        place = self.client.get(f'/api/v3/places/{self.place.id}').json
+        base = f'http://localhost/media/places/{self.place.id}'
+        self.assertEqual(place['image_srcset'], f'{base}/320.jpg 320w, {base}/640.jpg 640w')
+        self.assertEqual(place['thumbnail'], f'{base}/320.jpg')
+        self.assertTrue(place['image'].endswith('/Unpictured%20Hut.jpg'))
+
+    def test_new_copies_change_etag(self):
+        first = self.client.get(f'/api/v3/places/{self.place.id}')
+        self.add_copies(self.place.id, 320)
+        response = self.client.get(f'/api/v3/places/{self.place.id}',
+                                   headers={'If-None-Match': first.headers['ETag']})
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(response.json['image_srcset'])
+
+    def test_copies_made_by_another_process(self):
+        """Copies written by another worker show up once the listing expires"""
+        ttl, images._available.ttl = images._available.ttl, 0.2
+        try:
+            self.assertEqual(images.variants(self.place.id), [])
+            folder = os.path.join(images.folder, self.place.id)
+            os.makedirs(folder)
+            open(os.path.join(folder, '320.jpg'), 'wb').close()
+            self.assertEqual(images.variants(self.place.id), [])  # listing still fresh
+            time.sleep(0.25)
+            self.assertEqual(images.variants(self.place.id), [(320, '320.jpg')])
+        finally:
+            images._available.ttl = ttl
+
+    def test_copies_served_by_place_id(self):
+        self.add_copies(self.place.id, 320)
+        response = self.client.get(f'/media/places/{self.place.id}/320.jpg')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, b'\xff\xd8320')
+        self.assertIn('public', response.headers['Cache-Control'])
+        response.close()
+        self.assertEqual(self.client.get(f'/media/places/{self.place.id}/999.jpg').status_code, 404)
+        self.assertEqual(self.client.get('/media/places/..%2F..%2F/config.py').status_code, 404)
+
+    def test_nothing_queued_without_a_picture(self):
+        enabled, images.enabled = images.enabled, True
+        try:
+            self.assertIsNone(images.generate(self.place.id, 'No Such Picture'))
+        finally:
+            images.enabled = enabled
+        self.assertEqual(images.variants(self.place.id), [])
+
+    def test_retitle_without_picture_removes_copies(self):
+        """The old title's copies do not outlive a rename to a title without a picture"""
+        self.add_copies(self.place.id, 320, 640)
+        self.assertEqual(len(images.variants(self.place.id)), 2)
+        facade.update_place(self.place.id, {'title': 'Still Unpictured'})
+        self.assertEqual(images.variants(self.place.id), [])
+        self.assertFalse(os.path.exists(os.path.join(images.folder, self.place.id)))
+        place = self.client.get(f'/api/v3/places/{self.place.id}').json
+        self.assertEqual(place['thumbnail'], place['image'])
+
+    def test_imported_places_queue_copies(self):
+        with mock.patch.object(images, 'generate') as generate:
+            report = BulkImporter().import_records('places', [{
+                'title': 'Imported Inn', 'description': '', 'price': 10, 'latitude': 1.0,
+                'longitude': 1.0, 'owner': 'thorin@example.com'}])
+        self.assertEqual(report['imported'], 1)
+        [place] = [p for p in facade.get_all_places() if p.title == 'Imported Inn']
+        generate.assert_called_once_with(place.id, 'Imported Inn')
+
+
+@unittest.skipUnless(pillow_available(), 'Pillow is not installed')
+class TestResize(unittest.TestCase):
+
+    def setUp(self):
+        from PIL import Image
+        self.folder = tempfile.mkdtemp()
+        self.source = os.path.join(self.folder, 'source.jpg')
+        Image.new('RGB', (1000, 500), 'darkgreen').save(self.source)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_widths_below_original_only(self):
+        from PIL import Image
+        out = os.path.join(self.folder, 'place')
+        self.assertEqual(resize(self.source, out, (1280, 320, 640)), [320, 640])
+        with Image.open(os.path.join(out, '320.jpg')) as image:
+            self.assertEqual(image.size, (320, 160))
+        self.assertEqual(sorted(os.listdir(out)), ['320.jpg', '640.jpg'])
+
+        # Regenerating with other widths drops the old copies
+        self.assertEqual(resize(self.source, out, (480,)), [480])
+        self.assertEqual(os.listdir(out), ['480.jpg'])
+
+    def test_small_original_gets_one_copy(self):
+        out = os.path.join(self.folder, 'place')
+        self.assertEqual(resize(self.source, out, (2000,)), [1000])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+#!/usr/bin/python3
+"""
+Unit tests for the bulk importer and the admin import endpoint
+Run from project root with:
+python3 -m unittest app.tests.test_importer
+"""
+import io
+import json
+import os
+import time
+import unittest
+from datetime import datetime, timedelta
+from app.services import facade
+from app.services.importer import BulkImporter
+from app.tests.base import AppTestCase
+
+USERS_JSONL = "\n".join(json.dumps(user) for user in [
+    {'first_name': 'Guild Master', 'last_name': 'Thorin', 'email': 'thorin@example.com', 'password': 'tavern123'},
+    {'first_name': 'Aragorn', 'last_name': 'Ranger', 'email': 'aragorn@example.com', 'password': 'ranger123'},
+])
+
+AMENITIES_CSV = "name\nHot Meals\nFinest Ale\n"
+
+PLACES_CSV = (
+    "title,description,price,latitude,longitude,owner,amenities\n"
+    "Dragon's Rest Tavern,A legendary tavern,75,42.3601,-71.0589,thorin@example.com,Hot Meals;Finest Ale\n"
+)
+
+
+class TestBulkImporter(AppTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.importer = BulkImporter(batch_size=1, bcrypt_rounds=4)
+
+    def import_all(self):
+        self.importer.import_stream('users', io.StringIO(USERS_JSONL), 'jsonl')
+        self.importer.import_stream('amenities', io.StringIO(AMENITIES_CSV), 'csv')
+        self.importer.import_stream('places', io.StringIO(PLACES_CSV), 'csv')
+        return self.importer.import_records('reviews', [
+            {'text': 'Finest ale in the kingdom', 'rating': 5,
+             'place': "Dragon's Rest Tavern", 'user': 'aragorn@example.com'}
+        ])
+
+    def test_import_resolves_references(self):
+        """Places and reviews are linked through the ref -> id maps"""
+        report = self.import_all()
+        self.assertEqual(report['imported'], 1)
+
+        owner = facade.get_user_by_email('thorin@example.com')
+        self.assertTrue(owner.verify_password('tavern123'))
+        place = facade.get_all_places()[0]
+        self.assertEqual(place.owner_id, owner.id)
+        self.assertEqual(sorted(a.name for a in place.amenities), ['Finest Ale', 'Hot Meals'])
+        self.assertEqual(len(facade.get_reviews_by_place(place.id)), 1)
+        self.assertEqual((place.review_count, place.avg_rating), (1, 5.0))
+
+    def test_references_fall_back_to_database(self):
+        """A fresh importer resolves existing rows by natural key"""
+        self.import_all()
+        report = BulkImporter().import_records('places', [{
+            'title': 'Second Tavern', 'description': '', 'price': 10, 'latitude': 1.0,
+            'longitude': 1.0, 'owner': 'thorin@example.com', 'amenities': ['Hot Meals']
+        }])
+        self.assertEqual(report['imported'], 1)
+
+    def test_timestamps_are_utc(self):
+        """Imported rows carry UTC timestamps like rows created through the models"""
+        previous = os.environ.get('TZ')
+        os.environ['TZ'] = 'Etc/GMT+10'  # local time ten hours behind UTC
+        time.tzset()
+        try:
+            self.importer.import_stream('amenities', io.StringIO(AMENITIES_CSV), 'csv')
+        finally:
+            if previous is None:
+                del os.environ['TZ']
+            else:
+                os.environ['TZ'] = previous
+            time.tzset()
+        amenity = facade.get_all_amenities()[0]
+        self.assertLess(abs(amenity.created_at - datetime.utcnow()), timedelta(minutes=1))
+
+    def test_amenity_name_variants_rejected_per_row(self):
+        """Case and spacing variants of a stored or earlier name fail alone, not their batch"""
+        facade.create_amenity({'name': 'Wi-Fi'})
+        report = BulkImporter().import_records('amenities', [
+            {'name': 'Pool'}, {'name': 'wifi'}, {'name': 'wi-fi'}, {'name': 'Spa'}, {'name': ' POOL '}])
+        self.assertEqual((report['imported'], report['failed']), (3, 2))
+        self.assertEqual([error['rows'] for error in report['errors']], ['3', '5'])
+        self.assertEqual(sorted(a.name for a in facade.get_all_amenities()), ['Pool', 'Spa', 'Wi-Fi', 'wifi'])
+
+    def test_invalid_rows_are_reported_and_skipped(self):
+        """Bad rows are counted without stopping the import"""
+        report = self.importer.import_records('users', [
+            {'first_name': 'Luna', 'last_name': 'Lovegood', 'email': 'not-an-email', 'password': 'x'},
+            {'first_name': 'Luna', 'last_name': 'Lovegood', 'password': 'x'},
+            {'first_name': 'Luna', 'last_name': 'Lovegood', 'email': 'luna@example.com', 'password': 'x'},
+            {'first_name': 'Luna', 'last_name': 'Lovegood', 'email': 'luna@example.com', 'password': 'x'},
+        ])
+        self.assertEqual(report['imported'], 1)
+        self.assertEqual(report['failed'], 3)
+        self.assertEqual([e['rows'] for e in report['errors']], ['1', '2', '4'])
+
+    def test_unknown_reference(self):
+        report = self.importer.import_records('reviews', [
+            {'text': 'Nice', 'rating': 4, 'place': 'Nowhere', 'user': 'nobody@example.com'}
+        ])
+        self.assertEqual(report['failed'], 1)
+
+    def test_duplicate_and_own_place_reviews_rejected_per_row(self):
+        """Bad reviews fail alone instead of taking their batch down with them"""
+        self.import_all()
+        importer = BulkImporter(batch_size=10)
+        review = {'text': 'Again', 'rating': 4, 'place': "Dragon's Rest Tavern"}
+        report = importer.import_records('reviews', [
+            dict(review, user='aragorn@example.com'),  # already imported by import_all
+            dict(review, user='thorin@example.com'),  # the owner
+        ])
+        self.assertEqual(report['imported'], 0)
+        self.assertEqual([e['error'] for e in report['errors']],
+                         ['User has already reviewed this place', 'Users cannot review their own place'])
+
+        facade.create_user({'first_name': 'Luna', 'last_name': 'Lovegood',
+                            'email': 'luna@example.com', 'password': 'moon1234'})
+        report = importer.import_records('reviews', [
+            dict(review, user='luna@example.com'),
+            dict(review, user='luna@example.com'),  # seen earlier in this import
+        ])
+        self.assertEqual((report['imported'], report['failed']), (1, 1))
+        self.assertEqual(report['errors'][0]['rows'], '2')
+        self.assertEqual(facade.get_all_places()[0].review_count, 2)
+
+    def test_admin_endpoint_requires_admin(self):
+        response = self.client.post('/api/v3/admin/import?kind=users', data=USERS_JSONL)
+        self.assertEqual(response.status_code, 401)
+
+    def test_admin_endpoint_imports(self):
+        """Admins can stream records to /api/v3/admin/import"""
+        with self.client.session_transaction() as sess:
+            sess['user_id'] = 'admin'
+            sess['is_admin'] = True
+        response = self.client.post('/api/v3/admin/import?kind=amenities&format=csv', data=AMENITIES_CSV)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['imported'], 2)
+        self.assertIn('rows_per_second', response.json)
+
+        response = self.client.post('/api/v3/admin/import?kind=rooms', data='')
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
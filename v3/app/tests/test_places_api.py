@@ -0,0 +1,316 @@
+#!/usr/bin/python3
+"""
+Unit tests for the v3 places API
+Run from project root with:
+python3 -m unittest app.tests.test_places_api
+"""
+import random
+import unittest
+from app import geo
+from app.services import facade
+from app.api.v3.params import MAX_BATCH_IDS
+from app.persistence.explain import capture_statements
+from app.tests.base import AppTestCase
+
+
+class TestPlacesAPI(AppTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.owner = facade.create_user({
+            'first_name': 'Guild Master',
+            'last_name': 'Thorin',
+            'email': 'thorin@example.com',
+            'password': 'tavern123'
+        })
+
+    def create_place(self, title, price=100.0, amenities=None, latitude=42.3601, longitude=-71.0589):
+        return facade.create_place({
+            'title': title,
+            'description': f'{title} description',
+            'price': price,
+            'latitude': latitude,
+            'longitude': longitude,
+            'owner_id': self.owner.id,
+            'amenities': amenities or []
+        })
+
+    # ==================== LISTING TESTS ====================
+
+    def test_list_places_single_page(self):
+        """All places fit on one page and no cursor is returned"""
+        wifi = facade.create_amenity({'name': 'Wi-Fi'})
+        self.create_place('Tavern', amenities=[wifi.id])
+        self.create_place('Cabin')
+
+        response = self.client.get('/api/v3/places/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json), 2)
+        self.assertNotIn('X-Next-Cursor', response.headers)
+        tavern = next(p for p in response.json if p['title'] == 'Tavern')
+        self.assertEqual(tavern['amenities'], [wifi.id])
+        self.assertEqual(tavern['owner_id'], self.owner.id)
+
+    def test_list_places_follows_cursor(self):
+        """Walking the cursor visits every place exactly once"""
+        created = {self.create_place(f'Place {i}').id for i in range(5)}
+
+        seen = []
+        url = '/api/v3/places/?limit=2'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.json), 2)
+            seen.extend(place['id'] for place in response.json)
+            cursor = response.headers.get('X-Next-Cursor')
+            if cursor:
+                self.assertIn('rel="next"', response.headers['Link'])
+                url = f'/api/v3/places/?limit=2&after={cursor}'
+            else:
+                url = None
+
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(set(seen), created)
+
+    def test_list_places_invalid_arguments(self):
+        """Bad limits and cursors are rejected"""
+        self.assertEqual(self.client.get('/api/v3/places/?limit=0').status_code, 400)
+        self.assertEqual(self.client.get('/api/v3/places/?after=not-a-cursor').status_code, 400)
+
+    # ==================== BATCH READ TESTS ====================
+
+    def test_get_places_by_ids_keeps_order(self):
+        """?ids= returns the asked-for places in that order, unknown ids skipped"""
+        wifi = facade.create_amenity({'name': 'Wi-Fi'})
+        a, b, c = (self.create_place(title, amenities=[wifi.id]) for title in ('A', 'B', 'C'))
+
+        response = self.client.get(f'/api/v3/places/?ids={c.id},missing,{a.id},{c.id}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([p['id'] for p in response.json], [c.id, a.id])
+        self.assertEqual(response.json[0]['amenities'], [wifi.id])
+        self.assertNotIn(b.id, [p['id'] for p in response.json])
+
+    def test_get_places_by_ids_is_one_query(self):
+        ids = ','.join(self.create_place(f'Place {i}').id for i in range(10))
+        with capture_statements() as statements:
+            response = self.client.get(f'/api/v3/places/?ids={ids}')
+        self.assertEqual(len(response.json), 10)
+        places = [sql for sql, _ in statements if 'FROM places' in sql]
+        self.assertEqual(len(places), 1)
+
+    def test_get_places_by_ids_bounded(self):
+        self.assertEqual(self.client.get('/api/v3/places/?ids=').status_code, 400)
+        ids = ','.join(f'id-{i}' for i in range(MAX_BATCH_IDS + 1))
+        self.assertEqual(self.client.get(f'/api/v3/places/?ids={ids}').status_code, 400)
+
+    def test_get_public_users_by_ids(self):
+        guest = facade.create_user({'first_name': 'Bilbo', 'last_name': 'Baggins',
+                                    'email': 'bilbo@example.com', 'password': 'shire1234'})
+        response = self.client.get(f'/api/v3/users/public?ids={guest.id},missing,{self.owner.id}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json, [
+            {'id': guest.id, 'first_name': 'Bilbo', 'last_name': 'Baggins'},
+            {'id': self.owner.id, 'first_name': 'Guild Master', 'last_name': 'Thorin'},
+        ])
+        self.assertEqual(self.client.get('/api/v3/users/public').status_code, 400)
+
+    # ==================== FILTER / SORT TESTS ====================
+
+    def walk(self, url):
+        """Follow Link: rel="next" headers and return every title in order"""
+        titles = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, response.json)
+            titles.extend(place['title'] for place in response.json)
+            link = response.headers.get('Link')
+            url = link[1:link.index('>')] if link else None
+        return titles
+
+    def rate(self, place, *ratings):
+        for i, rating in enumerate(ratings):
+            guest = facade.create_user({
+                'first_name': 'Guest',
+                'last_name': 'Number',
+                'email': f'guest{i}.{place.id[:8]}@example.com',
+                'password': 'guest123'
+            })
+            facade.create_review({'text': 'Stayed here', 'rating': rating,
+                                  'place_id': place.id, 'user_id': guest.id})
+
+    def test_filter_by_price_and_amenities(self):
+        """Price bounds are inclusive and amenities must all be present"""
+        wifi = facade.create_amenity({'name': 'Wi-Fi'})
+        pool = facade.create_amenity({'name': 'Pool'})
+        self.create_place('Hut', price=50.0, amenities=[wifi.id, pool.id])
+        self.create_place('Inn', price=150.0, amenities=[wifi.id])
+        self.create_place('Keep', price=250.0, amenities=[wifi.id, pool.id])
+
+        self.assertEqual(self.walk(f'/api/v3/places/?min_price=100&amenities={wifi.id},{pool.id}'), ['Keep'])
+        self.assertEqual(self.walk(f'/api/v3/places/?max_price=150&amenities={wifi.id}&sort=price'), ['Hut', 'Inn'])
+        self.assertEqual(self.walk('/api/v3/places/?min_price=150&max_price=150'), ['Inn'])
+
+    def test_sort_by_price_across_pages(self):
+        """Filters and sort order carry over to the next page link"""
+        for title, price in [('D', 40.0), ('A', 10.0), ('C', 30.0), ('B', 20.0), ('E', 30.0), ('F', 5.0)]:
+            self.create_place(title, price=price)
+
+        titles = self.walk('/api/v3/places/?sort=price&min_price=10&limit=2')
+        self.assertEqual(titles[:2], ['A', 'B'])
+        self.assertEqual(sorted(titles[2:4]), ['C', 'E'])
+        self.assertEqual(titles[4:], ['D'])
+        self.assertEqual(self.walk('/api/v3/places/?sort=price&order=desc&limit=4')[:2], ['D', titles[3]])
+
+    def test_sort_by_rating(self):
+        """Best rated first by default, unreviewed places last"""
+        self.rate(self.create_place('Good'), 4, 5)
+        self.rate(self.create_place('Best'), 5)
+        self.create_place('New')
+        self.rate(self.create_place('Poor'), 2)
+
+        self.assertEqual(self.walk('/api/v3/places/?sort=rating&limit=1'), ['Best', 'Good', 'Poor', 'New'])
+        self.assertEqual(self.walk('/api/v3/places/?sort=rating&order=asc&limit=1'), ['New', 'Poor', 'Good', 'Best'])
+        self.assertEqual(self.walk('/api/v3/places/?min_rating=4&sort=rating'), ['Best', 'Good'])
+
+    def test_filter_invalid_arguments(self):
+        """Unknown sorts, bad numbers and cursors from another sort are rejected"""
+        for query in ['sort=distance', 'order=up', 'min_price=cheap', 'min_price=200&max_price=100']:
+            self.assertEqual(self.client.get(f'/api/v3/places/?{query}').status_code, 400, query)
+
+        for i in range(3):
+            self.create_place(f'Place {i}')
+        cursor = self.client.get('/api/v3/places/?limit=1').headers['X-Next-Cursor']
+        self.assertEqual(self.client.get(f'/api/v3/places/?sort=price&after={cursor}').status_code, 400)
+
+
+    # ==================== LOCATION SEARCH TESTS ====================
+
+    def test_search_radius_orders_by_distance(self):
+        """Radius search returns nearby places only, nearest first"""
+        self.create_place('Boston Inn', latitude=42.3601, longitude=-71.0589)
+        self.create_place('Cambridge Loft', latitude=42.3736, longitude=-71.1097)
+        self.create_place('Paris Castle', latitude=48.8566, longitude=2.3522)
+
+        response = self.client.get('/api/v3/places/search?lat=42.37&lng=-71.10&radius_km=20')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([p['title'] for p in response.json], ['Cambridge Loft', 'Boston Inn'])
+        self.assertLess(response.json[0]['distance_km'], response.json[1]['distance_km'])
+
+    def test_search_bbox(self):
+        self.create_place('Boston Inn', latitude=42.3601, longitude=-71.0589)
+        self.create_place('Paris Castle', latitude=48.8566, longitude=2.3522)
+
+        response = self.client.get('/api/v3/places/search?bbox=0,45,5,50')
+        self.assertEqual([p['title'] for p in response.json], ['Paris Castle'])
+
+    def test_search_location_after_update(self):
+        """Moving a place moves it in the location index"""
+        place = self.create_place('Wandering Wagon', latitude=42.3601, longitude=-71.0589)
+        facade.update_place(place.id, {'latitude': 48.8566, 'longitude': 2.3522})
+
+        response = self.client.get('/api/v3/places/search?lat=48.85&lng=2.35&radius_km=5')
+        self.assertEqual([p['title'] for p in response.json], ['Wandering Wagon'])
+
+    def test_search_matches_brute_force(self):
+        """Reading cells nearest first and stopping early gives the same nearest places"""
+        rng = random.Random(7)
+        points = [(rng.uniform(42.0, 42.8), rng.uniform(-71.5, -70.7)) for _ in range(60)]
+        for i, (lat, lng) in enumerate(points):
+            self.create_place(f'Inn {i}', latitude=lat, longitude=lng)
+        for radius_km, limit in [(5, 3), (20, 10), (60, 100)]:
+            expected = sorted(d for d in (geo.distance_km(42.4, -71.1, lat, lng) for lat, lng in points)
+                              if d <= radius_km)[:limit]
+            found = facade.search_places_nearby(42.4, -71.1, radius_km, limit)
+            self.assertEqual([round(d, 9) for _, d in found], [round(d, 9) for d in expected])
+
+    def test_search_stops_once_limit_is_near(self):
+        """Cells farther than the nearest `limit` matches are never read"""
+        self.create_place('Boston Inn', latitude=42.3601, longitude=-71.0589)
+        self.create_place('Salem Inn', latitude=42.5195, longitude=-70.8967)
+        with capture_statements() as statements:
+            found = facade.search_places_nearby(42.3601, -71.0589, 50, 1)
+        self.assertEqual([place.title for place, _ in found], ['Boston Inn'])
+        self.assertEqual(len([sql for sql, _ in statements if 'geohash' in sql]), 1)
+
+    def test_search_area_is_capped(self):
+        too_far = geo.MAX_RADIUS_KM + 1
+        self.assertEqual(self.client.get(f'/api/v3/places/search?lat=1&lng=1&radius_km={too_far}').status_code, 400)
+        self.assertEqual(self.client.get('/api/v3/places/search?bbox=-180,-90,180,90').status_code, 400)
+        self.assertEqual(self.client.get('/api/v3/places/search?bbox=-75,40,-67,46').status_code, 200)
+
+    def test_search_invalid_arguments(self):
+        self.assertEqual(self.client.get('/api/v3/places/search?lat=1').status_code, 400)
+        self.assertEqual(self.client.get('/api/v3/places/search?lat=1&lng=1&radius_km=-1').status_code, 400)
+        self.assertEqual(self.client.get('/api/v3/places/search?bbox=a,b').status_code, 400)
+
+    # ==================== DETAILS PAGE TESTS ====================
+
+    def test_place_details(self):
+        """Place, owner, amenities, rating and newest reviews in one response"""
+        wifi = facade.create_amenity({'name': 'Wi-Fi'})
+        fire = facade.create_amenity({'name': 'Enchanted Fireplace'})
+        place = self.create_place('Tavern', amenities=[wifi.id, fire.id])
+        self.rate(place, 5, 3)
+
+        response = self.client.get(f'/api/v3/places/{place.id}/details')
+        self.assertEqual(response.status_code, 200)
+        body = response.json
+        self.assertEqual(body['place']['id'], place.id)
+        self.assertEqual(body['owner'], {'id': self.owner.id, 'first_name': 'Guild Master', 'last_name': 'Thorin'})
+        self.assertEqual([a['name'] for a in body['amenities']], ['Enchanted Fireplace', 'Wi-Fi'])
+        self.assertEqual(body['rating'], {'review_count': 2, 'avg_rating': 4.0})
+        self.assertEqual([r['rating'] for r in body['reviews']], [3, 5])
+        self.assertEqual(body['reviews'][0]['user']['first_name'], 'Guest')
+        self.assertIsNone(body['reviews_cursor'])
+        self.assertIn('ETag', response.headers)
+
+    def test_place_details_query_count(self):
+        """A fixed number of statements however many amenities and reviews"""
+        amenities = [facade.create_amenity({'name': f'Amenity {i}'}).id for i in range(5)]
+        place = self.create_place('Tavern', amenities=amenities)
+        self.rate(place, 5, 4, 3, 2, 1)
+        url = f'/api/v3/places/{place.id}/details'
+        with capture_statements() as statements:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json['reviews']), 5)
+        selects = [sql for sql, _ in statements if sql.lstrip().upper().startswith('SELECT')]
+        self.assertLessEqual(len(selects), 4)
+
+    def test_place_details_review_pages(self):
+        place = self.create_place('Tavern')
+        self.rate(place, 1, 2, 3, 4, 5)
+        seen = []
+        url = f'/api/v3/places/{place.id}/details?limit=2'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json['rating']['review_count'], 5)
+            seen.extend(review['rating'] for review in response.json['reviews'])
+            cursor = response.json['reviews_cursor']
+            self.assertEqual(cursor, response.headers.get('X-Next-Cursor'))
+            url = f'/api/v3/places/{place.id}/details?limit=2&after={cursor}' if cursor else None
+        self.assertEqual(seen, [5, 4, 3, 2, 1])
+
+    def test_place_details_revalidation(self):
+        """304 until a review is added"""
+        place = self.create_place('Tavern')
+        url = f'/api/v3/places/{place.id}/details'
+        etag = self.client.get(url).headers['ETag']
+        with capture_statements() as statements:
+            response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse([sql for sql, _ in statements if 'FROM reviews' in sql and 'LIMIT' in sql.upper()])
+
+        self.rate(place, 4)
+        self.assertEqual(self.client.get(url, headers={'If-None-Match': etag}).status_code, 200)
+
+    def test_place_details_errors(self):
+        self.assertEqual(self.client.get('/api/v3/places/missing/details').status_code, 404)
+        place = self.create_place('Tavern')
+        response = self.client.get(f'/api/v3/places/{place.id}/details?after=not-a-cursor')
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
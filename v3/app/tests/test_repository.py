@@ -0,0 +1,224 @@
+#!/usr/bin/python3
+"""
+Unit tests for SQLAlchemyRepository queries and the facade paths built on them
+Run from project root with:
+python3 -m unittest app.tests.test_repository
+"""
+import unittest
+from sqlalchemy.exc import InvalidRequestError
+from app import db
+from app.services import facade
+from app.persistence.explain import PLACE_FILTER_COMBINATIONS, capture_statements, explain, full_scans
+from app.tests.base import AppTestCase
+
+
+class TestRepositoryQueries(AppTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.owner = facade.create_user({
+            'first_name': 'Forest Keeper',
+            'last_name': 'Elaria',
+            'email': 'elaria@example.com',
+            'password': 'forest123'
+        })
+        self.guest = facade.create_user({
+            'first_name': 'Luna',
+            'last_name': 'Lovegood',
+            'email': 'luna@example.com',
+            'password': 'dreams123'
+        })
+        self.place = self.create_place('Cozy Woodland Cabin', self.owner)
+
+    def create_place(self, title, owner):
+        return facade.create_place({
+            'title': title,
+            'description': 'A charming cabin',
+            'price': 100.0,
+            'latitude': 45.5152,
+            'longitude': -122.6784,
+            'owner_id': owner.id,
+            'amenities': []
+        })
+
+    def create_review(self, place, user, rating=5):
+        return facade.create_review({
+            'text': 'Lovely stay',
+            'rating': rating,
+            'place_id': place.id,
+            'user_id': user.id
+        })
+
+    # ==================== FIND / EXISTS TESTS ====================
+
+    def test_find_by(self):
+        """find_by filters on column names"""
+        other = self.create_place('Ethereal Fae Retreat', self.owner)
+        review = self.create_review(self.place, self.guest)
+        self.create_review(other, self.guest)
+
+        found = facade.review_repo.find_by(place_id=self.place.id)
+        self.assertEqual([r.id for r in found], [review.id])
+        self.assertEqual(len(facade.review_repo.find_by(user_id=self.guest.id)), 2)
+        self.assertEqual(facade.review_repo.find_by(place_id=self.place.id, user_id=self.owner.id), [])
+
+    def test_exists(self):
+        """exists answers without loading rows"""
+        self.assertFalse(facade.review_repo.exists(place_id=self.place.id))
+        self.create_review(self.place, self.guest)
+        self.assertTrue(facade.review_repo.exists(place_id=self.place.id, user_id=self.guest.id))
+        self.assertFalse(facade.review_repo.exists(place_id=self.place.id, user_id=self.owner.id))
+
+    def test_find_by_unknown_column(self):
+        """Unknown columns are rejected"""
+        with self.assertRaises(ValueError):
+            facade.review_repo.find_by(colour='red')
+
+    # ==================== LOAD PROFILE TESTS ====================
+
+    def test_list_profile_skips_reviews(self):
+        """The list profile loads amenities but refuses to lazy-load reviews"""
+        wifi_id = facade.create_amenity({'name': 'Wi-Fi'}).id
+        facade.update_place(self.place.id, {'amenities': [wifi_id]})
+        self.create_review(self.place, self.guest)
+        db.session.expunge_all()
+
+        place = facade.place_repo.get_all(profile='list')[0]
+        self.assertEqual([a.id for a in place.amenities], [wifi_id])
+        with self.assertRaises(InvalidRequestError):
+            place.reviews
+
+    def test_admin_profile_loads_everything(self):
+        """The admin profile eagerly loads every relationship"""
+        self.create_review(self.place, self.guest)
+        place_id, owner_id = self.place.id, self.owner.id
+        db.session.expunge_all()
+
+        place = facade.place_repo.get(place_id, profile='admin')
+        db.session.expunge(place)
+        self.assertEqual(place.owner.id, owner_id)
+        self.assertEqual(len(place.reviews), 1)
+
+    def test_unknown_profile(self):
+        """Unknown profile names are rejected"""
+        with self.assertRaises(ValueError):
+            facade.place_repo.get_all(profile='everything')
+
+    # ==================== PROJECTION TESTS ====================
+
+    def test_list_projection_rows(self):
+        """Listing pages are plain tuples with grouped amenity ids, no ORM objects"""
+        wifi_id = facade.create_amenity({'name': 'Wi-Fi'}).id
+        pool_id = facade.create_amenity({'name': 'Pool'}).id
+        facade.update_place(self.place.id, {'amenities': [wifi_id, pool_id]})
+        other = self.create_place('Ethereal Fae Retreat', self.owner)
+        place_id, other_id, owner_id = self.place.id, other.id, self.owner.id
+        db.session.expunge_all()
+
+        with capture_statements() as statements:
+            rows, next_key = facade.get_places_page(20)
+        self.assertEqual(len(statements), 2)
+        self.assertIsNone(next_key)
+        self.assertEqual(len(db.session.identity_map), 0)
+
+        by_id = {row.id: row for row in rows}
+        self.assertIsInstance(by_id[place_id], tuple)
+        self.assertEqual(sorted(by_id[place_id].amenities), sorted([wifi_id, pool_id]))
+        self.assertEqual(by_id[other_id].amenities, ())
+        self.assertEqual(by_id[other_id].title, 'Ethereal Fae Retreat')
+        self.assertEqual(by_id[other_id].owner_id, owner_id)
+
+    def test_projection_pages_by_sort_column(self):
+        for i in range(4):
+            self.create_place(f'Place {i}', self.owner)
+        seen, key = [], None
+        while True:
+            rows, key = facade.get_places_page(2, key, sort='price')
+            seen.extend(row.id for row in rows)
+            if key is None:
+                break
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(len(set(seen)), 5)
+
+    def test_unknown_projection(self):
+        with self.assertRaises(ValueError):
+            facade.place_repo.get_page(20, projection='everything')
+
+    # ==================== QUERY PLAN TESTS ====================
+
+    def test_listing_filter_plans_use_indexes(self):
+        """No filter combination of the place listing reads a whole table"""
+        wifi_id = facade.create_amenity({'name': 'Wi-Fi'}).id
+        facade.update_place(self.place.id, {'amenities': [wifi_id]})
+        self.create_review(self.place, self.guest)
+
+        # Every combination matches the place, so the amenity query runs too
+        for filters in PLACE_FILTER_COMBINATIONS:
+            if 'amenity_ids' in filters:
+                filters = dict(filters, amenity_ids=[wifi_id])
+            db.session.expunge_all()
+            with capture_statements() as statements:
+                facade.get_places_page(20, **filters)
+            self.assertEqual(len(statements), 2, filters)
+            filtered = bool(set(filters) - {'sort', 'descending'})
+            for statement, parameters in statements:
+                plan = explain(statement, parameters)
+                self.assertEqual(full_scans(plan, filtered), [], (filters, plan))
+
+    # ==================== FACADE TESTS ====================
+
+    def test_get_reviews_by_place(self):
+        """Only the reviews of the requested place are returned"""
+        other = self.create_place('Ethereal Fae Retreat', self.owner)
+        review = self.create_review(self.place, self.guest)
+        self.create_review(other, self.guest)
+
+        reviews = facade.get_reviews_by_place(self.place.id)
+        self.assertEqual([r.id for r in reviews], [review.id])
+
+    def test_rating_aggregates_follow_reviews(self):
+        """Creating, updating and deleting reviews keeps the place aggregates in step"""
+        first = self.create_review(self.place, self.guest, rating=5)
+        critic = facade.create_user({
+            'first_name': 'Sir', 'last_name': 'Galahad',
+            'email': 'galahad@example.com', 'password': 'knight123'
+        })
+        second = self.create_review(self.place, critic, rating=2)
+        place = facade.get_place(self.place.id)
+        self.assertEqual((place.review_count, place.rating_sum, place.avg_rating), (2, 7, 3.5))
+
+        facade.update_review(second.id, {'rating': 4})
+        place = facade.get_place(self.place.id)
+        self.assertEqual((place.review_count, place.avg_rating), (2, 4.5))
+
+        facade.delete_review(first.id)
+        facade.delete_user(critic.id)
+        place = facade.get_place(self.place.id)
+        self.assertEqual((place.review_count, place.rating_sum, place.avg_rating), (0, 0, None))
+
+    def test_rebuild_place_ratings(self):
+        """Rebuilding repairs aggregates that drifted from the reviews table"""
+        self.create_review(self.place, self.guest, rating=4)
+        facade.place_repo.update_columns(self.place.id, [('review_count', 7), ('rating_sum', 1)])
+        db.session.commit()
+
+        self.assertEqual(facade.rebuild_place_ratings(), 1)
+        place = facade.get_place(self.place.id)
+        self.assertEqual((place.review_count, place.rating_sum, place.avg_rating), (1, 4, 4.0))
+        self.assertEqual(facade.rebuild_place_ratings(), 0)
+
+    def test_delete_user_cascades(self):
+        """Deleting an owner removes their places, reviews and reviews of their places"""
+        self.create_review(self.place, self.guest)
+        guest_place = self.create_place('Royal Castle Quarters', self.guest)
+        self.create_review(guest_place, self.owner)
+
+        self.assertTrue(facade.delete_user(self.owner.id))
+        self.assertFalse(facade.place_repo.exists(owner_id=self.owner.id))
+        self.assertFalse(facade.review_repo.exists(place_id=self.place.id))
+        self.assertFalse(facade.review_repo.exists(user_id=self.owner.id))
+        self.assertIsNotNone(facade.place_repo.get(guest_place.id))
+
+
+if __name__ == '__main__':
+    unittest.main()
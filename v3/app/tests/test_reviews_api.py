@@ -0,0 +1,89 @@
+#!/usr/bin/python3
+"""
+Unit tests for the one-review-per-user-per-place rule of the v3 reviews API
+Run from project root with:
+python3 -m unittest app.tests.test_reviews_api
+"""
+import unittest
+import warnings
+from unittest import mock
+from sqlalchemy.exc import IntegrityError, SAWarning
+from app.services import facade
+from app.services.facade import DuplicateReviewError
+from app.models.places import Place
+from app.models.reviews import Review
+from app.persistence.explain import capture_statements
+from app.tests.base import AppTestCase
+
+
+class TestReviewUniqueness(AppTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.owner = facade.create_user({'first_name': 'Guild Master', 'last_name': 'Thorin',
+                                         'email': 'thorin@example.com', 'password': 'tavern123'})
+        self.guest = facade.create_user({'first_name': 'Bilbo', 'last_name': 'Baggins',
+                                         'email': 'bilbo@example.com', 'password': 'shire1234'})
+        self.place_id = facade.create_place({
+            'title': 'Tavern', 'description': 'Warm', 'price': 20.0,
+            'latitude': 42.36, 'longitude': -71.06, 'owner_id': self.owner.id
+        }).id
+        self.guest_id = self.guest.id
+        with self.client.session_transaction() as sess:
+            sess['user_id'] = self.guest_id
+
+    def review(self, rating=5):
+        return {'text': 'Fine ale', 'rating': rating, 'place_id': self.place_id, 'user_id': self.guest_id}
+
+    # ==================== FACADE ====================
+
+    def test_has_reviewed_is_one_statement(self):
+        self.assertFalse(facade.has_reviewed(self.guest_id, self.place_id))
+        facade.create_review(self.review())
+        with capture_statements() as statements:
+            self.assertTrue(facade.has_reviewed(self.guest_id, self.place_id))
+        self.assertEqual(len(statements), 1)
+
+    def test_create_review_does_not_autoflush(self):
+        """The aggregate UPDATE runs before the review joins the session"""
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', SAWarning)
+            facade.create_review(self.review())
+        place = Place.query.get(self.place_id)
+        self.assertEqual((place.review_count, place.rating_sum), (1, 5))
+
+    def test_duplicate_insert_rolled_back(self):
+        """The unique constraint catches a duplicate the pre-check missed"""
+        facade.create_review(self.review(5))
+        with self.assertRaises(DuplicateReviewError):
+            facade.create_review(self.review(1))
+        self.assertEqual(Review.query.count(), 1)
+        place = Place.query.get(self.place_id)
+        self.assertEqual((place.review_count, place.rating_sum), (1, 5))
+
+    def test_other_integrity_errors_are_not_duplicates(self):
+        """A foreign-key failure (user or place deleted meanwhile) is not reported as a duplicate"""
+        error = IntegrityError('INSERT INTO reviews', {}, Exception('FOREIGN KEY constraint failed'))
+        with mock.patch.object(facade.review_repo, 'add', side_effect=error):
+            with self.assertRaises(ValueError) as raised:
+                facade.create_review(self.review())
+        self.assertNotIsInstance(raised.exception, DuplicateReviewError)
+
+    # ==================== API ====================
+
+    def test_second_review_conflicts(self):
+        response = self.client.post('/api/v3/reviews/', json=self.review())
+        self.assertEqual(response.status_code, 201)
+        again = self.client.post('/api/v3/reviews/', json=self.review(2))
+        self.assertEqual(again.status_code, 409)
+        self.assertEqual(Review.query.count(), 1)
+
+    def test_own_place_forbidden(self):
+        with self.client.session_transaction() as sess:
+            sess['user_id'] = self.owner.id
+        response = self.client.post('/api/v3/reviews/', json=self.review())
+        self.assertEqual(response.status_code, 403)
+
+
+if __name__ == '__main__':
+    unittest.main()
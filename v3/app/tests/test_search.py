@@ -0,0 +1,215 @@
+#!/usr/bin/python3
+"""
+Unit tests for place text search: the BM25 index, snippets and the API
+Run from project root with:
+python3 -m unittest app.tests.test_search
+"""
+import threading
+import unittest
+from unittest import mock
+from flask import Flask
+from app import search as search_module
+from app.search import PlaceSearch, SearchIndex, highlight, query_terms, search
+from app.services import facade
+from app.tests.base import AppTestCase
+
+
+class TestSearchIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = SearchIndex()
+        self.index.add('tavern', "Dragon's Rest Tavern", 'Finest ale in the kingdom, warm fireplaces')
+        self.index.add('cabin', 'Cozy Woodland Cabin', 'A stone fireplace and forest views')
+        self.index.add('castle', 'Royal Castle Quarters', 'Four-poster beds, a dragon tapestry and ale')
+
+    def ids(self, query, limit=10):
+        return [place_id for place_id, _ in self.index.search(query_terms(query), limit)]
+
+    def test_query_terms(self):
+        self.assertEqual(query_terms('The DRAGON and the dragon'), ['dragon'])
+        self.assertEqual(query_terms('of the'), [])
+
+    def test_every_word_must_match(self):
+        self.assertEqual(set(self.ids('ale')), {'tavern', 'castle'})
+        self.assertEqual(self.ids('ale fireplaces'), ['tavern'])
+        self.assertEqual(self.ids('ale unicorn'), [])
+
+    def test_title_matches_rank_first(self):
+        self.assertEqual(self.ids('dragon'), ['tavern', 'castle'])
+        self.assertEqual(self.ids('dragon', limit=1), ['tavern'])
+
+    def test_replace_and_remove(self):
+        self.index.add('cabin', 'Cozy Cabin', 'Now with ale')
+        self.assertEqual(self.ids('woodland'), [])
+        self.assertIn('cabin', self.ids('ale'))
+        self.index.remove('cabin')
+        self.assertEqual(set(self.ids('ale')), {'tavern', 'castle'})
+        self.assertEqual(len(self.index), 2)
+
+    def test_compaction_keeps_results(self):
+        original = search_module.MIN_COMPACT
+        search_module.MIN_COMPACT = 2
+        try:
+            for i in range(6):
+                self.index.add(f'inn{i}', f'Inn {i}', 'ale')
+            for i in range(5):
+                self.index.remove(f'inn{i}')  # the fifth leaves more dead than live documents
+        finally:
+            search_module.MIN_COMPACT = original
+        self.assertEqual(set(self.ids('ale')), {'tavern', 'castle', 'inn5'})
+        self.assertEqual(self.index._deleted, 0)
+
+    def test_champion_lists(self):
+        """Long posting lists are searched through their best postings, kept current on add"""
+        for i in range(10):
+            self.index.add(f'inn{i}', f'Inn {i}', 'ale ' + 'quiet ' * i)
+        full = self.ids('ale', limit=2)
+        thresholds = search_module.CHAMPION_THRESHOLD, search_module.CHAMPIONS
+        search_module.CHAMPION_THRESHOLD, search_module.CHAMPIONS = 5, 3
+        try:
+            self.assertEqual(self.ids('ale', limit=2), full)
+            self.index.add('alehouse', 'Ale Ale Ale', '')
+            self.assertEqual(self.ids('ale', limit=1), ['alehouse'])
+            # Fewer champions than asked for: the whole list is scored
+            self.assertEqual(len(self.ids('ale', limit=8)), 8)
+        finally:
+            search_module.CHAMPION_THRESHOLD, search_module.CHAMPIONS = thresholds
+
+
+class TestPlaceSearchBuild(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.search = PlaceSearch()
+        self.search.mode = 'inline'
+
+    def ids(self, query):
+        return [place_id for place_id, _ in self.search.index.search(query_terms(query), 10)]
+
+    def test_writes_during_build_are_replayed(self):
+        """Places written after the build read its rows still end up indexed"""
+        def rows():
+            yield 'tavern', 'Tavern', 'ale'
+            yield 'cabin', 'Cabin', 'ale'
+            self.search.add('castle', 'Castle', 'ale')
+            self.search.add('tavern', 'Tavern', 'mead')
+            self.search.remove('cabin')
+
+        self.search.add('ignored', 'Inn', 'ale')  # before the build: the build reads it itself
+        self.search.start(self.app, rows)
+        self.assertTrue(self.search.ready)
+        self.assertEqual(self.ids('ale'), ['castle'])
+        self.assertEqual(self.ids('mead'), ['tavern'])
+
+    def test_background_build(self):
+        release = threading.Event()
+
+        def rows():
+            release.wait(5)
+            return [('tavern', 'Tavern', 'ale')]
+
+        self.search.mode = 'thread'
+        self.search.start(self.app, rows)
+        self.assertTrue(self.search.building)
+        self.assertFalse(self.search.ready)
+        self.search.add('castle', 'Castle', 'ale')
+        release.set()
+        for thread in threading.enumerate():
+            if thread.name == 'place-search-build':
+                thread.join(5)
+        self.assertTrue(self.search.ready)
+        self.assertEqual(set(self.ids('ale')), {'tavern', 'castle'})
+
+    def test_failed_build_can_restart(self):
+        def broken():
+            raise RuntimeError('no places table')
+
+        with self.assertLogs('app.search', 'ERROR'):
+            self.search.start(self.app, broken)
+        self.assertFalse(self.search.ready or self.search.building)
+        self.search.start(self.app, lambda: [('tavern', 'Tavern', 'ale')])
+        self.assertEqual(self.ids('ale'), ['tavern'])
+
+
+class TestHighlight(unittest.TestCase):
+
+    def test_marks_and_escapes(self):
+        self.assertEqual(highlight('Ale & <b>Dragon</b> ale', {'ale', 'dragon'}),
+                         '<mark>Ale</mark> &amp; &lt;b&gt;<mark>Dragon</mark>&lt;/b&gt; <mark>ale</mark>')
+
+    def test_snippet_around_first_match(self):
+        text = ' '.join(['filler'] * 60) + ' dragon lair ' + ' '.join(['filler'] * 60)
+        snippet = highlight(text, {'dragon'}, length=80)
+        self.assertTrue(snippet.startswith('…') and snippet.endswith('…'))
+        self.assertIn('<mark>dragon</mark>', snippet)
+        self.assertLessEqual(len(snippet), 80 + len('<mark></mark>') + 2)
+
+    def test_no_match_keeps_start(self):
+        self.assertEqual(highlight('Quiet room', {'dragon'}), 'Quiet room')
+
+
+class TestSearchAPI(AppTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.owner = facade.create_user({'first_name': 'Guild Master', 'last_name': 'Thorin',
+                                         'email': 'thorin@example.com', 'password': 'tavern123'})
+
+    def create_place(self, title, description):
+        return facade.create_place({'title': title, 'description': description, 'price': 20.0,
+                                    'latitude': 42.36, 'longitude': -71.06, 'owner_id': self.owner.id})
+
+    def test_search_ranks_and_highlights(self):
+        tavern = self.create_place("Dragon's Rest Tavern", 'Finest ale in the kingdom')
+        castle = self.create_place('Royal Castle Quarters', 'A dragon tapestry over the bed')
+        self.create_place('Cozy Woodland Cabin', 'Forest views')
+
+        response = self.client.get('/api/v3/places/search?q=Dragon')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([p['id'] for p in response.json], [tavern.id, castle.id])
+        first = response.json[0]
+        self.assertEqual(first['highlights']['title'], "<mark>Dragon</mark>&#39;s Rest Tavern")
+        self.assertGreater(first['score'], response.json[1]['score'])
+        self.assertEqual(first['owner_id'], self.owner.id)
+
+    def test_index_follows_writes(self):
+        """Places created or changed after the index is built are found"""
+        place = self.create_place('Quiet Inn', 'Soft beds')
+        self.assertEqual(len(self.client.get('/api/v3/places/search?q=quiet').json), 1)
+        self.assertTrue(search.ready)
+
+        self.create_place('Quiet Cabin', 'Soft moss')
+        facade.update_place(place.id, {'description': 'Hot meals'})
+        self.assertEqual(len(self.client.get('/api/v3/places/search?q=quiet').json), 2)
+        self.assertEqual(self.client.get('/api/v3/places/search?q=beds').json, [])
+
+        facade.delete_user(self.owner.id)
+        self.assertEqual(self.client.get('/api/v3/places/search?q=quiet').json, [])
+
+    def test_search_before_index_is_built(self):
+        """Until the index is ready, searches match every word with LIKE, unranked"""
+        self.create_place("Dragon's Rest Tavern", 'Finest ale in the kingdom')
+        self.create_place('Royal Castle Quarters', 'A dragon tapestry over the bed')
+        self.create_place('Cozy Woodland Cabin', 'Forest views')
+        self.create_place('Under_score Inn', 'dragon')
+        self.create_place('Under score Hall', 'Forest views')
+
+        with mock.patch.object(search, 'start'):
+            response = self.client.get('/api/v3/places/search?q=DRAGON+ale')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual([p['title'] for p in response.json], ["Dragon's Rest Tavern"])
+            self.assertIsNone(response.json[0]['score'])
+            self.assertIn('<mark>Dragon</mark>', response.json[0]['highlights']['title'])
+            self.assertEqual(len(self.client.get('/api/v3/places/search?q=dragon').json), 3)
+            # LIKE wildcards in a word are matched literally
+            self.assertEqual(len(self.client.get('/api/v3/places/search?q=under_score').json), 1)
+        self.assertFalse(search.ready)
+
+    def test_search_invalid_arguments(self):
+        self.assertEqual(self.client.get('/api/v3/places/search?q=').status_code, 400)
+        self.assertEqual(self.client.get('/api/v3/places/search?q=the').status_code, 400)
+        self.assertEqual(self.client.get('/api/v3/places/search?q=ale&limit=0').status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
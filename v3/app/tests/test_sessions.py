@@ -0,0 +1,166 @@
+#!/usr/bin/python3
+"""
+Unit tests for the signed-token session backend
+Run from project root with:
+python3 -m unittest app.tests.test_sessions
+"""
+import time
+import unittest
+from datetime import timedelta
+from app.services import facade
+from app.sessions import Denylist, TokenSessionInterface
+from app.persistence.explain import capture_statements
+from app.tests.base import AppTestCase
+
+CREDENTIALS = {'email': 'bilbo@example.com', 'password': 'shire1234'}
+
+
+class TestTokenSessions(AppTestCase):
+
+    def setUp(self):
+        super().setUp()
+        # The shared test app uses Flask-Session; swap the interface for these tests
+        self.previous_interface = self.app.session_interface
+        self.interface = TokenSessionInterface()
+        self.app.session_interface = self.interface
+        facade.create_user({'first_name': 'Bilbo', 'last_name': 'Baggins', **CREDENTIALS})
+
+    def tearDown(self):
+        self.app.session_interface = self.previous_interface
+        super().tearDown()
+
+    def login(self, client=None):
+        response = (client or self.client).post('/api/v3/auth/login', json=CREDENTIALS)
+        self.assertEqual(response.status_code, 200)
+        return response.get_json()['token']
+
+    def bearer(self, token):
+        return self.app.test_client().get('/api/v3/auth/protected',
+                                          headers={'Authorization': f'Bearer {token}'})
+
+    # ==================== COOKIE AND BEARER ====================
+
+    def test_login_sets_cookie_and_returns_token(self):
+        token = self.login()
+        self.assertTrue(token)
+        response = self.client.get('/api/v3/auth/protected')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['email'], CREDENTIALS['email'])
+        self.assertEqual(self.bearer(token).status_code, 200)
+
+    def test_anonymous_and_forged_tokens_rejected(self):
+        self.assertEqual(self.client.get('/api/v3/auth/protected').status_code, 401)
+        token = self.login(self.app.test_client())
+        forged = token[:-2] + ('AA' if not token.endswith('AA') else 'BB')
+        self.assertEqual(self.bearer(forged).status_code, 401)
+        self.assertEqual(self.bearer('not-a-token').status_code, 401)
+
+    def test_anonymous_requests_set_no_cookie(self):
+        response = self.client.get('/api/v3/places/')
+        self.assertNotIn('Set-Cookie', response.headers)
+
+    def test_expired_token_rejected(self):
+        token = self.login()
+        self.app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(seconds=-1)
+        try:
+            self.assertEqual(self.bearer(token).status_code, 401)
+        finally:
+            self.app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(minutes=30)
+
+    # ==================== REVOCATION ====================
+
+    def test_logout_revokes_token(self):
+        token = self.login()
+        self.assertEqual(self.client.post('/api/v3/auth/logout').status_code, 200)
+        self.assertEqual(self.client.get('/api/v3/auth/protected').status_code, 401)
+        self.assertEqual(self.bearer(token).status_code, 401)
+
+    def test_logout_with_bearer_revokes_token(self):
+        token = self.login(self.app.test_client())
+        self.app.test_client().post('/api/v3/auth/logout', headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(self.bearer(token).status_code, 401)
+
+    def test_refreshed_cookie_keeps_token_id(self):
+        """Re-signing an unchanged session keeps its id, so logout kills every copy"""
+        token = self.login()
+        self.client.get('/api/v3/auth/protected')
+        refreshed = self.client.get_cookie(self.app.config['SESSION_COOKIE_NAME']).value
+        self.client.post('/api/v3/auth/logout')
+        self.assertEqual(self.bearer(token).status_code, 401)
+        self.assertEqual(self.bearer(refreshed).status_code, 401)
+
+    def test_login_logout_loop_keeps_one_entry(self):
+        """Repeated logins and logouts of one account never crowd out other users"""
+        for _ in range(20):
+            self.login()
+            self.client.post('/api/v3/auth/logout')
+        self.assertEqual(len(self.interface.denylist), 1)
+        self.assertEqual(self.interface.denylist.floor, 0.0)
+
+    def test_full_denylist_never_refuses_logins(self):
+        token = self.login(self.app.test_client())
+        self.interface.denylist.max_size = 1
+        self.interface.revoke(self.app, 'someone-else', time.time())
+        self.interface.revoke(self.app, 'another-user', time.time())
+        # The evicted entry's cutoff now applies to every older token
+        self.assertEqual(self.bearer(token).status_code, 401)
+        token = self.login(self.app.test_client())
+        self.assertEqual(self.bearer(token).status_code, 200)
+
+    def test_login_again_replaces_previous_token(self):
+        first = self.login()
+        second = self.login()
+        self.assertEqual(self.bearer(first).status_code, 401)
+        self.assertEqual(self.bearer(second).status_code, 200)
+
+    # ==================== NO DATABASE ====================
+
+    def test_identity_check_needs_no_database(self):
+        token = self.login(self.app.test_client())
+        with capture_statements() as statements:
+            response = self.app.test_client().delete(
+                '/api/v3/reviews/missing-review', headers={'Authorization': f'Bearer {token}'})
+            self.client.get('/api/v3/auth/protected')  # anonymous: rejected without a query
+        self.assertIn(response.status_code, (403, 404))
+        self.assertFalse([sql for sql, _ in statements if 'sessions' in sql])
+
+
+class TestDenylist(unittest.TestCase):
+
+    def test_revokes_older_tokens_of_the_user(self):
+        denylist = Denylist()
+        denylist.revoke('bilbo', 100.0, time.time() + 60)
+        self.assertTrue(denylist.revoked('bilbo', 99.0))
+        self.assertTrue(denylist.revoked('bilbo', 100.0))
+        self.assertFalse(denylist.revoked('bilbo', 101.0))
+        self.assertFalse(denylist.revoked('frodo', 99.0))
+        # A later revocation of an older token does not bring newer ones back
+        denylist.revoke('bilbo', 50.0, time.time() + 60)
+        self.assertTrue(denylist.revoked('bilbo', 100.0))
+
+    def test_entries_expire(self):
+        denylist = Denylist()
+        denylist.revoke('dead', 100.0, time.time() - 1)
+        self.assertFalse(denylist.revoked('dead', 99.0))
+
+    def test_full_denylist_prunes_expired_first(self):
+        denylist = Denylist(max_size=2)
+        denylist.revoke('dead', 100.0, time.time() - 1)
+        denylist.revoke('soon', 200.0, time.time() + 10)
+        denylist.revoke('later', 300.0, time.time() + 20)
+        self.assertEqual(len(denylist), 2)
+        self.assertEqual(denylist.floor, 0.0)
+
+    def test_full_denylist_keeps_every_revocation(self):
+        """Evicting an entry raises the floor, so no revoked token comes back"""
+        denylist = Denylist(max_size=10)
+        for i in range(50):
+            denylist.revoke(f'user-{i}', float(i), time.time() + 60 + i)
+        self.assertEqual(len(denylist), 10)
+        for i in range(50):
+            self.assertTrue(denylist.revoked(f'user-{i}', float(i)))
+        self.assertFalse(denylist.revoked('user-0', 50.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+#!/usr/bin/python3
+"""
+Unit tests for account deletion in the v3 users API
+Run from project root with:
+python3 -m unittest app.tests.test_users_api
+"""
+import unittest
+from app.services import facade
+from app.tests.base import AppTestCase
+
+
+class TestDeleteUser(AppTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.admin = facade.create_user({'first_name': 'Gandalf', 'last_name': 'Grey',
+                                         'email': 'gandalf@example.com', 'password': 'wizard123'})
+        self.guest = facade.create_user({'first_name': 'Bilbo', 'last_name': 'Baggins',
+                                         'email': 'bilbo@example.com', 'password': 'shire1234'})
+
+    def log_in(self, user, is_admin=False):
+        with self.client.session_transaction() as sess:
+            sess['user_id'] = user.id
+            sess['is_admin'] = is_admin
+
+    def test_admin_deleting_another_user_stays_logged_in(self):
+        self.log_in(self.admin, is_admin=True)
+        response = self.client.delete(f'/api/v3/users/{self.guest.id}')
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(facade.get_user(self.guest.id))
+        self.assertEqual(self.client.get('/api/v3/auth/protected').status_code, 200)
+
+    def test_deleting_own_account_ends_the_session(self):
+        self.log_in(self.guest)
+        response = self.client.delete(f'/api/v3/users/{self.guest.id}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get('/api/v3/auth/protected').status_code, 401)
+
+    def test_other_accounts_are_off_limits(self):
+        self.log_in(self.guest)
+        self.assertEqual(self.client.delete(f'/api/v3/users/{self.admin.id}').status_code, 401)
+        self.assertIsNotNone(facade.get_user(self.admin.id))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,570 @@
+#!/usr/bin/env python3
+"""
+Benchmark harness for the HBnB v3 REST API
+
+Seeds a throwaway database with synthetic users, amenities, places and
+reviews shaped like the sample data in load_sample_data.py, then drives
+every /api/v3 endpoint through the Flask test client (in-process, no
+network) and through a real threaded WSGI server over HTTP. For each
+endpoint it reports throughput, p50/p95/p99 latency, SQL statements per
+request and peak Python allocations per request, and writes the results
+as JSON so runs from different commits can be compared.
+
+Usage:
+    python benchmark.py [--users N] [--amenities N] [--places N] [--reviews N]
+        [--iterations N] [--concurrency N] [--mode both|test_client|wsgi]
+        [--database-url URL] [--output FILE] [--compare BASELINE.json]
+
+Arguments:
+    --users/--amenities/--places/--reviews: Seeded rows per entity
+    --iterations: Timed requests per endpoint (after a short warm-up)
+    --alloc-iterations: Requests per endpoint traced with tracemalloc
+    --concurrency: Client threads hitting the WSGI server at once
+    --mode: Which drivers to run
+    --database-url: Database to benchmark against. Defaults to a temporary
+        SQLite file. ALL TABLES ARE DROPPED AND RECREATED, never point this
+        at a database you care about.
+    --output: Where to write the JSON results
+    --compare: Baseline JSON from an earlier run; prints p95/throughput
+        changes per endpoint and exits with 1 when any regress by more
+        than --threshold
+"""
+
+import argparse
+import itertools
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from http.cookiejar import CookieJar
+
+from sqlalchemy import event
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+from load_sample_data import SAMPLE_USERS, SAMPLE_AMENITIES, SAMPLE_PLACES, SAMPLE_REVIEWS
+
+BENCH_PASSWORD = 'bench-pass-123'
+ADMIN_EMAIL = 'admin@bench.example'
+GUEST_EMAIL = 'guest@bench.example'
+WARMUP = 5
+
+
+# --- Seeding ---
+def synthetic_records(users, amenities, places, reviews, seed=42):
+    """Build records for the bulk importer, cycling through the sample data shapes"""
+    rng = random.Random(seed)
+    records = {'users': [], 'amenities': [], 'places': [], 'reviews': []}
+
+    # Two fixed accounts drive the authenticated endpoints; the guest owns and reviews nothing
+    records['users'].append({'first_name': 'Bench', 'last_name': 'Admin', 'email': ADMIN_EMAIL,
+                             'password': BENCH_PASSWORD, 'is_admin': True})
+    records['users'].append({'first_name': 'Bench', 'last_name': 'Guest', 'email': GUEST_EMAIL,
+                             'password': BENCH_PASSWORD})
+    for i in range(users):
+        sample = SAMPLE_USERS[i % len(SAMPLE_USERS)]
+        records['users'].append({'first_name': sample['first_name'], 'last_name': sample['last_name'],
+                                 'email': f'user{i}@bench.example', 'password': BENCH_PASSWORD})
+
+    amenity_names = []
+    for i in range(amenities):
+        name = f"{SAMPLE_AMENITIES[i % len(SAMPLE_AMENITIES)]['name']} {i}"
+        amenity_names.append(name)
+        records['amenities'].append({'name': name})
+
+    owners = [f'user{i}@bench.example' for i in range(users)]
+    for i in range(places):
+        sample = SAMPLE_PLACES[i % len(SAMPLE_PLACES)]
+        records['places'].append({
+            'ref': f'place-{i}',
+            'title': f"{sample['title']} {i}",
+            'description': sample['description'],
+            'price': round(rng.uniform(20, 400), 2),
+            'latitude': max(-90.0, min(90.0, sample['latitude'] + rng.uniform(-5, 5))),
+            'longitude': max(-180.0, min(180.0, sample['longitude'] + rng.uniform(-5, 5))),
+            'owner': owners[i % len(owners)],
+            'amenities': rng.sample(amenity_names, min(len(amenity_names), rng.randint(0, 5))),
+        })
+
+    # One review per (user, place) pair, never by the place's owner
+    pairs = set()
+    attempts = 0
+    while len(pairs) < reviews and attempts < reviews * 10:
+        attempts += 1
+        place_no, user_no = rng.randrange(places), rng.randrange(users)
+        if place_no % users == user_no:
+            continue
+        pairs.add((place_no, user_no))
+    for place_no, user_no in sorted(pairs):
+        sample = SAMPLE_REVIEWS[(place_no + user_no) % len(SAMPLE_REVIEWS)]
+        records['reviews'].append({'place': f'place-{place_no}', 'user': f'user{user_no}@bench.example',
+                                   'text': sample['text'], 'rating': rng.randint(1, 5)})
+    return records
+
+
+def seed_database(scale, seed=42):
+    """Recreate every table and bulk load a synthetic dataset; returns the ids per kind"""
+    from app import db
+    from app.persistence.cache import cache
+    from app.services.importer import BulkImporter, KINDS
+    from app.models.reviews import Review
+
+    db.session.remove()
+    db.drop_all()
+    db.create_all()
+    cache.clear()
+
+    importer = BulkImporter(batch_size=5000, bcrypt_rounds=4, reuse_hashes=True)
+    records = synthetic_records(seed=seed, **scale)
+    reports = {kind: importer.import_records(kind, records[kind]) for kind in KINDS}
+    for kind, report in reports.items():
+        if report['failed']:
+            raise RuntimeError(f"Seeding {kind} failed: {report['errors'][:3]}")
+
+    ids = {kind: list(dict.fromkeys(importer.ids[kind].values())) for kind in KINDS}
+    ids['admin'] = importer.ids['users'][ADMIN_EMAIL]
+    ids['guest'] = importer.ids['users'][GUEST_EMAIL]
+    ids['reviews'] = [review_id for review_id, in db.session.query(Review.id)]
+    db.session.remove()
+    return reports, ids
+
+
+# --- Endpoints ---
+class Endpoint:
+    """One benchmarked request.
+
+    `path` and `body` are strings/dicts or callables taking (n, state),
+    where n counts the calls to this endpoint and state holds the seeded
+    ids plus anything earlier endpoints created. `role` picks the
+    client session: None (anonymous), 'guest', 'admin' or 'session'
+    (a client of its own, for login/logout). `after` gets (n, response
+    json, state) to record created ids.
+    """
+
+    def __init__(self, name, method, path, body=None, role=None, expect=(200,), after=None,
+                 content_type='application/json'):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.body = body
+        self.role = role
+        self.expect = expect
+        self.after = after
+        self.content_type = content_type
+
+    def build(self, n, state):
+        path = self.path(n, state) if callable(self.path) else self.path
+        body = self.body(n, state) if callable(self.body) else self.body
+        return path, body
+
+
+def pick(kind, n, state):
+    return state[kind][n % len(state[kind])]
+
+
+def remember(kind):
+    """after-hook appending the created object's id to state[kind]"""
+    def after(n, data, state):
+        if isinstance(data, dict) and 'id' in data:
+            state[kind].append(data['id'])
+    return after
+
+
+def new_place(n, state):
+    return {'title': f'Bench Keep {n}', 'description': 'Built for benchmarking', 'price': 120.0,
+            'latitude': 48.85, 'longitude': 2.35, 'owner_id': state['admin'], 'amenities': state['amenities'][:2]}
+
+
+def import_body(n, state):
+    return '\n'.join(json.dumps({'name': f'Imported amenity {n}.{i}'}) for i in range(10))
+
+
+# Ordered so that create/update/delete endpoints find the objects earlier ones made
+ENDPOINTS = [
+    Endpoint('POST /auth/login', 'POST', '/auth/login', role='session',
+             body={'email': GUEST_EMAIL, 'password': BENCH_PASSWORD}),
+    Endpoint('GET /auth/protected', 'GET', '/auth/protected', role='guest'),
+    Endpoint('POST /auth/logout', 'POST', '/auth/logout', role='session'),
+
+    Endpoint('GET /places/', 'GET', '/places/?limit=20'),
+    Endpoint('GET /places/ page 2', 'GET', lambda n, s: f"/places/?limit=20&after={s['cursor']}"),
+    Endpoint('GET /places/ filtered', 'GET', lambda n, s: f"/places/?min_price=50&max_price=250&amenities={pick('amenities', n, s)}&sort=price"),
+    Endpoint('GET /places/ by rating', 'GET', '/places/?min_rating=3&sort=rating'),
+    Endpoint('GET /places/search radius', 'GET', '/places/search?lat=48.85&lng=2.35&radius_km=200'),
+    Endpoint('GET /places/search bbox', 'GET', '/places/search?bbox=-75,40,-67,46'),
+    Endpoint('GET /places/<id>', 'GET', lambda n, s: f"/places/{pick('places', n, s)}"),
+    Endpoint('POST /places/', 'POST', '/places/', body=new_place, role='admin', expect=(201,),
+             after=remember('bench_places')),
+    Endpoint('PUT /places/<id>', 'PUT', lambda n, s: f"/places/{pick('bench_places', n, s)}", role='admin',
+             body=lambda n, s: dict(new_place(n, s), price=100.0 + n % 50)),
+
+    Endpoint('GET /amenities/', 'GET', '/amenities/'),
+    Endpoint('GET /amenities/<id>', 'GET', lambda n, s: f"/amenities/{pick('amenities', n, s)}"),
+    Endpoint('POST /amenities/', 'POST', '/amenities/', role='admin', expect=(201,),
+             body=lambda n, s: {'name': f"Bench amenity {s['run']}.{n}"}),
+    Endpoint('PUT /amenities/<id>', 'PUT', lambda n, s: f"/amenities/{pick('amenities', n, s)}", role='admin',
+             body=lambda n, s: {'name': f'Renamed amenity {n}'}),
+
+    Endpoint('GET /reviews/', 'GET', '/reviews/'),
+    Endpoint('GET /reviews/<id>', 'GET', lambda n, s: f"/reviews/{pick('reviews', n, s)}"),
+    Endpoint('GET /reviews/places/<id>/reviews', 'GET', lambda n, s: f"/reviews/places/{pick('places', n, s)}/reviews"),
+    Endpoint('POST /reviews/', 'POST', '/reviews/', role='guest', expect=(201,),
+             body=lambda n, s: {'text': 'Benchmark stay', 'rating': 1 + n % 5, 'user_id': s['guest'],
+                                'place_id': s['places'][n % len(s['places'])]},
+             after=remember('bench_reviews')),
+    Endpoint('PUT /reviews/<id>', 'PUT', lambda n, s: f"/reviews/{pick('bench_reviews', n, s)}", role='guest',
+             body=lambda n, s: {'text': 'Benchmark stay, revisited', 'rating': 1 + (n + 2) % 5}),
+    Endpoint('DELETE /reviews/<id>', 'DELETE', lambda n, s: f"/reviews/{s['bench_reviews'].pop()}", role='guest'),
+
+    Endpoint('POST /users/', 'POST', '/users/', expect=(201,),
+             body=lambda n, s: {'first_name': 'New', 'last_name': 'Adventurer',
+                                'email': f"bench{s['run']}.{n}@new.example", 'password': BENCH_PASSWORD},
+             after=remember('bench_users')),
+    Endpoint('GET /users/<id>/public', 'GET', lambda n, s: f"/users/{pick('users', n, s)}/public"),
+    Endpoint('GET /users/<id>', 'GET', lambda n, s: f"/users/{pick('users', n, s)}", role='admin'),
+    Endpoint('PUT /users/<id>', 'PUT', lambda n, s: f"/users/{pick('bench_users', n, s)}", role='admin',
+             body=lambda n, s: {'first_name': f'Renamed {n % 100}'}),
+    Endpoint('DELETE /users/<id>', 'DELETE', lambda n, s: f"/users/{s['bench_users'].pop()}", role='admin'),
+
+    Endpoint('GET /admin/cache', 'GET', '/admin/cache', role='admin'),
+    Endpoint('POST /admin/import', 'POST', '/admin/import?kind=amenities&format=jsonl', role='admin',
+             body=import_body, content_type='application/x-ndjson'),
+    Endpoint('POST /admin/ratings/rebuild', 'POST', '/admin/ratings/rebuild', role='admin'),
+]
+
+
+# --- Drivers ---
+class TestClientDriver:
+    """Sends requests through Flask's test client, one client per role"""
+
+    name = 'test_client'
+
+    def __init__(self, app):
+        self.app = app
+        self.clients = {}
+
+    def client(self, role):
+        if role not in self.clients:
+            self.clients[role] = self.app.test_client()
+        return self.clients[role]
+
+    def request(self, role, method, path, body=None, content_type='application/json'):
+        kwargs = {}
+        if isinstance(body, dict):
+            kwargs['json'] = body
+        elif body is not None:
+            kwargs.update(data=body, content_type=content_type)
+        response = self.client(role).open('/api/v3' + path, method=method, **kwargs)
+        return response.status_code, response.get_json(silent=True), response.headers
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    """Skips werkzeug's per-request access log line"""
+
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+class WSGIDriver:
+    """Sends real HTTP requests to the app served by werkzeug on a local port"""
+
+    name = 'wsgi'
+
+    def __init__(self, app):
+        self.server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietRequestHandler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}/api/v3"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.openers = {}
+
+    def opener(self, role):
+        if role not in self.openers:
+            self.openers[role] = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(CookieJar()))
+        return self.openers[role]
+
+    def request(self, role, method, path, body=None, content_type='application/json'):
+        data = None
+        if isinstance(body, dict):
+            data = json.dumps(body).encode('utf-8')
+        elif body is not None:
+            data = body.encode('utf-8')
+        req = urllib.request.Request(self.base_url + path, data=data, method=method)
+        if data is not None:
+            req.add_header('Content-Type', content_type)
+        try:
+            with self.opener(role).open(req) as response:
+                status, raw, headers = response.status, response.read(), response.headers
+        except urllib.error.HTTPError as e:
+            status, raw, headers = e.code, e.read(), e.headers
+        try:
+            payload = json.loads(raw) if raw else None
+        except ValueError:
+            payload = None
+        return status, payload, headers
+
+    def close(self):
+        self.server.shutdown()
+
+
+# --- Measurement ---
+class QueryCounter:
+    """Counts SQL statements sent by the engine while attached"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def _record(self, *args):
+        with self._lock:
+            self.count += 1
+
+    def __enter__(self):
+        self.count = 0
+        event.listen(self.engine, 'before_cursor_execute', self._record)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._record)
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def login(driver, state):
+    for role, email in (('admin', ADMIN_EMAIL), ('guest', GUEST_EMAIL)):
+        status, _, _ = driver.request(role, 'POST', '/auth/login', {'email': email, 'password': BENCH_PASSWORD})
+        if status != 200:
+            raise RuntimeError(f"Benchmark {role} could not log in ({status})")
+    # A real cursor for the second-page listing endpoint
+    _, _, headers = driver.request(None, 'GET', '/places/?limit=20')
+    state['cursor'] = headers.get('X-Next-Cursor') or ''
+
+
+def run_endpoint(driver, endpoint, state, counter, iterations, concurrency=1):
+    """Time `iterations` calls of one endpoint; returns its result dict"""
+    calls = itertools.count(state['calls'].get(endpoint.name, 0))
+    errors = []
+
+    def call():
+        n = next(calls)
+        path, body = endpoint.build(n, state)
+        started = time.perf_counter()
+        status, payload, _ = driver.request(endpoint.role, endpoint.method, path, body, endpoint.content_type)
+        elapsed = time.perf_counter() - started
+        if status not in endpoint.expect:
+            errors.append(f"{status} {path}: {payload}")
+        elif endpoint.after:
+            endpoint.after(n, payload, state)
+        return elapsed
+
+    for _ in range(WARMUP):
+        call()
+    errors.clear()
+    with counter:
+        started = time.perf_counter()
+        if concurrency > 1:
+            with ThreadPoolExecutor(concurrency) as pool:
+                latencies = list(pool.map(lambda _: call(), range(iterations)))
+        else:
+            latencies = [call() for _ in range(iterations)]
+        wall = time.perf_counter() - started
+    state['calls'][endpoint.name] = next(calls)
+
+    latencies.sort()
+    return {
+        'requests': iterations,
+        'errors': len(errors),
+        'first_error': errors[0] if errors else None,
+        'throughput_rps': round(iterations / wall, 1) if wall else None,
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 3),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'queries_per_request': round(counter.count / iterations, 2),
+    }
+
+
+def measure_allocations(driver, endpoint, state, iterations):
+    """Peak traced Python allocation per request, in KiB (test client only)"""
+    calls = itertools.count(state['calls'].get(endpoint.name, 0))
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(iterations):
+            n = next(calls)
+            path, body = endpoint.build(n, state)
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+            status, payload, _ = driver.request(endpoint.role, endpoint.method, path, body, endpoint.content_type)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - baseline)
+            if status in endpoint.expect and endpoint.after:
+                endpoint.after(n, payload, state)
+    finally:
+        tracemalloc.stop()
+    state['calls'][endpoint.name] = next(calls)
+    return {
+        'alloc_peak_kib_mean': round(sum(peaks) / len(peaks) / 1024, 1),
+        'alloc_peak_kib_max': round(max(peaks) / 1024, 1),
+    }
+
+
+def run_suite(app, driver, ids, iterations, alloc_iterations=0, concurrency=1, endpoints=ENDPOINTS, run_id=0):
+    """Benchmark every endpoint with one driver; returns {endpoint name: result}"""
+    from app import db
+
+    state = dict(ids, bench_places=[], bench_reviews=[], bench_users=[], calls={}, run=run_id)
+    results = {}
+    with app.app_context():
+        counter = QueryCounter(db.engine)
+    login(driver, state)
+    for endpoint in endpoints:
+        results[endpoint.name] = run_endpoint(driver, endpoint, state, counter, iterations, concurrency)
+        if alloc_iterations:
+            results[endpoint.name].update(measure_allocations(driver, endpoint, state, alloc_iterations))
+    return results
+
+
+# --- Reporting ---
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(mode, results):
+    print(f"\n== {mode}")
+    print(f"{'endpoint':38} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'sql/req':>8} {'KiB':>8} {'err':>4}")
+    for name, r in results.items():
+        alloc = r.get('alloc_peak_kib_mean', '')
+        print(f"{name:38} {r['throughput_rps']:>8} {r['p50_ms']:>8} {r['p95_ms']:>8} {r['p99_ms']:>8} "
+              f"{r['queries_per_request']:>8} {alloc:>8} {r['errors']:>4}")
+        if r['first_error']:
+            print(f"   ! {r['first_error'][:150]}")
+
+
+def compare(current, baseline, threshold):
+    """Print per-endpoint changes against a baseline run and return the regressions"""
+    regressions = []
+    print(f"\n== compared with {baseline['meta'].get('commit')} (threshold {threshold:.0%})")
+    for key in ('scale', 'database', 'iterations', 'concurrency'):
+        if current['meta'].get(key) != baseline['meta'].get(key):
+            print(f"⚠️  {key} differs from the baseline: {baseline['meta'].get(key)} -> {current['meta'].get(key)}")
+    for mode, results in current['results'].items():
+        for name, r in results.items():
+            old = baseline['results'].get(mode, {}).get(name)
+            if not old:
+                continue
+            p95_change = (r['p95_ms'] - old['p95_ms']) / old['p95_ms'] if old['p95_ms'] else 0.0
+            rps_change = (r['throughput_rps'] - old['throughput_rps']) / old['throughput_rps'] if old['throughput_rps'] else 0.0
+            flag = ''
+            if p95_change > threshold or -rps_change > threshold:
+                flag = '  REGRESSION'
+                regressions.append((mode, name))
+            print(f"{mode:12} {name:38} p95 {p95_change:+7.1%}  rps {rps_change:+7.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the HBnB v3 API')
+    parser.add_argument('--users', type=int, default=200, help='Seeded users')
+    parser.add_argument('--amenities', type=int, default=30, help='Seeded amenities')
+    parser.add_argument('--places', type=int, default=1000, help='Seeded places')
+    parser.add_argument('--reviews', type=int, default=5000, help='Seeded reviews')
+    parser.add_argument('--iterations', type=int, default=200, help='Timed requests per endpoint')
+    parser.add_argument('--alloc-iterations', type=int, default=20, help='Requests per endpoint traced for allocations')
+    parser.add_argument('--concurrency', type=int, default=4, help='Client threads against the WSGI server')
+    parser.add_argument('--mode', choices=('both', 'test_client', 'wsgi'), default='both', help='Drivers to run')
+    parser.add_argument('--database-url', help='Database to benchmark (all tables are dropped!)')
+    parser.add_argument('--output', default='benchmark-results.json', help='JSON results file')
+    parser.add_argument('--compare', metavar='BASELINE', help='Earlier results file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10, help='Relative change counted as a regression')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for the synthetic data')
+    args = parser.parse_args()
+
+    if args.users < 2 or args.places < 1 or args.amenities < 1:
+        parser.error('need at least 2 users, 1 place and 1 amenity')
+
+    tmpdir = None
+    if not args.database_url:
+        tmpdir = tempfile.TemporaryDirectory()
+        args.database_url = f"sqlite:///{os.path.join(tmpdir.name, 'benchmark.db')}"
+    os.environ['BENCHMARK_DATABASE_URL'] = args.database_url
+
+    from app import create_app, db
+    app = create_app('config.BenchmarkConfig')
+    scale = {'users': args.users, 'amenities': args.amenities, 'places': args.places, 'reviews': args.reviews}
+
+    print("🏁 HBnB API benchmark")
+    print("=" * 40)
+    with app.app_context():
+        started = time.perf_counter()
+        seed_reports, ids = seed_database(scale, args.seed)
+        print(f"🌱 Seeded {scale} in {time.perf_counter() - started:.1f}s on {db.engine.dialect.name}")
+
+    results = {}
+    if args.mode in ('both', 'test_client'):
+        results['test_client'] = run_suite(app, TestClientDriver(app), ids, args.iterations, args.alloc_iterations)
+        print_results('test_client', results['test_client'])
+    if args.mode in ('both', 'wsgi'):
+        driver = WSGIDriver(app)
+        try:
+            results['wsgi'] = run_suite(app, driver, ids, args.iterations, concurrency=args.concurrency, run_id=1)
+        finally:
+            driver.close()
+        print_results(f'wsgi (concurrency {args.concurrency})', results['wsgi'])
+
+    with app.app_context():
+        dialect = db.engine.dialect.name
+    output = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'database': dialect,
+            'scale': scale,
+            'seed_rows_per_second': {kind: report['rows_per_second'] for kind, report in seed_reports.items()},
+            'iterations': args.iterations,
+            'alloc_iterations': args.alloc_iterations,
+            'concurrency': args.concurrency,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(output, f, indent=2)
+    print(f"\n💾 Results written to {args.output}")
+
+    status = 0
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if compare(output, baseline, args.threshold):
+            status = 1
+    if tmpdir:
+        with app.app_context():
+            db.engine.dispose()
+        tmpdir.cleanup()
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Build fingerprinted, precompressed static assets for the v3 frontend
+
+Copies app/static into the build folder with content-hashed file names,
+gzip/brotli and WebP/AVIF variants, and a manifest.json the app reads at
+startup (see app/assets.py). Re-run after changing anything in
+app/static; the previous build is replaced.
+
+Usage:
+    python build_assets.py [--output DIR]
+
+Arguments:
+    --output: Build folder (default: ASSET_BUILD_FOLDER or app/static_build)
+
+brotli, Pillow and fontTools are optional; without them the .br copies,
+image variants and font subsetting are skipped.
+"""
+
+import argparse
+import os
+
+from app.assets import build
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SOURCE = os.path.join(HERE, 'app', 'static')
+DEFAULT_OUTPUT = os.getenv('ASSET_BUILD_FOLDER') or os.path.join(HERE, 'app', 'static_build')
+
+
+def size(path):
+    return os.path.getsize(path) if os.path.isfile(path) else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build fingerprinted static assets')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='Build folder')
+    args = parser.parse_args()
+
+    manifest = build(SOURCE, args.output)
+    print(f"{'asset':<40}{'original':>12}{'smallest':>12}  variants")
+    for name, target in sorted(manifest['files'].items()):
+        variants = manifest['variants'].get(target, [])
+        smallest = min([size(os.path.join(args.output, target + suffix)) for suffix in variants]
+                       + [size(os.path.join(args.output, target))])
+        print(f"{name:<40}{size(os.path.join(SOURCE, name)):>12}{smallest:>12}  {' '.join(variants)}")
+    print(f"Wrote {len(manifest['files'])} assets and the manifest to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
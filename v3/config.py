@@ -3,6 +3,33 @@ import os
 class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'default_secret_key')
     DEBUG = False
+    # Entity cache: 'memory', 'shared' (Redis at ENTITY_CACHE_URL) or 'none'
+    ENTITY_CACHE_BACKEND = os.getenv('ENTITY_CACHE_BACKEND', 'memory')
+    ENTITY_CACHE_MAXSIZE = 1024
+    ENTITY_CACHE_TTL = 300
+    ENTITY_CACHE_URL = os.getenv('ENTITY_CACHE_URL')
+    # Password hashing: bcrypt work factor and the pool it runs on
+    BCRYPT_LOG_ROUNDS = int(os.getenv('BCRYPT_LOG_ROUNDS', 12))
+    PASSWORD_HASH_EXECUTOR = os.getenv('PASSWORD_HASH_EXECUTOR', 'thread')  # thread, process or inline
+    PASSWORD_HASH_WORKERS = None  # defaults to the CPU count
+    PASSWORD_HASH_MAX_PENDING = None  # defaults to 4 per worker
+    PASSWORD_HASH_ADMISSION_TIMEOUT = 0.5
+    # Sessions: 'sqlalchemy' (server-side rows) or 'token' (signed tokens, no database)
+    SESSION_BACKEND = os.getenv('SESSION_BACKEND', 'sqlalchemy')
+    SESSION_TOKEN_DENYLIST_SIZE = 10000
+    # Output of build_assets.py; defaults to app/static_build
+    ASSET_BUILD_FOLDER = os.getenv('ASSET_BUILD_FOLDER')
+    # Resized place images: output folder (default app/place_images), widths and worker pool
+    PLACE_IMAGE_FOLDER = os.getenv('PLACE_IMAGE_FOLDER')
+    PLACE_IMAGE_WIDTHS = (320, 640, 1280)
+    PLACE_IMAGE_EXECUTOR = os.getenv('PLACE_IMAGE_EXECUTOR', 'process')  # process, thread or inline
+    PLACE_IMAGE_WORKERS = 2
+    PLACE_IMAGE_VARIANTS_TTL = 10  # seconds before another process's new copies are seen
+    # API response encoder: auto (msgspec, else orjson, else json), msgspec, orjson or json
+    JSON_ENCODER = os.getenv('JSON_ENCODER', 'auto')
+    # Place text search: auto (MySQL FULLTEXT on MySQL, else in-process index), fulltext or index
+    PLACE_SEARCH_BACKEND = os.getenv('PLACE_SEARCH_BACKEND', 'auto')
+    PLACE_SEARCH_BUILD = os.getenv('PLACE_SEARCH_BUILD', 'thread')  # thread or inline
 
 class DevelopmentConfig(Config):
     DEBUG = True
@@ -18,7 +45,28 @@ class DevelopmentConfig(Config):
 
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+class TestingConfig(Config):
+    TESTING = True
+    SECRET_KEY = 'test-secret-key'
+    # In-memory SQLite so the test suite needs no MySQL server
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Cheapest bcrypt work factor keeps user-heavy tests fast
+    BCRYPT_LOG_ROUNDS = 4
+    PLACE_IMAGE_EXECUTOR = 'inline'
+    PLACE_SEARCH_BUILD = 'inline'
+
+class BenchmarkConfig(Config):
+    SECRET_KEY = 'benchmark-secret-key'
+    # Set by benchmark.py; every table in this database is dropped and reseeded
+    SQLALCHEMY_DATABASE_URI = os.getenv('BENCHMARK_DATABASE_URL', 'sqlite:///hbnb_benchmark.db')
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Seeded passwords use the cheapest work factor; login cost is not what is measured
+    BCRYPT_LOG_ROUNDS = 4
+
 config = {
     'development': DevelopmentConfig,
+    'testing': TestingConfig,
+    'benchmark': BenchmarkConfig,
     'default': DevelopmentConfig
 }
\ No newline at end of file
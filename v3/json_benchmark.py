@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of JSON response encoding for the v3 list endpoints
+
+Builds payloads shaped like the responses of
+    places:   GET /api/v3/places/         (serialize_place)
+    reviews:  GET /api/v3/reviews/places/<id>/reviews  (serialize_review)
+    amenities: GET /api/v3/amenities/
+    users:    GET /api/v3/users/public?ids=...
+with --rows rows each, and encodes them with
+    restx:   what flask_restx did before app.encoding (json.dumps to a
+             str, then UTF-8 bytes; prices already converted to float)
+    json/orjson/msgspec: the encoders in app.encoding (Decimal prices
+             passed through), where installed
+reporting the best and median encode time, output size, and the peak
+memory allocated while encoding (tracemalloc).
+
+Usage:
+    python json_benchmark.py [--rows N] [--repeat N] [--seed N]
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+import tracemalloc
+import uuid
+from decimal import Decimal
+
+from app.encoding import ENCODERS, make_encoder
+
+
+def place_rows(rng, rows, decimal_prices):
+    amenity_ids = [str(uuid.UUID(int=rng.getrandbits(128))) for _ in range(20)]
+    payload = []
+    for i in range(rows):
+        place_id = str(uuid.UUID(int=rng.getrandbits(128)))
+        price = Decimal(rng.randrange(2000, 40000)) / 100
+        payload.append({
+            'id': place_id,
+            'title': f"Dragon's Rest Tavern {i}",
+            'description': 'A cozy tavern for weary adventurers, complete with enchanted fireplaces.',
+            'price': price if decimal_prices else float(price),
+            'latitude': rng.uniform(-90, 90),
+            'longitude': rng.uniform(-180, 180),
+            'owner_id': str(uuid.UUID(int=rng.getrandbits(128))),
+            'amenities': rng.sample(amenity_ids, rng.randint(0, 5)),
+            'review_count': rng.randint(0, 50),
+            'avg_rating': round(rng.uniform(1, 5), 2),
+            'image': f"http://localhost:5000/static/images/Dragon's%20Rest%20Tavern%20{i}.jpg",
+            'image_srcset': None,
+            'thumbnail': f"http://localhost:5000/media/places/{place_id}/320.jpg",
+        })
+    return payload
+
+
+def review_rows(rng, rows, decimal_prices):
+    place_id = str(uuid.UUID(int=rng.getrandbits(128)))
+    payload = []
+    for i in range(rows):
+        user_id = str(uuid.UUID(int=rng.getrandbits(128)))
+        payload.append({
+            'id': str(uuid.UUID(int=rng.getrandbits(128))),
+            'text': 'The ale was fine and the beds were soft. Would slay a dragon here again.',
+            'rating': rng.randint(1, 5),
+            'user_id': user_id,
+            'place_id': place_id,
+            'user': {'id': user_id, 'first_name': 'Bilbo', 'last_name': f'Baggins {i}'},
+        })
+    return payload
+
+
+def amenity_rows(rng, rows, decimal_prices):
+    return [{'id': str(uuid.UUID(int=rng.getrandbits(128))), 'name': f'Enchanted Fireplace {i}'}
+            for i in range(rows)]
+
+
+def user_rows(rng, rows, decimal_prices):
+    return [{'id': str(uuid.UUID(int=rng.getrandbits(128))), 'first_name': 'Bilbo', 'last_name': f'Baggins {i}'}
+            for i in range(rows)]
+
+
+ENDPOINTS = {'places': place_rows, 'reviews': review_rows, 'amenities': amenity_rows, 'users': user_rows}
+
+
+def restx_encoder():
+    """The stock flask_restx path: json.dumps to str, newline, then UTF-8 bytes"""
+    return lambda data: (json.dumps(data) + "\n").encode('utf-8')
+
+
+def available_encoders():
+    encoders = {'restx': restx_encoder()}
+    for name in ENCODERS:
+        try:
+            encoders[name] = make_encoder(name)[1]
+        except ImportError:
+            continue  # not installed
+    return encoders
+
+
+def measure(encode, payload, repeat):
+    """Return timings and the peak memory allocated by one encode"""
+    encode(payload)  # warm-up
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = encode(payload)
+        times.append(time.perf_counter() - started)
+    tracemalloc.start()
+    encode(payload)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'best_ms': round(min(times) * 1000, 2), 'median_ms': round(statistics.median(times) * 1000, 2),
+            'bytes': len(body), 'alloc_peak_kib': round(peak / 1024, 1)}
+
+
+def run(rows=10000, repeat=20, seed=42):
+    """Return {endpoint: {encoder: measurements}}, checking every encoder agrees on the data"""
+    results = {}
+    encoders = available_encoders()
+    for endpoint, build in ENDPOINTS.items():
+        results[endpoint] = {}
+        for name, encode in encoders.items():
+            # The restx path gets floats, as serialize_place used to produce
+            payload = build(random.Random(seed), rows, decimal_prices=name != 'restx')
+            result = measure(encode, payload, repeat)
+            result['matches_restx'] = json.loads(encode(payload)) == json.loads(
+                encoders['restx'](build(random.Random(seed), rows, decimal_prices=False)))
+            results[endpoint][name] = result
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare JSON encoders on API-shaped payloads')
+    parser.add_argument('--rows', type=int, default=10000, help='Rows per payload')
+    parser.add_argument('--repeat', type=int, default=20, help='Timed encodes per encoder')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    args = parser.parse_args()
+
+    print(f"{'endpoint':<11}{'encoder':<9}{'best ms':>9}{'median ms':>11}{'KiB out':>9}{'peak KiB':>10}  same data")
+    for endpoint, encoders in run(args.rows, args.repeat, args.seed).items():
+        for name, result in encoders.items():
+            print(f"{endpoint:<11}{name:<9}{result['best_ms']:>9}{result['median_ms']:>11}"
+                  f"{result['bytes'] // 1024:>9}{result['alloc_peak_kib']:>10}  {result['matches_restx']}")
+
+
+if __name__ == '__main__':
+    main()
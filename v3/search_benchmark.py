@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the in-process place search index (app.search.SearchIndex)
+
+Indexes --places synthetic places whose titles (3-5 words) and
+descriptions (15-40 words) are drawn from a Zipf-distributed vocabulary,
+so a few words are very common and most are rare, as in real text. Then
+runs --queries searches of one, two and three words drawn the same way
+and reports build time, approximate index memory, and p50/p95/p99 latency per query
+length, plus the same for single common words (the worst case, since a
+query's cost follows its rarest word's posting list).
+
+Usage:
+    python search_benchmark.py [--places N] [--queries N] [--vocabulary N] [--limit N] [--seed N]
+"""
+
+import argparse
+import itertools
+import random
+import statistics
+import sys
+import time
+
+from app.search import SearchIndex, query_terms
+
+
+def vocabulary(size):
+    """Pronounceable made-up words, so none are stop words"""
+    syllables = ['dra', 'gon', 'tav', 'ern', 'el', 'ven', 'cas', 'tle', 'moss', 'fire', 'ale', 'rune',
+                 'shire', 'wood', 'stone', 'mist', 'oak', 'fen', 'glen', 'hol']
+    words = (''.join(parts) for length in itertools.count(2) for parts in itertools.product(syllables, repeat=length))
+    return list(itertools.islice(words, size))
+
+
+def word_sampler(rng, words):
+    """Draw words with Zipf-like frequencies (the i-th word weighs 1/(i+1))"""
+    cumulative = list(itertools.accumulate(1 / rank for rank in range(1, len(words) + 1)))
+    return lambda count: rng.choices(words, cum_weights=cumulative, k=count)
+
+
+def index_size(index):
+    """Approximate bytes held by the index's containers, arrays and ids"""
+    size = sys.getsizeof(index._postings) + sys.getsizeof(index._ids) + sys.getsizeof(index._docs)
+    size += sys.getsizeof(index._lengths)
+    for term, (docs, tfs) in index._postings.items():
+        size += sys.getsizeof(term) + sys.getsizeof(docs) + sys.getsizeof(tfs) + 56  # the tuple
+    size += sum(sys.getsizeof(place_id) for place_id in index._docs)
+    return size
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def timings(index, queries, limit):
+    times, hits = [], 0
+    for query in queries:
+        started = time.perf_counter()
+        hits += len(index.search(query_terms(query), limit))
+        times.append((time.perf_counter() - started) * 1000)
+    return {'p50_ms': round(statistics.median(times), 3), 'p95_ms': round(percentile(times, 0.95), 3),
+            'p99_ms': round(percentile(times, 0.99), 3), 'avg_hits': round(hits / len(queries), 1)}
+
+
+def run(places=100000, queries=1000, vocabulary_size=50000, limit=20, seed=42):
+    """Return build statistics and {query kind: latency percentiles}"""
+    rng = random.Random(seed)
+    words = vocabulary(vocabulary_size)
+    sample = word_sampler(rng, words)
+
+    corpus = [(f'place-{i}', ' '.join(sample(rng.randint(3, 5))), ' '.join(sample(rng.randint(15, 40))))
+              for i in range(places)]
+    index = SearchIndex()
+    started = time.perf_counter()
+    for place in corpus:
+        index.add(*place)
+    build_seconds = time.perf_counter() - started
+    del corpus
+
+    results = {}
+    for length in (1, 2, 3):
+        results[f'{length} word'] = timings(index, [' '.join(sample(length)) for _ in range(queries)], limit)
+    results['common word'] = timings(index, [rng.choice(words[:10]) for _ in range(queries)], limit)
+    return {'places': places, 'build_s': round(build_seconds, 1), 'index_mib': round(index_size(index) / 2 ** 20, 1),
+            'queries': results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the in-process place search index')
+    parser.add_argument('--places', type=int, default=100000, help='Places to index')
+    parser.add_argument('--queries', type=int, default=1000, help='Timed queries per kind')
+    parser.add_argument('--vocabulary', type=int, default=50000, help='Distinct words in the corpus')
+    parser.add_argument('--limit', type=int, default=20, help='Results per query')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    args = parser.parse_args()
+
+    result = run(args.places, args.queries, args.vocabulary, args.limit, args.seed)
+    print(f"{result['places']} places indexed in {result['build_s']} s, {result['index_mib']} MiB")
+    print(f"{'query':<13}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'avg hits':>10}")
+    for kind, stats in result['queries'].items():
+        print(f"{kind:<13}{stats['p50_ms']:>9}{stats['p95_ms']:>9}{stats['p99_ms']:>9}{stats['avg_hits']:>10}")
+
+
+if __name__ == '__main__':
+    main()